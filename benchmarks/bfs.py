@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark breadth-first search (`pacai.core.search.search.bfs`) and the queue containers
+(`pacai.util.queue`).
+
+The search is run on a `PositionSearchProblem` with the current implementation
+(`pacai.util.queue.Queue` and a set of visited states)
+and the original one (a list with `pop(0)` and a list of visited states),
+which is kept here for reference.
+The containers are compared by pushing and then popping many integers through
+the original list-backed queue, the deque-backed `Queue`, and the array-backed `CompactQueue`.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+
+from pacai.bin.pacman import PacmanGameState  # noqa: E402
+from pacai.core.layout import getLayout  # noqa: E402
+from pacai.core.search import search  # noqa: E402
+from pacai.core.search.position import PositionSearchProblem  # noqa: E402
+from pacai.util.queue import CompactQueue  # noqa: E402
+from pacai.util.queue import Queue  # noqa: E402
+
+DEFAULT_LAYOUTS = ['bigMaze']
+DEFAULT_ITEMS = 100000
+DEFAULT_REPEATS = 20
+
+class LegacyQueue(object):
+    def __init__(self):
+        self.list = []
+
+    def push(self, item):
+        self.list.insert(0, item)
+
+    def pop(self):
+        return self.list.pop()
+
+    def isEmpty(self):
+        return len(self.list) == 0
+
+def legacyBfs(problem):
+    queue = []
+    visited = []
+    path = []
+
+    queue.append((problem.startingState(), None, None))
+    visited.append(problem.startingState())
+
+    while queue:
+        curr, parent_comp, prev = queue.pop(0)
+
+        if problem.isGoal(curr):
+            path.append(prev)
+            while parent_comp:
+                curr, parent, next = parent_comp
+                path.append(next)
+                parent_comp = parent
+            break
+
+        for successor, next, cost in problem.successorStates(curr):
+            if successor not in visited:
+                queue.append((successor, (curr, parent_comp, prev), next))
+                visited.append(successor)
+
+    path.reverse()
+
+    if path and path[0] is None:
+        path.pop(0)
+
+    return path
+
+def timeSearch(layout, function, repeats):
+    """
+    Returns the path and the average time of a search.
+    """
+
+    state = PacmanGameState(layout)
+
+    startTime = time.perf_counter()
+    for _ in range(repeats):
+        path = function(PositionSearchProblem(state))
+
+    return path, (time.perf_counter() - startTime) / repeats
+
+def measureQueue(queueClass, count):
+    """
+    Returns the time to push and pop every item, and the memory held with every item queued.
+    """
+
+    startTime = time.perf_counter()
+    queue = queueClass()
+    for item in range(count):
+        queue.push(item)
+    while (not queue.isEmpty()):
+        queue.pop()
+    queueTime = time.perf_counter() - startTime
+
+    tracemalloc.start()
+    queue = queueClass()
+    for item in range(count):
+        queue.push(item)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return queueTime, memory
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+    parser.add_argument('layouts', nargs = '*', default = DEFAULT_LAYOUTS,
+            help = 'layouts to search (default: %(default)s)')
+    parser.add_argument('--items', type = int, default = DEFAULT_ITEMS,
+            help = 'number of integers to queue (default: %(default)s)')
+    parser.add_argument('--repeats', type = int, default = DEFAULT_REPEATS,
+            help = 'number of searches to average over (default: %(default)s)')
+    options = parser.parse_args()
+
+    print('%-14s %6s %10s %10s %8s' % ('layout', 'cost', 'old (ms)', 'new (ms)', 'speedup'))
+
+    for name in options.layouts:
+        layout = getLayout(name)
+
+        legacyPath, legacyTime = timeSearch(layout, legacyBfs, options.repeats)
+        path, newTime = timeSearch(layout, search.bfs, options.repeats)
+
+        if (legacyPath != path):
+            raise ValueError('Search results differ on %s.' % (name))
+
+        print('%-14s %6d %10.2f %10.2f %7.1fx' % (name, len(path),
+                legacyTime * 1000, newTime * 1000, legacyTime / newTime))
+
+    print()
+    print('%-14s %10s %12s' % ('queue', 'time (s)', 'memory (KB)'))
+
+    for (name, queueClass) in [('list', LegacyQueue), ('Queue', Queue),
+            ('CompactQueue', CompactQueue)]:
+        queueTime, memory = measureQueue(queueClass, options.items)
+        print('%-14s %10.3f %12d' % (name, queueTime, memory // 1024))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Report how much the corridor graph (`pacai.core.corridors`) shrinks each layout.
+
+For every layout, this shows the number of open cells, graph nodes, and edges,
+the memory held by the full distance table against the compressed (junction-only) one,
+and the number of nodes a uniform cost search expands to cross the layout
+on cells (`PositionSearchProblem`) against on corridors (`CorridorSearchProblem`).
+"""
+
+import argparse
+import glob
+import heapq
+import os
+import sys
+import tracemalloc
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+
+from pacai.bin.pacman import PacmanGameState  # noqa: E402
+from pacai.core import distanceCalculator  # noqa: E402
+from pacai.core.layout import DEFAULT_LAYOUT_DIR  # noqa: E402
+from pacai.core.layout import getLayout  # noqa: E402
+from pacai.core.search.corridor import CorridorSearchProblem  # noqa: E402
+from pacai.core.search.position import PositionSearchProblem  # noqa: E402
+
+DEFAULT_LAYOUTS = ['tinyMaze', 'mediumMaze', 'bigMaze', 'smallClassic', 'mediumClassic',
+        'originalClassic', 'trickyClassic', 'mediumCapture', 'defaultCapture', 'openSearch']
+
+def measureMemory(build):
+    tracemalloc.start()
+    table = build()  # noqa: F841
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return memory
+
+def uniformCost(problem):
+    """
+    Returns the cost of the cheapest path to the goal (None if there is none).
+    """
+
+    queue = [(0, 0, problem.startingState())]
+    done = set()
+    count = 1
+
+    while (queue):
+        (cost, _, state) = heapq.heappop(queue)
+        if (state in done):
+            continue
+
+        if (problem.isGoal(state)):
+            return cost
+
+        done.add(state)
+        for (nextState, _, stepCost) in problem.successorStates(state):
+            heapq.heappush(queue, (cost + stepCost, count, nextState))
+            count += 1
+
+    return None
+
+def search(layout, problemClass):
+    """
+    Search from the first open cell of the layout (bottom left) to the last (top right).
+    Returns the cost and the number of expanded nodes.
+    """
+
+    cells = layout.walls.asList(False)
+    start = cells[0]
+    goal = cells[-1]
+
+    problem = problemClass(PacmanGameState(layout), start = start, goal = goal)
+    cost = uniformCost(problem)
+
+    return cost, problem.getExpandedCount()
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+    parser.add_argument('layouts', nargs = '*', default = DEFAULT_LAYOUTS,
+            help = 'layouts to measure (default: %(default)s)')
+    parser.add_argument('--all', action = 'store_true', default = False,
+            help = 'measure every bundled layout')
+    options = parser.parse_args()
+
+    names = options.layouts
+    if (options.all):
+        paths = sorted(glob.glob(os.path.join(DEFAULT_LAYOUT_DIR, '*.lay')))
+        names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+
+    print('%-18s %6s %6s %6s %7s %10s %10s %9s %9s' % ('layout', 'cells', 'nodes', 'edges',
+            'ratio', 'full (KB)', 'comp (KB)', 'expanded', 'corridor'))
+
+    for name in names:
+        layout = getLayout(name)
+        walls = layout.walls
+        graph = layout.getCorridorGraph()
+
+        numCells = len(walls.asList(False))
+
+        fullMemory = measureMemory(lambda: distanceCalculator.DistanceTable(walls))
+        compressedMemory = measureMemory(
+                lambda: distanceCalculator.CorridorDistanceTable(graph))
+
+        cellCost, cellExpanded = search(layout, PositionSearchProblem)
+        corridorCost, corridorExpanded = search(layout, CorridorSearchProblem)
+
+        if (cellCost != corridorCost):
+            raise ValueError('Search costs differ on %s.' % (name))
+
+        print('%-18s %6d %6d %6d %6.1fx %10d %10d %9d %9d' % (name, numCells,
+                graph.getNumNodes(), graph.getNumEdges(), numCells / graph.getNumNodes(),
+                fullMemory // 1024, compressedMemory // 1024, cellExpanded, corridorExpanded))
+
+if __name__ == '__main__':
+    main()
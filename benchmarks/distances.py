@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark building the all-pairs maze distances (`pacai.core.distanceCalculator`)
+on every bundled capture layout.
+
+The current table is compared against the original implementation
+(a heap-based UCS from every cell into a dict keyed by position pairs),
+which is kept here for reference.
+"""
+
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+
+from pacai.core import distanceCalculator  # noqa: E402
+from pacai.core.layout import DEFAULT_LAYOUT_DIR  # noqa: E402
+from pacai.core.layout import getLayout  # noqa: E402
+from pacai.util import priorityQueue  # noqa: E402
+
+def legacyComputeDistances(layout):
+    distances = {}
+    allNodes = layout.walls.asList(False)
+
+    for source in allNodes:
+        dist = {}
+        closed = {}
+
+        for node in allNodes:
+            dist[node] = sys.maxsize
+
+        queue = priorityQueue.PriorityQueue()
+        queue.push(source, 0)
+        dist[source] = 0
+
+        while not queue.isEmpty():
+            node = queue.pop()
+            if node in closed:
+                continue
+
+            closed[node] = True
+            nodeDist = dist[node]
+            x, y = node
+
+            for other in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+                if (layout.isWall(other) or other not in dist):
+                    continue
+
+                newDist = nodeDist + 1
+                if newDist < dist[other]:
+                    dist[other] = newDist
+                    queue.push(other, newDist)
+
+        for target in allNodes:
+            distances[(target, source)] = dist[target]
+
+    return distances
+
+def measure(function, layout):
+    """
+    Returns the result, the build time, and the memory held by the result.
+    Memory is measured on a separate build, since tracing slows down the build.
+    """
+
+    startTime = time.perf_counter()
+    result = function(layout)
+    buildTime = time.perf_counter() - startTime
+
+    tracemalloc.start()
+    retained = function(layout)  # noqa: F841
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, buildTime, memory
+
+def main():
+    paths = sorted(glob.glob(os.path.join(DEFAULT_LAYOUT_DIR, '*Capture.lay')))
+
+    print('%-18s %6s %12s %12s %12s %12s' % ('layout', 'cells',
+            'legacy (s)', 'table (s)', 'legacy (KB)', 'table (KB)'))
+
+    for path in paths:
+        layout = getLayout(os.path.basename(path))
+
+        legacy, legacyTime, legacyMemory = measure(legacyComputeDistances, layout)
+        table, tableTime, tableMemory = measure(
+                lambda layout: distanceCalculator.DistanceTable(layout.walls), layout)
+
+        # Make sure that both agree.
+        for ((target, source), distance) in legacy.items():
+            if (table.getDistance(target, source) != distance):
+                raise ValueError('Distance mismatch on %s: %s -> %s.' % (path, source, target))
+
+        print('%-18s %6d %12.3f %12.3f %12d %12d' % (os.path.basename(path)[:-4],
+                table.getNumCells(), legacyTime, tableTime,
+                legacyMemory // 1024, tableMemory // 1024))
+
+if __name__ == '__main__':
+    main()
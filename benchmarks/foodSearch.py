@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the bit-packed food search (`PackedFoodSearchProblem`) against the original
+`FoodSearchProblem`, where states hold a copy of the food `Grid`.
+
+Both problems are searched with the same algorithm and (if it takes one) the same heuristic
+(`pacai.core.search.heuristic.foodMST`, which is handed a food mask built from the grid
+for the original problem),
+so the difference is down to the state representation.
+Memory is measured on a separate run, since tracing slows everything down.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+
+from pacai.bin.pacman import PacmanGameState  # noqa: E402
+from pacai.core.layout import getLayout  # noqa: E402
+from pacai.core.search import engine  # noqa: E402
+from pacai.core.search import heuristic  # noqa: E402
+from pacai.core.search.food import FoodSearchProblem  # noqa: E402
+from pacai.core.search.food import PackedFoodSearchProblem  # noqa: E402
+
+# (layout, search) pairs.
+# An optimal search of mediumSearch (108 food) does not finish in reasonable time,
+# so it is searched with weighted A*.
+DEFAULT_RUNS = ['trickySearch:ucs', 'trickySearch:astar', 'mediumSearch:wastar']
+
+def gridMST(state, problem):
+    """
+    `pacai.core.search.heuristic.foodMST` for a `FoodSearchProblem`.
+    """
+
+    packed = problem.heuristicInfo.get('packed')
+    if (packed is None):
+        packed = PackedFoodSearchProblem(problem.startingGameState)
+        problem.heuristicInfo['packed'] = packed
+
+    (position, foodGrid) = state
+
+    foodMask = 0
+    for (i, food) in enumerate(packed.foodPositions):
+        if (foodGrid[food[0]][food[1]]):
+            foodMask |= (1 << i)
+
+    return heuristic.foodMST((position, foodMask), packed)
+
+def run(layout, problemClass, function, foodHeuristic):
+    """
+    Returns the path cost, the number of expanded nodes, the search time,
+    and the peak memory of the search.
+    """
+
+    if ('heuristic' in function.__code__.co_varnames):
+        search = lambda problem: function(problem, foodHeuristic)
+    else:
+        search = function
+
+    problem = problemClass(PacmanGameState(layout))
+
+    startTime = time.perf_counter()
+    actions = search(problem)
+    searchTime = time.perf_counter() - startTime
+
+    problem = problemClass(PacmanGameState(layout))
+    tracemalloc.start()
+    search(problem)
+    _, memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return problem.actionsCost(actions), problem.getExpandedCount(), searchTime, memory
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+    parser.add_argument('runs', nargs = '*', default = DEFAULT_RUNS,
+            help = 'layouts to search, as layout:search with a search from '
+                + 'pacai.core.search.engine (default: %(default)s)')
+    options = parser.parse_args()
+
+    print('%-14s %7s %6s %8s %10s %10s %11s %11s' % ('layout', 'search', 'cost', 'expanded',
+            'grid (s)', 'packed (s)', 'grid (KB)', 'packed (KB)'))
+
+    for spec in options.runs:
+        name, functionName = spec.split(':')
+        layout = getLayout(name)
+        function = getattr(engine, functionName)
+
+        grid = run(layout, FoodSearchProblem, function, gridMST)
+        packed = run(layout, PackedFoodSearchProblem, function, heuristic.foodMST)
+
+        if (grid[:2] != packed[:2]):
+            raise ValueError('Search results differ on %s.' % (name))
+
+        print('%-14s %7s %6d %8d %10.3f %10.3f %11d %11d' % (name, functionName,
+                packed[0], packed[1], grid[2], packed[2], grid[3] // 1024, packed[3] // 1024))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the lazy (per-source, LRU) maze distances against the eager all-pairs table
+(`pacai.core.distanceCalculator`) on large layouts.
+
+For each layout, the same random queries are asked of both.
+Queries come from a handful of "agent" cells at a time (like a game would ask them),
+with the agents wandering to new cells every few queries.
+Note that building the eager table for a 100x100 layout takes a while (tens of seconds).
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+
+from pacai.core import distanceCalculator  # noqa: E402
+from pacai.core.layout import Layout  # noqa: E402
+from pacai.core.layout import getLayout  # noqa: E402
+
+DEFAULT_QUERIES = 20000
+DEFAULT_SEED = 4
+DEFAULT_WALL_DENSITY = 0.3
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+NUM_AGENTS = 4
+QUERIES_PER_MOVE = 50
+
+def randomLayout(size, density, rng):
+    """
+    A square layout bordered by walls, with each inner cell a wall with the given probability.
+    """
+
+    rows = []
+    for y in range(size):
+        row = []
+        for x in range(size):
+            border = (x in (0, size - 1) or y in (0, size - 1))
+            row.append('%' if (border or rng.random() < density) else ' ')
+
+        rows.append(row)
+
+    rows[1][1] = 'P'
+
+    return Layout([''.join(row) for row in rows])
+
+def makeQueries(cells, count, rng):
+    agents = [rng.choice(cells) for _ in range(NUM_AGENTS)]
+    queries = []
+
+    for i in range(count):
+        if (i % QUERIES_PER_MOVE == 0):
+            agents[rng.randrange(NUM_AGENTS)] = rng.choice(cells)
+
+        queries.append((rng.choice(agents), rng.choice(cells)))
+
+    return queries
+
+def measure(build, queries):
+    """
+    Returns the build time, the average query time (in microseconds),
+    the memory held after all the queries, and the answers.
+    Memory is measured on a separate run, since tracing slows everything down.
+    """
+
+    startTime = time.perf_counter()
+    table = build()
+    buildTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    answers = [table.getDistance(source, target) for (source, target) in queries]
+    queryTime = (time.perf_counter() - startTime) / len(queries) * 1000000
+
+    del table
+
+    tracemalloc.start()
+    retained = build()
+    for (source, target) in queries:
+        retained.getDistance(source, target)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return buildTime, queryTime, memory, answers
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+    parser.add_argument('--queries', type = int, default = DEFAULT_QUERIES,
+            help = 'number of queries per layout (default: %(default)s)')
+    parser.add_argument('--max-bytes', dest = 'maxBytes', type = int,
+            default = DEFAULT_MAX_BYTES,
+            help = 'memory budget for the lazy rows (default: %(default)s)')
+    parser.add_argument('--random-size', dest = 'randomSize', type = int, default = 100,
+            help = 'width and height of the random layouts (default: %(default)s)')
+    parser.add_argument('--random-count', dest = 'randomCount', type = int, default = 1,
+            help = 'number of random layouts (default: %(default)s)')
+    parser.add_argument('--seed', type = int, default = DEFAULT_SEED,
+            help = 'random seed (default: %(default)s)')
+    options = parser.parse_args()
+
+    rng = random.Random(options.seed)
+
+    layouts = [(name, getLayout(name)) for name in ['bigMaze', 'bigSearch']]
+    for i in range(options.randomCount):
+        name = 'random%dx%d-%d' % (options.randomSize, options.randomSize, i)
+        layouts.append((name, randomLayout(options.randomSize, DEFAULT_WALL_DENSITY, rng)))
+
+    print('%-16s %6s %10s %10s %10s %10s %10s %10s' % ('layout', 'cells',
+            'eager (s)', 'lazy (s)', 'eager (us)', 'lazy (us)', 'eager (KB)', 'lazy (KB)'))
+
+    for (name, layout) in layouts:
+        walls = layout.walls
+        queries = makeQueries(walls.asList(False), options.queries, rng)
+
+        eager = measure(lambda: distanceCalculator.DistanceTable(walls), queries)
+        lazy = measure(lambda: distanceCalculator.LazyDistanceTable(walls, options.maxBytes),
+                queries)
+
+        if (eager[3] != lazy[3]):
+            raise ValueError('Distance mismatch on %s.' % (name))
+
+        print('%-16s %6d %10.3f %10.3f %10.2f %10.2f %10d %10d' % (name,
+                len(walls.asList(False)), eager[0], lazy[0], eager[1], lazy[1],
+                eager[2] // 1024, lazy[2] // 1024))
+
+if __name__ == '__main__':
+    main()
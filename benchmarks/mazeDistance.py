@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark `pacai.core.distance.maze` inside a search:
+A* on a `FoodSearchProblem` with the student `foodHeuristic` (which asks for a maze distance
+on every call to the heuristic).
+
+The current (shared, cached) distances are compared against the original implementation
+(a fresh `PositionSearchProblem` and breadth-first search for every call),
+which is kept here for reference.
+Both the time spent computing maze distances and the total search time are reported,
+since most of the total is spent in the search itself.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+
+from pacai.bin.pacman import PacmanGameState  # noqa: E402
+from pacai.core import distance  # noqa: E402
+from pacai.core.layout import getLayout  # noqa: E402
+from pacai.core.search.food import FoodSearchProblem  # noqa: E402
+from pacai.core.search.position import PositionSearchProblem  # noqa: E402
+from pacai.student import search  # noqa: E402
+from pacai.student import searchAgents  # noqa: E402
+
+DEFAULT_LAYOUTS = ['trickySearch']
+
+def legacyMaze(position1, position2, gameState):
+    x1, y1 = position1
+    x2, y2 = position2
+
+    walls = gameState.getWalls()
+
+    if (walls[x1][y1]):
+        raise ValueError('Position1 is a wall: ' + str(position1))
+
+    if (walls[x2][y2]):
+        raise ValueError('Position2 is a wall: ' + str(position2))
+
+    prob = PositionSearchProblem(gameState, start = position1, goal = position2)
+
+    return len(search.breadthFirstSearch(prob))
+
+def run(layout, maze):
+    """
+    Returns the path, the number of expanded nodes, the number of maze distance calls,
+    the total search time, and the time spent in the maze distance calls.
+    """
+
+    calls = [0]
+    mazeTime = [0.0]
+
+    def countedMaze(position1, position2, gameState):
+        calls[0] += 1
+
+        startTime = time.perf_counter()
+        result = maze(position1, position2, gameState)
+        mazeTime[0] += time.perf_counter() - startTime
+
+        return result
+
+    problem = FoodSearchProblem(PacmanGameState(layout))
+
+    originalMaze = distance.maze
+    distance.maze = countedMaze
+
+    try:
+        startTime = time.perf_counter()
+        path = search.aStarSearch(problem, searchAgents.foodHeuristic)
+        searchTime = time.perf_counter() - startTime
+    finally:
+        distance.maze = originalMaze
+
+    return path, problem.getExpandedCount(), calls[0], searchTime, mazeTime[0]
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+    parser.add_argument('layouts', nargs = '*', default = DEFAULT_LAYOUTS,
+            help = 'layouts to search (default: %(default)s)')
+    options = parser.parse_args()
+
+    print('%-14s %6s %8s %8s %14s %14s %8s %14s %14s %8s' % ('layout', 'cost', 'expanded',
+            'calls', 'maze old (s)', 'maze new (s)', 'speedup',
+            'total old (s)', 'total new (s)', 'speedup'))
+
+    for name in options.layouts:
+        layout = getLayout(name)
+
+        legacy = run(layout, legacyMaze)
+        cached = run(layout, distance.maze)
+
+        if (legacy[:3] != cached[:3]):
+            raise ValueError('Search results differ on %s.' % (name))
+
+        print('%-14s %6d %8d %8d %14.3f %14.3f %7.1fx %14.3f %14.3f %7.1fx' % (name,
+                len(cached[0]), cached[1], cached[2],
+                legacy[4], cached[4], legacy[4] / cached[4],
+                legacy[3], cached[3], legacy[3] / cached[3]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the indexed priority queue (`pacai.util.priorityQueue.IndexedPriorityQueue`)
+against the heapq wrapper (`pacai.util.priorityQueue.PriorityQueue`) on large frontiers.
+
+Two workloads are run:
+Dijkstra's algorithm on a large grid with random step costs
+(the wrapper pushes duplicates and skips stale entries on pop,
+the indexed queue lowers priorities in place),
+and plain pushes followed by pops of random priorities.
+For Dijkstra, the pushes include lowered priorities and the peak size is the largest
+number of entries the wrapper held (stale ones included) or items the indexed queue held.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, ROOT_DIR)
+
+from pacai.util.priorityQueue import IndexedPriorityQueue  # noqa: E402
+from pacai.util.priorityQueue import PriorityQueue  # noqa: E402
+
+DEFAULT_SIZE = 300
+DEFAULT_ITEMS = 200000
+DEFAULT_SEED = 4
+MAX_COST = 9
+
+def makeGrid(size, rng):
+    """
+    Returns the (neighbor, cost) pairs of each cell of a size x size grid,
+    where every move has its own random cost.
+    """
+
+    grid = []
+    for cell in range(size * size):
+        x, y = cell % size, cell // size
+
+        neighbors = []
+        if (x > 0):
+            neighbors.append(cell - 1)
+        if (x < size - 1):
+            neighbors.append(cell + 1)
+        if (y > 0):
+            neighbors.append(cell - size)
+        if (y < size - 1):
+            neighbors.append(cell + size)
+
+        grid.append([(neighbor, rng.randint(1, MAX_COST)) for neighbor in neighbors])
+
+    return grid
+
+def dijkstraDuplicates(grid):
+    """
+    Returns the distances, the number of pushes (and decreases), and the largest frontier
+    (including stale entries).
+    """
+
+    distances = {0: 0}
+    done = set()
+    queue = PriorityQueue()
+    queue.push(0, 0)
+    pushes = 1
+    peak = 1
+
+    while (not queue.isEmpty()):
+        cell = queue.pop()
+        if (cell in done):
+            continue
+
+        done.add(cell)
+        for (neighbor, cost) in grid[cell]:
+            distance = distances[cell] + cost
+            if (neighbor not in done and distance < distances.get(neighbor, sys.maxsize)):
+                distances[neighbor] = distance
+                queue.push(neighbor, distance)
+                pushes += 1
+                peak = max(peak, len(queue))
+
+    return distances, pushes, peak
+
+def dijkstraIndexed(grid):
+    distances = {0: 0}
+    done = set()
+    queue = IndexedPriorityQueue()
+    queue.push(0, 0)
+    pushes = 1
+    peak = 1
+
+    while (not queue.isEmpty()):
+        cell = queue.pop()
+        done.add(cell)
+
+        for (neighbor, cost) in grid[cell]:
+            distance = distances[cell] + cost
+            if (neighbor not in done and distance < distances.get(neighbor, sys.maxsize)):
+                distances[neighbor] = distance
+                queue.update(neighbor, distance)
+                pushes += 1
+                peak = max(peak, len(queue))
+
+    return distances, pushes, peak
+
+def pushPop(queueClass, priorities):
+    queue = queueClass()
+    for (item, priority) in enumerate(priorities):
+        queue.push(item, priority)
+
+    return [queue.pop() for _ in range(len(priorities))]
+
+def timed(function, *args):
+    startTime = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - startTime, result
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type = int, default = DEFAULT_SIZE,
+            help = 'width and height of the Dijkstra grid (default: %(default)s)')
+    parser.add_argument('--items', type = int, default = DEFAULT_ITEMS,
+            help = 'number of items to push and pop (default: %(default)s)')
+    parser.add_argument('--seed', type = int, default = DEFAULT_SEED,
+            help = 'random seed (default: %(default)s)')
+    options = parser.parse_args()
+
+    rng = random.Random(options.seed)
+
+    grid = makeGrid(options.size, rng)
+    oldTime, (oldDistances, oldPushes, oldPeak) = timed(dijkstraDuplicates, grid)
+    newTime, (newDistances, newPushes, newPeak) = timed(dijkstraIndexed, grid)
+
+    if (oldDistances != newDistances):
+        raise ValueError('Dijkstra distances differ.')
+
+    priorities = [rng.randrange(options.items) for _ in range(options.items)]
+    oldPushPopTime, oldOrder = timed(pushPop, PriorityQueue, priorities)
+    newPushPopTime, newOrder = timed(pushPop, IndexedPriorityQueue, priorities)
+
+    if ([priorities[item] for item in oldOrder] != [priorities[item] for item in newOrder]):
+        raise ValueError('Pop orders differ.')
+
+    print('%-22s %10s %10s %10s %10s' % ('workload', 'queue', 'time (s)', 'pushes', 'peak size'))
+    print('%-22s %10s %10.3f %10d %10d' % ('dijkstra %dx%d' % (options.size, options.size),
+            'heapq', oldTime, oldPushes, oldPeak))
+    print('%-22s %10s %10.3f %10d %10d' % ('', 'indexed', newTime, newPushes, newPeak))
+    print('%-22s %10s %10.3f %10d %10d' % ('push/pop %d' % (options.items),
+            'heapq', oldPushPopTime, options.items, options.items))
+    print('%-22s %10s %10.3f %10d %10d' % ('', 'indexed', newPushPopTime,
+            options.items, options.items))
+
+if __name__ == '__main__':
+    main()
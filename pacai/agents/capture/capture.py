@@ -2,7 +2,6 @@ import abc
 
 from pacai.agents.base import BaseAgent
 from pacai.core import distanceCalculator
-from pacai.util import util
 
 class CaptureAgent(BaseAgent):
     """
@@ -13,7 +12,7 @@ class CaptureAgent(BaseAgent):
     and implement `CaptureAgent.chooseAction`.
     """
 
-    def __init__(self, index, timeForComputing = 0.1, **kwargs):
+    def __init__(self, index, timeForComputing = 0.1, compressedDistances = False, **kwargs):
         super().__init__(index, **kwargs)
 
         # Whether or not you're on the red team
@@ -31,6 +30,9 @@ class CaptureAgent(BaseAgent):
         # Time to spend each turn on computing maze distances
         self.timeForComputing = timeForComputing
 
+        # Only keep distances between junctions (see pacai.core.corridors).
+        self.compressedDistances = bool(compressedDistances)
+
     def registerInitialState(self, gameState):
         """
         This method handles the initial setup of the agent and populates useful fields,
@@ -38,10 +40,17 @@ class CaptureAgent(BaseAgent):
         """
 
         self.red = gameState.isOnRedTeam(self.index)
-        self.distancer = distanceCalculator.Distancer(gameState.getInitialLayout())
 
+        previousDistancer = self.distancer
+        self.distancer = distanceCalculator.Distancer(gameState.getInitialLayout(),
+                compressed = self.compressedDistances)
         self.distancer.getMazeDistances()
 
+        # Release the last game's distances only after taking this game's,
+        # so a layout played again is not rebuilt.
+        if (previousDistancer is not None):
+            previousDistancer.release()
+
     def final(self, gameState):
         self.observationHistory = []
 
@@ -65,9 +74,7 @@ class CaptureAgent(BaseAgent):
         self.observationHistory.append(gameState)
 
         myState = gameState.getAgentState(self.index)
-        myPos = myState.getPosition()
-
-        if (myPos != util.nearestPoint(myPos)):
+        if (not myState.isOnGridPoint()):
             # We're halfway from one position to the next.
             return gameState.getLegalActions(self.index)[0]
         else:
@@ -153,6 +160,15 @@ class CaptureAgent(BaseAgent):
         else:
             return gameState.getScore() * -1
 
+    def getMazeActions(self, pos1, pos2):
+        """
+        Returns the actions that start a shortest path from pos1 to pos2,
+        without generating any successors
+        (see `pacai.core.distanceCalculator.Distancer.getNextActions`).
+        """
+
+        return self.distancer.getNextActions(pos1, pos2)
+
     def getMazeDistance(self, pos1, pos2):
         """
         Returns the distance between two points using the builtin distancer.
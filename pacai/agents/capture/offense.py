@@ -1,14 +1,23 @@
 from pacai.agents.capture.reflex import ReflexCaptureAgent
+from pacai.core.distanceCalculator import DistanceField
 
 class OffensiveReflexAgent(ReflexCaptureAgent):
     """
     A reflex agent that seeks food.
     This agent will give you an idea of what an offensive agent might look like,
     but it is by no means the best or only way to build an offensive agent.
+
+    With `useDistanceField`, the distance to the nearest food is looked up in a
+    `pacai.core.distanceCalculator.DistanceField` (kept up to date as food is eaten)
+    instead of taking the minimum maze distance over all the food.
     """
 
-    def __init__(self, index, **kwargs):
-        super().__init__(index)
+    def __init__(self, index, useDistanceField = False, **kwargs):
+        super().__init__(index, **kwargs)
+
+        self.useDistanceField = bool(useDistanceField)
+        self._foodField = None
+        self._foodFieldSources = None
 
     def getFeatures(self, gameState, action):
         features = {}
@@ -21,13 +30,37 @@ class OffensiveReflexAgent(ReflexCaptureAgent):
         # This should always be True, but better safe than sorry.
         if (len(foodList) > 0):
             myPos = successor.getAgentState(self.index).getPosition()
-            minDistance = min([self.getMazeDistance(myPos, food) for food in foodList])
-            features['distanceToFood'] = minDistance
+            features['distanceToFood'] = self.getFoodDistance(successor, myPos, foodList)
 
         return features
 
+    def getFoodDistance(self, gameState, position, foodList):
+        """
+        Get the maze distance from a position to the nearest of the given food.
+        """
+
+        if (not self.useDistanceField):
+            return min(self.distancer.getDistances(position, foodList))
+
+        if (self._foodField is None):
+            self._foodField = DistanceField(gameState.getWalls())
+
+        # Only update the field when the food changes.
+        if (foodList != self._foodFieldSources):
+            self._foodField.setSources(foodList)
+            self._foodFieldSources = foodList
+
+        return self._foodField.getDistance(position)
+
     def getWeights(self, gameState, action):
         return {
             'successorScore': 100,
             'distanceToFood': -1
         }
+
+    def registerInitialState(self, gameState):
+        super().registerInitialState(gameState)
+
+        # The next game may be on a different layout.
+        self._foodField = None
+        self._foodFieldSources = None
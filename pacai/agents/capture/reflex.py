@@ -3,7 +3,6 @@ import random
 import time
 
 from pacai.agents.capture.capture import CaptureAgent
-from pacai.util import util
 
 class ReflexCaptureAgent(CaptureAgent):
     """
@@ -35,9 +34,7 @@ class ReflexCaptureAgent(CaptureAgent):
         """
 
         successor = gameState.generateSuccessor(self.index, action)
-        pos = successor.getAgentState(self.index).getPosition()
-
-        if (pos != util.nearestPoint(pos)):
+        if (not successor.getAgentState(self.index).isOnGridPoint()):
             # Only half a grid position was covered.
             return successor.generateSuccessor(self.index, action)
         else:
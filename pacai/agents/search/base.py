@@ -8,6 +8,7 @@ from pacai.core.gamestate import AbstractGameState
 from pacai.core.search.heuristic import null as nullHeuristic
 from pacai.core.search.position import PositionSearchProblem
 from pacai.core.search.problem import SearchProblem
+from pacai.core.search.stats import SearchStats
 from pacai.student.search import depthFirstSearch
 from pacai.util import reflection
 
@@ -25,7 +26,14 @@ class SearchAgent(BaseAgent):
             fn: Union[str, Callable[[SearchProblem], any]] = depthFirstSearch,
             prob: Union[str, Callable[[AbstractGameState], SearchProblem]] = PositionSearchProblem,
             heuristic: Union[str, Callable] = nullHeuristic,
+            searchStats = None, searchStatsLabels = None,
             **kwargs):
+        """
+        If searchStats is a path, then `pacai.core.search.stats.SearchStats` are collected
+        for the search and appended to that file as a line of JSON ('-' for stdout).
+        Any searchStatsLabels (a dict) are added to the stats.
+        """
+
         super().__init__(index, **kwargs)
 
         if isinstance(prob, str):
@@ -36,6 +44,10 @@ class SearchAgent(BaseAgent):
             self.searchType = prob
         logging.info('[SearchAgent] using problem type %s.' % (self.searchType))
 
+        # The heuristic bound to the search function (if any).
+        self._heuristic = None
+        self._searchFunctionName = fn
+
         if isinstance(fn, str):
             # Get the search function from the name and heuristic.
             self.searchFunction = self._fetchSearchFunction(fn, heuristic)
@@ -44,6 +56,9 @@ class SearchAgent(BaseAgent):
             self.searchFunction = fn
         logging.info('[SearchAgent] using function %s.' % (self.searchFunction))
 
+        self.searchStats = searchStats
+        self.searchStatsLabels = dict(searchStatsLabels or {})
+
         # The actions the search produced.
         self._actions = []
 
@@ -65,10 +80,30 @@ class SearchAgent(BaseAgent):
         starttime = time.time()
         problem = self.searchType(state)  # Makes a new search problem.
 
-        self._actions = self.searchFunction(problem)  # Find a path.
-        self._actionIndex = 0
+        stats = None
+        heuristic = self._heuristic
+        if (self.searchStats is not None):
+            stats = self._startStats(problem)
 
-        totalCost = problem.actionsCost(self._actions)
+        try:
+            actions = self.searchFunction(problem)  # Find a path.
+        finally:
+            self._heuristic = heuristic
+
+        if (stats is not None):
+            stats.stop()
+
+        totalCost = problem.actionsCost(actions)
+
+        if (stats is not None):
+            stats.setResult(actions, totalCost)
+            stats.dump(self.searchStats)
+
+        self._actions = actions
+        if (actions is not None):
+            # Some problems take several moves per action.
+            self._actions = problem.expandActions(actions)
+        self._actionIndex = 0
 
         state.setHighlightLocations(problem.getVisitHistory())
 
@@ -91,6 +126,27 @@ class SearchAgent(BaseAgent):
 
         return action
 
+    def _startStats(self, problem):
+        """
+        Attach new stats to a problem (and the heuristic), and start them.
+        """
+
+        labels = {
+            'function': _getName(self._searchFunctionName),
+            'heuristic': _getName(self._heuristic),
+            'problem': _getName(self.searchType),
+        }
+        labels.update(self.searchStatsLabels)
+
+        stats = SearchStats(**labels)
+        stats.attach(problem)
+
+        if (self._heuristic is not None):
+            self._heuristic = stats.wrapHeuristic(self._heuristic)
+
+        stats.start()
+        return stats
+
     def _fetchSearchFunction(self, functionName: str, heuristic: Union[str, Callable]):
         """
         Get the specified search function by name.
@@ -112,5 +168,19 @@ class SearchAgent(BaseAgent):
         logging.info('[SearchAgent] using function %s and heuristic %s.' %
                 (functionName, heuristic))
 
-        # Bind the heuristic.
-        return lambda x: function(x, heuristic = heuristic)
+        # Bind the heuristic (through the agent, so it can be wrapped for stats).
+        self._heuristic = heuristic
+        return lambda x: function(x, heuristic = self._heuristic)
+
+def _getName(value):
+    """
+    Get the full name of a function or class (for labeling stats).
+    """
+
+    if (value is None or isinstance(value, str)):
+        return value
+
+    if (hasattr(value, '__qualname__')):
+        return '%s.%s' % (value.__module__, value.__qualname__)
+
+    return str(value)
@@ -9,6 +9,7 @@ import logging
 import os
 import pickle
 import random
+import struct
 import sys
 
 from pacai.agents import keyboard
@@ -18,7 +19,7 @@ from pacai.core.actions import Actions
 from pacai.core.distance import manhattan
 from pacai.core.game import Game
 from pacai.core.gamestate import AbstractGameState
-from pacai.core.grid import Grid
+from pacai.core.grid import BitGrid
 from pacai.core.layout import Layout
 from pacai.core.layout import getLayout
 from pacai.ui.capture.null import CaptureNullView
@@ -27,7 +28,6 @@ from pacai.util import reflection
 from pacai.util.logs import initLogging
 from pacai.util.logs import updateLoggingLevel
 from pacai.util.mazeGenerator import generateMaze
-from pacai.util.util import nearestPoint
 
 COLLISION_TOLERANCE = 0.7  # How close ghosts must be to Pacman to kill
 
@@ -38,6 +38,9 @@ MIN_FOOD = 2
 
 SCARED_TIME = 40
 
+# The time left, appended to the common game state bytes.
+BYTES_TIMELEFT = struct.Struct('<i')
+
 class CaptureGameState(AbstractGameState):
     """
     A game state specific to capture.
@@ -68,28 +71,19 @@ class CaptureGameState(AbstractGameState):
                 self._blueTeam.append(agentIndex)
 
         # Build some denormalized structures for fast access.
+        self._splitBySide()
 
-        self._redCapsules = []
-        self._blueCapsules = []
-
-        for capsule in self.getCapsules():
-            if (self.isOnRedSide(capsule)):
-                self._redCapsules.append(capsule)
-            else:
-                self._blueCapsules.append(capsule)
-
-        self._redFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
-        self._blueFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
+    @staticmethod
+    def fromBytes(layout, data):
+        """
+        Decode a state encoded with `CaptureGameState.toBytes` on the same layout.
+        """
 
-        for x in range(self._food.getWidth()):
-            for y in range(self._food.getHeight()):
-                if (not self._food[x][y]):
-                    continue
+        state = CaptureGameState(layout, 0)
+        if (state._loadBytes(data) != len(data)):
+            raise ValueError('Game state data has trailing bytes.')
 
-                if (self.isOnRedSide((x, y))):
-                    self._redFood[x][y] = True
-                else:
-                    self._blueFood[x][y] = True
+        return state
 
     # Override
     def generateSuccessor(self, agentIndex, action):
@@ -124,16 +118,24 @@ class CaptureGameState(AbstractGameState):
 
     # Override
     def eatFood(self, x, y):
-        if (not self._foodCopied):
+        # The base class marks the food as copied.
+        foodCopied = self._foodCopied
+
+        if (not super().eatFood(x, y)):
+            return False
+
+        if (not foodCopied):
             self._redFood = self._redFood.copy()
             self._blueFood = self._blueFood.copy()
 
-        super().eatFood(x, y)
-
         if (self.isOnRedSide((x, y))):
             self._redFood[x][y] = False
+            self._numRedFood -= 1
         else:
             self._blueFood[x][y] = False
+            self._numBlueFood -= 1
+
+        return True
 
     def getBlueCapsules(self):
         """
@@ -161,6 +163,20 @@ class CaptureGameState(AbstractGameState):
 
         return self._blueTeam
 
+    def getNumBlueFood(self):
+        """
+        Get the amount of food left on the blue side.
+        """
+
+        return self._numBlueFood
+
+    def getNumRedFood(self):
+        """
+        Get the amount of food left on the red side.
+        """
+
+        return self._numRedFood
+
     def getRedCapsules(self):
         """
         Get a list of remaining capsules on the red side.
@@ -224,21 +240,91 @@ class CaptureGameState(AbstractGameState):
 
         return self._teams[agentIndex]
 
-    def _applySuccessorAction(self, agentIndex, action):
+    # Override
+    def toBytes(self):
+        """
+        See `pacai.core.gamestate.AbstractGameState.toBytes`.
+        Capture states also include the time left.
+        """
+
+        return super().toBytes() + BYTES_TIMELEFT.pack(self._timeleft)
+
+    # Override
+    def toKey(self):
+        """
+        See `pacai.core.gamestate.AbstractGameState.toKey`.
+        Equality ignores the time left, so the key leaves it out.
+        """
+
+        return super().toBytes()
+
+    # Override
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
         """
         Apply the action to the context state (self).
         """
 
         # Find appropriate rules for the agent.
-        AgentRules.applyAction(self, action, agentIndex)
+        AgentRules.applyAction(self, action, agentIndex, validate = validate)
         AgentRules.checkDeath(self, agentIndex)
-        AgentRules.decrementTimer(self.getAgentState(agentIndex))
+        AgentRules.decrementTimer(self.getMutableAgentState(agentIndex))
 
         # Book keeping.
         self._lastAgentMoved = agentIndex
         self._timeleft -= 1
 
-        self._hash = None
+    # Override
+    def _getUndoRecord(self):
+        return (super()._getUndoRecord(), self._timeleft,
+                self._redFood, self._blueFood, self._numRedFood, self._numBlueFood,
+                self._redCapsules, self._blueCapsules)
+
+    # Override
+    def _loadBytes(self, data):
+        offset = super()._loadBytes(data)
+        if (len(data) < offset + BYTES_TIMELEFT.size):
+            raise ValueError('Game state data is truncated.')
+
+        (self._timeleft, ) = BYTES_TIMELEFT.unpack_from(data, offset)
+        self._splitBySide()
+
+        return offset + BYTES_TIMELEFT.size
+
+    # Override
+    def _restoreUndoRecord(self, record):
+        (baseRecord, self._timeleft,
+                self._redFood, self._blueFood, self._numRedFood, self._numBlueFood,
+                self._redCapsules, self._blueCapsules) = record
+
+        super()._restoreUndoRecord(baseRecord)
+
+    def _splitBySide(self):
+        """
+        Split the capsules and food into the red and blue sides.
+        """
+
+        self._redCapsules = []
+        self._blueCapsules = []
+
+        for capsule in self.getCapsules():
+            if (self.isOnRedSide(capsule)):
+                self._redCapsules.append(capsule)
+            else:
+                self._blueCapsules.append(capsule)
+
+        # The red side is the columns left of the middle,
+        # which are the low bits of the food grid.
+        width = self._food.getWidth()
+        height = self._food.getHeight()
+        redMask = (1 << (int(width / 2) * height)) - 1
+
+        bits = self._food.getBits()
+        self._redFood = BitGrid.fromBits(width, height, bits & redMask)
+        self._blueFood = BitGrid.fromBits(width, height, bits & ~redMask)
+
+        # Running counts of the food on each side.
+        self._numRedFood = self._redFood.count()
+        self._numBlueFood = self._blueFood.count()
 
 class CaptureRules:
     """
@@ -255,8 +341,8 @@ class CaptureRules:
         game.state = initState
         game.length = length
 
-        self._totalBlueFood = initState.getBlueFood().count()
-        self._totalRedFood = initState.getRedFood().count()
+        self._totalBlueFood = initState.getNumBlueFood()
+        self._totalRedFood = initState.getNumRedFood()
 
         return game
 
@@ -279,10 +365,10 @@ class CaptureRules:
         redWin = False
         blueWin = False
 
-        if (state.getRedFood().count() <= MIN_FOOD):
+        if (state.getNumRedFood() <= MIN_FOOD):
             logging.info("The Blue team ate all but %d of the opponents' dots." % MIN_FOOD)
             blueWin = True
-        elif (state.getBlueFood().count() <= MIN_FOOD):
+        elif (state.getNumBlueFood() <= MIN_FOOD):
             logging.info("The Red team ate all but %d of the opponents' dots." % MIN_FOOD)
             redWin = True
         else:
@@ -342,20 +428,22 @@ class AgentRules:
         """
 
         agentState = state.getAgentState(agentIndex)
-        return Actions.getPossibleActions(agentState.getPosition(), agentState.getDirection(),
-                state.getWalls())
+        return list(state.getMoveTable().getPossibleActions(agentState.getPosition(),
+                agentState.getDirection()))
 
     @staticmethod
-    def applyAction(state, action, agentIndex):
+    def applyAction(state, action, agentIndex, validate = True):
         """
         Edits the state to reflect the results of the action.
         """
 
-        legal = AgentRules.getLegalActions(state, agentIndex)
-        if (action not in legal):
-            raise ValueError('Illegal action: ' + str(action))
+        agentState = state.getMutableAgentState(agentIndex)
 
-        agentState = state.getAgentState(agentIndex)
+        if (validate):
+            legal = state.getMoveTable().getPossibleActions(agentState.getPosition(),
+                    agentState.getDirection())
+            if (action not in legal):
+                raise ValueError('Illegal action: ' + str(action))
 
         # Update position.
         vector = Actions.directionToVector(action, AgentRules.AGENT_SPEED)
@@ -363,15 +451,14 @@ class AgentRules:
 
         # Eat.
         nextPosition = agentState.getPosition()
-        nearest = nearestPoint(nextPosition)
+        nearest = agentState.getNearestPosition()
         if (agentState.isPacman() and manhattan(nearest, nextPosition) <= 0.9):
             AgentRules.consume(nearest, state, state.isOnRedTeam(agentIndex))
 
         # Potentially change agent type.
-        if (nextPosition == nearest):
+        if (agentState.isOnGridPoint()):
             # Agents are pacmen when they are not on their own side.
-            position = agentState.getPosition()
-            agentState.setIsPacman(state.isOnRedTeam(agentIndex) != state.isOnRedSide(position))
+            agentState.setIsPacman(state.isOnRedTeam(agentIndex) != state.isOnRedSide(nearest))
 
     @staticmethod
     def consume(position, state, isRed):
@@ -392,8 +479,8 @@ class AgentRules:
             else:
                 state.addScore(-FOOD_POINTS)
 
-            if ((isRed and state.getBlueFood().count() <= MIN_FOOD)
-                    or (not isRed and state.getRedFood().count() <= MIN_FOOD)):
+            if ((isRed and state.getNumBlueFood() <= MIN_FOOD)
+                    or (not isRed and state.getNumRedFood() <= MIN_FOOD)):
                 state.endGame(True)
 
             return
@@ -414,7 +501,7 @@ class AgentRules:
                 otherTeam = state.getRedTeamIndices()
 
             for agentIndex in otherTeam:
-                state.getAgentState(agentIndex).setScaredTimer(SCARED_TIME)
+                state.getMutableAgentState(agentIndex).setScaredTimer(SCARED_TIME)
 
     @staticmethod
     def decrementTimer(agentState):
@@ -444,21 +531,18 @@ class AgentRules:
             if (agentState.isPacman() == otherAgentState.isPacman()):
                 continue
 
-            otherPosition = otherAgentState.getPosition()
-
             # Ignore other agents that are too far away.
-            if (otherPosition is None
-                    or manhattan(otherPosition, agentState.getPosition()) > COLLISION_TOLERANCE):
+            if (not otherAgentState.isWithinDistance(agentState, COLLISION_TOLERANCE)):
                 continue
 
             # If we are a brave ghost or they are a scared ghost, then we will eat them.
             # Otherwise, we are being eatten.
             if (agentState.isBraveGhost() or otherAgentState.isScaredGhost()):
                 state.addScore(teamPointModifier * KILL_POINTS)
-                otherAgentState.respawn()
+                state.getMutableAgentState(otherAgentIndex).respawn()
             else:
                 state.addScore(teamPointModifier * -KILL_POINTS)
-                agentState.respawn()
+                state.getMutableAgentState(agentIndex).respawn()
 
 #############################
 # FRAMEWORK TO START A GAME #
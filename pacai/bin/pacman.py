@@ -27,7 +27,6 @@ from pacai.ui.pacman.null import PacmanNullView
 from pacai.ui.pacman.text import PacmanTextView
 from pacai.util.logs import initLogging
 from pacai.util.logs import updateLoggingLevel
-from pacai.util.util import nearestPoint
 
 PACMAN_AGENT_INDEX = 0
 
@@ -49,6 +48,19 @@ class PacmanGameState(AbstractGameState):
     def __init__(self, layout):
         super().__init__(layout)
 
+    @staticmethod
+    def fromBytes(layout, data):
+        """
+        Decode a state encoded with `pacai.core.gamestate.AbstractGameState.toBytes`
+        on the same layout.
+        """
+
+        state = PacmanGameState(layout)
+        if (state._loadBytes(data) != len(data)):
+            raise ValueError('Game state data has trailing bytes.')
+
+        return state
+
     # Override
     def generateSuccessor(self, agentIndex, action):
         """
@@ -118,23 +130,24 @@ class PacmanGameState(AbstractGameState):
 
         return self._agentStates[PACMAN_AGENT_INDEX]
 
-    def _applySuccessorAction(self, agentIndex, action):
+    # Override
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
         """
         Apply the action to the context state (self).
         """
 
         # Let the agent's logic deal with its action's effects on the board.
         if (agentIndex == PACMAN_AGENT_INDEX):
-            PacmanRules.applyAction(self, action)
+            PacmanRules.applyAction(self, action, validate = validate)
         else:
-            GhostRules.applyAction(self, action, agentIndex)
+            GhostRules.applyAction(self, action, agentIndex, validate = validate)
 
         # Time passes.
         if (agentIndex == PACMAN_AGENT_INDEX):
             # Penalty for waiting around.
             self.addScore(-TIME_PENALTY)
         else:
-            GhostRules.decrementTimer(self.getAgentState(agentIndex))
+            GhostRules.decrementTimer(self.getMutableAgentState(agentIndex))
 
         # Resolve multi-agent effects.
         GhostRules.checkDeath(self, agentIndex)
@@ -142,8 +155,6 @@ class PacmanGameState(AbstractGameState):
         # Book keeping.
         self._lastAgentMoved = agentIndex
 
-        self._hash = None
-
 class ClassicGameRules(object):
     """
     These game rules manage the control flow of a game, deciding when
@@ -217,20 +228,22 @@ class PacmanRules:
         """
 
         agentState = state.getPacmanState()
-        return Actions.getPossibleActions(agentState.getPosition(), agentState.getDirection(),
-                state.getWalls())
+        return list(state.getMoveTable().getPossibleActions(agentState.getPosition(),
+                agentState.getDirection()))
 
     @staticmethod
-    def applyAction(state, action):
+    def applyAction(state, action, validate = True):
         """
         Edits the state to reflect the results of the action.
         """
 
-        legal = PacmanRules.getLegalActions(state)
-        if (action not in legal):
-            raise ValueError('Illegal pacman action: ' + str(action))
+        pacmanState = state.getMutableAgentState(PACMAN_AGENT_INDEX)
 
-        pacmanState = state.getPacmanState()
+        if (validate):
+            legal = state.getMoveTable().getPossibleActions(pacmanState.getPosition(),
+                    pacmanState.getDirection())
+            if (action not in legal):
+                raise ValueError('Illegal pacman action: ' + str(action))
 
         # Update position.
         vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
@@ -238,7 +251,7 @@ class PacmanRules:
 
         # Eat.
         nextPosition = pacmanState.getPosition()
-        nearest = nearestPoint(nextPosition)
+        nearest = pacmanState.getNearestPosition()
         if (manhattan(nearest, nextPosition) <= 0.5):
             # Remove food
             PacmanRules.consume(nearest, state)
@@ -260,8 +273,8 @@ class PacmanRules:
             state.eatCapsule(x, y)
 
             # Reset all ghosts' scared timers.
-            for ghostState in state.getGhostStates():
-                ghostState.setScaredTimer(SCARED_TIME)
+            for index in state.getGhostIndexes():
+                state.getMutableAgentState(index).setScaredTimer(SCARED_TIME)
 
 class GhostRules:
     """
@@ -278,8 +291,8 @@ class GhostRules:
         """
 
         agentState = state.getGhostState(ghostIndex)
-        possibleActions = Actions.getPossibleActions(agentState.getPosition(),
-                agentState.getDirection(), state.getWalls())
+        possibleActions = list(state.getMoveTable().getPossibleActions(agentState.getPosition(),
+                agentState.getDirection()))
         reverse = Actions.reverseDirection(agentState.getDirection())
 
         if (Directions.STOP in possibleActions):
@@ -291,12 +304,13 @@ class GhostRules:
         return possibleActions
 
     @staticmethod
-    def applyAction(state, action, ghostIndex):
-        legal = GhostRules.getLegalActions(state, ghostIndex)
-        if (action not in legal):
-            raise ValueError('Illegal ghost action: ' + str(action))
+    def applyAction(state, action, ghostIndex, validate = True):
+        if (validate):
+            legal = GhostRules.getLegalActions(state, ghostIndex)
+            if (action not in legal):
+                raise ValueError('Illegal ghost action: ' + str(action))
 
-        ghostState = state.getGhostState(ghostIndex)
+        ghostState = state.getMutableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if (ghostState.isScared()):
             speed /= 2.0
@@ -316,24 +330,22 @@ class GhostRules:
 
     @staticmethod
     def checkDeath(state, agentIndex):
-        pacmanPosition = state.getPacmanPosition()
+        pacmanState = state.getPacmanState()
 
         # Did pacman just move?
         if (agentIndex == PACMAN_AGENT_INDEX):
             # See if a ghost can kill pacman.
             for index in state.getGhostIndexes():
                 ghostState = state.getGhostState(index)
-                ghostPosition = ghostState.getPosition()
 
-                if (GhostRules.canKill(pacmanPosition, ghostPosition)):
+                if (ghostState.isWithinDistance(pacmanState, COLLISION_TOLERANCE)):
                     GhostRules.collide(state, ghostState, index)
 
             return
         else:
             # A ghost just moved.
             ghostState = state.getGhostState(agentIndex)
-            ghostPosition = ghostState.getPosition()
-            if (GhostRules.canKill(pacmanPosition, ghostPosition)):
+            if (ghostState.isWithinDistance(pacmanState, COLLISION_TOLERANCE)):
                 GhostRules.collide(state, ghostState, agentIndex)
 
     @staticmethod
@@ -341,7 +353,7 @@ class GhostRules:
         if (ghostState.isScared()):
             # Pacman ate a ghost.
             state.addScore(GHOST_POINTS)
-            ghostState.respawn()
+            state.getMutableAgentState(agentIndex).respawn()
         elif (not state.isOver()):
             # A ghost ate pacman.
             state.addScore(LOSE_POINTS)
@@ -410,6 +422,11 @@ def readCommand(argv):
             help = 'comma separated arguments to be passed to agents (e.g. \'opt1=val1,opt2\')'
                 + '(default: %(default)s)')
 
+    parser.add_argument('--search-stats', dest = 'searchStats',
+            action = 'store', type = str, default = None,
+            help = 'append statistics (as JSON) about the search of a SearchAgent to the named '
+                + 'file, or \'-\' for stdout (default: %(default)s)')
+
     parser.add_argument('--timeout', dest = 'timeout',
             action = 'store', type = int, default = 30,
             help = 'maximum time limit (seconds) an agent can spend computing per game '
@@ -448,6 +465,9 @@ def readCommand(argv):
         raise ValueError('Keyboard agents require graphics.')
 
     agentOpts = parseAgentArgs(options.agentArgs)
+    if (options.searchStats is not None):
+        agentOpts['searchStats'] = options.searchStats
+        agentOpts['searchStatsLabels'] = {'layout': options.layout}
     if options.numTraining > 0:
         args['numTraining'] = options.numTraining
         if 'numTraining' not in agentOpts:
@@ -9,41 +9,89 @@ class AgentState:
     The convention for positions, like a graph, is that (0, 0) is the lower left corner,
     x increases horizontally and y increases vertically.
     Therefore, north is the direction of increasing y, or (0, 1).
+
+    Agents can only ever be on a grid point or halfway between two (when moving at half speed).
+    So internally, positions are kept as integer half steps (twice the actual position).
+    The public position tuples are derived from the half steps whenever the agent moves,
+    so the accessors do not need to build anything.
+
+    Agent states are copied for every successor an agent moves in,
+    so they use slots to keep each copy small and cheap to make.
     """
 
+    __slots__ = (
+        '_startPosition', '_startDirection', '_startIsPacman',
+        '_direction', '_isPacman', '_scaredTimer',
+        '_halfPosition', '_position', '_intPosition',
+        '_hash',
+    )
+
     def __init__(self, position, direction, isPacman):
         # Save the starting information for later use.
         self._startPosition = position
         self._startDirection = direction
         self._startIsPacman = isPacman
 
-        self._position = position
         self._direction = direction
 
         self._isPacman = isPacman
         self._scaredTimer = 0
 
+        self._halfPosition = _toHalfSteps(position)
+        self._position = _fromHalfSteps(self._halfPosition)
+        self._intPosition = _truncateHalfSteps(self._halfPosition)
+
+        # A running Zobrist hash of the fields used in equality.
+        # Every setter XORs the key for the old value out and the key for the new value in.
+        self._hash = (util.zobristKey('position', self._halfPosition)
+                ^ util.zobristKey('direction', direction)
+                ^ util.zobristKey('isPacman', isPacman)
+                ^ util.zobristKey('scaredTimer', 0))
+
     def copy(self):
-        state = AgentState(self._startPosition, self._startDirection, self._startIsPacman)
+        # Skip the constructor, since every field (including the hash) is copied over.
+        state = AgentState.__new__(AgentState)
+
+        state._startPosition = self._startPosition
+        state._startDirection = self._startDirection
+        state._startIsPacman = self._startIsPacman
 
         state._isPacman = self._isPacman
+        state._halfPosition = self._halfPosition
         state._position = self._position
+        state._intPosition = self._intPosition
         state._direction = self._direction
         state._scaredTimer = self._scaredTimer
+        state._hash = self._hash
 
         return state
 
     def decrementScaredTimer(self):
-        self._scaredTimer = max(0, self._scaredTimer - 1)
+        self.setScaredTimer(max(0, self._scaredTimer - 1))
 
     def getDirection(self):
         return self._direction
 
+    def getHalfPosition(self):
+        """
+        Get the position of this agent in integer half steps (twice the actual position).
+        """
+
+        return self._halfPosition
+
+    def getIntPosition(self):
+        """
+        Get the position of this agent with each coordinate truncated to an int.
+        """
+
+        return self._intPosition
+
     def getPosition(self):
         return self._position
 
     def getNearestPosition(self):
-        return util.nearestPoint(self._position)
+        hx, hy = self._halfPosition
+        return ((hx + 1) >> 1, (hy + 1) >> 1)
 
     def getScaredTimer(self):
         return self._scaredTimer
@@ -58,6 +106,14 @@ class AgentState:
     def isGhost(self):
         return not self.isPacman()
 
+    def isOnGridPoint(self):
+        """
+        Check if this agent is exactly on a grid point (and not halfway between two).
+        """
+
+        hx, hy = self._halfPosition
+        return ((hx | hy) & 1) == 0
+
     def isPacman(self):
         return self._isPacman
 
@@ -67,10 +123,55 @@ class AgentState:
     def isScaredGhost(self):
         return (self.isGhost() and self.isScared())
 
+    def isWithinDistance(self, other, distance):
+        """
+        Check if the manhattan distance between this agent and another agent is at most
+        the given distance.
+        The check is done on the integer half step positions.
+        """
+
+        hx, hy = self._halfPosition
+        otherx, othery = other._halfPosition
+
+        return abs(hx - otherx) + abs(hy - othery) <= 2 * distance
+
+    def setDirection(self, direction):
+        if (direction == self._direction):
+            return
+
+        self._hash ^= (util.zobristKey('direction', self._direction)
+                ^ util.zobristKey('direction', direction))
+        self._direction = direction
+
+    def setHalfPosition(self, halfPosition):
+        """
+        Move the agent to the given position in integer half steps (see getHalfPosition()).
+        """
+
+        if (halfPosition == self._halfPosition):
+            return
+
+        self._hash ^= (util.zobristKey('position', self._halfPosition)
+                ^ util.zobristKey('position', halfPosition))
+
+        self._halfPosition = halfPosition
+        self._position = _fromHalfSteps(halfPosition)
+        self._intPosition = _truncateHalfSteps(halfPosition)
+
     def setIsPacman(self, isPacman):
+        if (isPacman == self._isPacman):
+            return
+
+        self._hash ^= (util.zobristKey('isPacman', self._isPacman)
+                ^ util.zobristKey('isPacman', isPacman))
         self._isPacman = isPacman
 
     def setScaredTimer(self, timer):
+        if (timer == self._scaredTimer):
+            return
+
+        self._hash ^= (util.zobristKey('scaredTimer', self._scaredTimer)
+                ^ util.zobristKey('scaredTimer', timer))
         self._scaredTimer = timer
 
     def snapToNearestPoint(self):
@@ -78,44 +179,45 @@ class AgentState:
         Move the agent to the nearest point to its current location.
         """
 
-        self._position = util.nearestPoint(self._position)
+        hx, hy = self._halfPosition
+        self.setHalfPosition(((hx + 1) >> 1 << 1, (hy + 1) >> 1 << 1))
 
     def respawn(self):
         """
         This agent was killed, respawn it at the start as a pacman.
         """
 
-        self._position = self._startPosition
-        self._direction = self._startDirection
-        self._isPacman = self._startIsPacman
-        self._scaredTimer = 0
+        self.setHalfPosition(_toHalfSteps(self._startPosition))
+        self.setDirection(self._startDirection)
+        self.setIsPacman(self._startIsPacman)
+        self.setScaredTimer(0)
 
     def updatePosition(self, vector):
         """
         Update the position and direction with the given movement vector.
         """
 
-        x, y = self._position
+        hx, hy = self._halfPosition
         dx, dy = vector
 
-        self._position = (x + dx, y + dy)
+        self.setHalfPosition((hx + int(dx * 2), hy + int(dy * 2)))
 
         direction = Actions.vectorToDirection(vector)
         if (direction != Directions.STOP):
             # If this is a zero vector, face the same direction as before.
-            self._direction = direction
+            self.setDirection(direction)
 
     def __eq__(self, other):
         if (other is None):
             return False
 
-        return (self._position == other._position
+        return (self._halfPosition == other._halfPosition
                 and self._direction == other._direction
                 and self._isPacman == other._isPacman
                 and self._scaredTimer == other._scaredTimer)
 
     def __hash__(self):
-        return util.buildHash(self._position, self._direction, self._isPacman, self._scaredTimer)
+        return self._hash
 
     def __str__(self):
         typeString = 'Ghost'
@@ -128,3 +230,31 @@ class AgentState:
 
         return "%s%s: Position: %s, Direction: %s" % (typeString, scaredString,
                 str(self._position), str(self._direction))
+
+def _toHalfSteps(position):
+    x, y = position
+    return (int(x * 2), int(y * 2))
+
+def _fromHalfSteps(halfPosition):
+    """
+    Convert half steps back to a position.
+    Coordinates on a grid line are ints, and coordinates between grid lines are floats.
+    """
+
+    hx, hy = halfPosition
+
+    if (hx & 1):
+        x = hx / 2.0
+    else:
+        x = hx >> 1
+
+    if (hy & 1):
+        y = hy / 2.0
+    else:
+        y = hy >> 1
+
+    return (x, y)
+
+def _truncateHalfSteps(halfPosition):
+    hx, hy = halfPosition
+    return (hx >> 1, hy >> 1)
@@ -2,18 +2,20 @@ from pacai.util import reflection
 
 def createTeam(firstIndex, secondIndex, isRed,
         first = 'pacai.agents.capture.offense.OffensiveReflexAgent',
-        second = 'pacai.agents.capture.defense.DefensiveReflexAgent'):
+        second = 'pacai.agents.capture.defense.DefensiveReflexAgent', **kwargs):
     """
     This function should return a list of two agents that will form the capture team,
     initialized using firstIndex and secondIndex as their agent indexed.
     isRed is True if the red team is being created,
     and will be False if the blue team is being created.
+
+    Any other arguments (e.g. `--red-args useDistanceField`) are passed on to both agents.
     """
 
     firstAgent = reflection.qualifiedImport(first)
     secondAgent = reflection.qualifiedImport(second)
 
     return [
-        firstAgent(firstIndex),
-        secondAgent(secondIndex),
+        firstAgent(firstIndex, **kwargs),
+        secondAgent(secondIndex, **kwargs),
     ]
@@ -0,0 +1,212 @@
+"""
+A compressed view of a layout, where every corridor is contracted into a single weighted edge.
+"""
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+
+class CorridorGraph(object):
+    """
+    Most open cells in a maze are corridor cells, with exactly two open neighbors.
+    This graph only keeps the other cells (junctions and dead ends) as nodes,
+    and joins them with edges that stand for the corridors between them.
+    (A loop made only of corridor cells gets one of its cells as a node.)
+
+    Every edge keeps the full path of cells (endpoints included) and the actions along it,
+    so each corridor cell maps to an edge and an offset (the number of steps from the
+    edge's first node), and paths over the graph can be expanded back into single moves.
+
+    A graph is built once per `pacai.core.layout.Layout` (see `Layout.getCorridorGraph`),
+    and all of its structures are shared, so callers must not modify them.
+    """
+
+    def __init__(self, walls):
+        self._cells = walls.asList(False)
+
+        openCells = set(self._cells)
+        self._moves = {}
+        for (x, y) in self._cells:
+            moves = []
+            for direction in Directions.CARDINAL:
+                dx, dy = Actions.directionToVector(direction)
+                neighbor = (x + int(dx), y + int(dy))
+
+                if (neighbor in openCells):
+                    moves.append((direction, neighbor))
+
+            self._moves[(x, y)] = tuple(moves)
+
+        self._nodes = [cell for cell in self._cells if (len(self._moves[cell]) != 2)]
+        self._nodeIndexes = {node: index for (index, node) in enumerate(self._nodes)}
+
+        # [(first node, last node, cells, actions)], where cells includes both nodes.
+        self._edges = []
+        # For each node, the (edge, forward) pairs that leave it.
+        self._adjacency = [[] for _ in self._nodes]
+        # {corridor cell: (edge, offset)}
+        self._corridorCells = {}
+
+        self._buildEdges()
+
+        # Loops of corridor cells never reach a node, so give each of them one.
+        for cell in self._cells:
+            if (cell not in self._nodeIndexes and cell not in self._corridorCells):
+                self._nodeIndexes[cell] = len(self._nodes)
+                self._nodes.append(cell)
+                self._adjacency.append([])
+                self._buildEdges([cell])
+
+        self._adjacency = [tuple(edges) for edges in self._adjacency]
+
+    def getCells(self):
+        """
+        Get all the open cells (in the order of `walls.asList(False)`).
+        """
+
+        return self._cells
+
+    def getEdge(self, edge):
+        """
+        Get an edge as (first node, last node, cells, actions).
+        The cells run from the first node to the last (including both),
+        and the actions are the moves between them.
+        """
+
+        return self._edges[edge]
+
+    def getEdgeLocation(self, position):
+        """
+        Get the (edge, offset) of a corridor cell, or None for nodes and other positions.
+        """
+
+        return self._corridorCells.get(position)
+
+    def getNeighbors(self, position, stops = ()):
+        """
+        Get the (next position, actions, cost) for every way out of an open cell,
+        following each corridor to the node at its end.
+        If a corridor passes any of the stop positions, it ends at the first one instead.
+        The actions are a tuple of single moves, and the cost is the number of moves.
+        """
+
+        neighbors = []
+
+        nodeIndex = self._nodeIndexes.get(position)
+        if (nodeIndex is not None):
+            for (edge, forward) in self._adjacency[nodeIndex]:
+                length = len(self._edges[edge][3])
+                if (forward):
+                    neighbors.append(self._walk(edge, 0, length, stops))
+                else:
+                    neighbors.append(self._walk(edge, length, 0, stops))
+
+            return neighbors
+
+        location = self._corridorCells.get(position)
+        if (location is None):
+            return neighbors
+
+        (edge, offset) = location
+        neighbors.append(self._walk(edge, offset, len(self._edges[edge][3]), stops))
+        neighbors.append(self._walk(edge, offset, 0, stops))
+
+        return neighbors
+
+    def getNodeIndex(self, position):
+        """
+        Get the number of a node, or None if the position is not a node.
+        """
+
+        return self._nodeIndexes.get(position)
+
+    def getNodeEdges(self, nodeIndex):
+        """
+        Get the (edge, forward) pairs for the edges that leave a node.
+        Forward edges leave from their first node, others from their last.
+        A loop from a node back to itself shows up once each way.
+        """
+
+        return self._adjacency[nodeIndex]
+
+    def getNodes(self):
+        return self._nodes
+
+    def getNumEdges(self):
+        return len(self._edges)
+
+    def getNumNodes(self):
+        return len(self._nodes)
+
+    def isNode(self, position):
+        return (position in self._nodeIndexes)
+
+    def _buildEdges(self, nodes = None):
+        """
+        Follow every corridor out of the given nodes (all of them by default) to its other end.
+        """
+
+        if (nodes is None):
+            nodes = self._nodes
+
+        for node in nodes:
+            for (direction, neighbor) in self._moves[node]:
+                if (self._isWalked(node, direction)):
+                    continue
+
+                cells = [node, neighbor]
+                actions = [direction]
+
+                while (cells[-1] not in self._nodeIndexes):
+                    previous = cells[-2]
+                    for (nextDirection, nextCell) in self._moves[cells[-1]]:
+                        if (nextCell != previous):
+                            break
+
+                    cells.append(nextCell)
+                    actions.append(nextDirection)
+
+                edge = len(self._edges)
+                self._edges.append((node, cells[-1], tuple(cells), tuple(actions)))
+                self._adjacency[self._nodeIndexes[node]].append((edge, True))
+                self._adjacency[self._nodeIndexes[cells[-1]]].append((edge, False))
+
+                for offset in range(1, len(cells) - 1):
+                    self._corridorCells[cells[offset]] = (edge, offset)
+
+    def _isWalked(self, node, direction):
+        """
+        Check if the move out of a node in this direction already starts (or ends) an edge.
+        """
+
+        for (edge, forward) in self._adjacency[self._nodeIndexes[node]]:
+            (_, _, _, actions) = self._edges[edge]
+
+            if (forward and actions[0] == direction):
+                return True
+
+            if (not forward and Directions.REVERSE[actions[-1]] == direction):
+                return True
+
+        return False
+
+    def _walk(self, edge, start, end, stops):
+        """
+        Walk an edge from one offset towards another, stopping early at any of the stops.
+        Returns (position, actions, cost).
+        """
+
+        (_, _, cells, actions) = self._edges[edge]
+
+        for stop in stops:
+            location = self._corridorCells.get(stop)
+            if (location is None or location[0] != edge or location[1] == start):
+                continue
+
+            if (start < location[1] < end or end < location[1] < start):
+                end = location[1]
+
+        if (start < end):
+            return (cells[end], actions[start:end], end - start)
+
+        steps = tuple(Directions.REVERSE[action] for action in reversed(actions[end:start]))
+        return (cells[end], steps, start - end)
@@ -1,5 +1,4 @@
-from pacai.core.search.position import PositionSearchProblem
-from pacai.student import search
+from pacai.core import distanceCalculator
 
 def manhattan(position1, position2):
     """
@@ -17,25 +16,30 @@ def euclidean(position1, position2):
 
 def maze(position1, position2, gameState):
     """
-    Returns the maze distance between any two positions,
-    using the search functions you have already built.
+    Returns the maze distance between any two positions.
 
-    WARNING: `pacai.student.search.breadthFirstSearch` must already be implemted.
+    The distances come from a process-wide `pacai.core.distanceCalculator.LazyDistanceTable`
+    (see `pacai.core.distanceCalculator.getLazyTable`),
+    so the breadth-first search from a cell is only run the first time it is needed,
+    and its row of distances is shared by every caller (and every search) on that layout.
 
     Example usage: `distance.maze((2, 4), (5, 6), gameState)`.
     """
 
+    walls = gameState.getWalls()
+
+    table = distanceCalculator.getLazyTable(walls)
+    distance = table.getDistance(position1, position2)
+    if (distance is not None):
+        return distance
+
     x1, y1 = position1
     x2, y2 = position2
 
-    walls = gameState.getWalls()
-
     if (walls[x1][y1]):
         raise ValueError('Position1 is a wall: ' + str(position1))
 
     if (walls[x2][y2]):
         raise ValueError('Position2 is a wall: ' + str(position2))
 
-    prob = PositionSearchProblem(gameState, start = position1, goal = position2)
-
-    return len(search.breadthFirstSearch(prob))
+    raise ValueError('Positions are not open cells: ' + str((position1, position2)))
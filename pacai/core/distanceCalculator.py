@@ -1,10 +1,63 @@
+import array
+import collections
+import hashlib
+import heapq
+import itertools
+import logging
+import mmap
+import operator
+import os
+import struct
 import sys
+import tempfile
+import threading
+import time
 
-from pacai.core.distance import manhattan
-from pacai.util import priorityQueue
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core import distance
+from pacai.core.grid import BitGrid
 
 DEFAULT_DISTANCE = 10000
 
+# The value stored in a distance table for cells that can not reach each other.
+UNREACHABLE = 0xFFFF
+
+# The default memory budget for the rows of a `LazyDistanceTable`.
+DEFAULT_LAZY_MAX_BYTES = 16 * 1024 * 1024
+
+# The number of layouts that `getLazyTable` keeps tables for.
+MAX_LAZY_TABLES = 4
+
+# The default number of landmarks for a `LandmarkDistanceOracle`.
+DEFAULT_NUM_LANDMARKS = 16
+
+# The number of landmarks a `LandmarkDistanceOracle` checks during each query.
+DEFAULT_NUM_ACTIVE_LANDMARKS = 4
+
+# The cardinal actions for each bit mask in a `NextHopTable`
+# (bit i is the i-th action of Directions.CARDINAL).
+MASK_ACTIONS = tuple(tuple(direction for (bit, direction) in enumerate(Directions.CARDINAL)
+        if (mask & (1 << bit))) for mask in range(1 << len(Directions.CARDINAL)))
+
+# Set this environment variable to cache distance tables on disk (in the given directory).
+# The disk cache is off when it is unset or empty.
+CACHE_DIR_ENV = 'PACAI_DISTANCE_CACHE_DIR'
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_FILE_EXTENSION = '.dist'
+CACHE_TEMP_PREFIX = '.tmp-'
+
+# Temp files older than this (in seconds) were left behind by a crashed writer.
+CACHE_STALE_TEMP_SECONDS = 60 * 60
+
+# Magic, format version, byte order mark, width, height, and number of cells.
+# Native byte order is used, so the distances can be used straight from the file.
+CACHE_HEADER = struct.Struct('=4sHHIII')
+CACHE_MAGIC = b'PDST'
+CACHE_FORMAT_VERSION = 1
+CACHE_BYTE_ORDER_MARK = 0x0102
+
 class Distancer(object):
     """
     A class for computing and caching the shortest path between any two points in a given maze.
@@ -14,12 +67,31 @@ class Distancer(object):
     distancer = Distancer(gameState.getInitialLayout())
     distancer.getDistance((1, 1), (10, 10))
     ```
+
+    For large layouts, pass `lazy = True` to compute distances from each source
+    only when they are first asked for (see `LazyDistanceTable`).
+    Lazy distances are ready right away, and `maxBytes` bounds their memory.
+
+    Pass `compressed = True` to only store the distances between the junctions and dead ends
+    of the layout (see `CorridorDistanceTable`).
+    Compressed distances are also ready right away.
     """
 
-    def __init__(self, layout):
+    def __init__(self, layout, lazy = False, maxBytes = DEFAULT_LAZY_MAX_BYTES,
+            compressed = False):
         self._distances = None
+        self._nextHops = None
+        self._snaps = None
         self.dc = DistanceCalculator(layout, self)
 
+        if (lazy and compressed):
+            raise ValueError('Distances can not be both lazy and compressed.')
+
+        if (lazy):
+            self._distances = LazyDistanceTable(layout.walls, maxBytes)
+        elif (compressed):
+            self._distances = CorridorDistanceTable(layout.getCorridorGraph())
+
     def getMazeDistances(self):
         self.dc.run()
 
@@ -29,34 +101,153 @@ class Distancer(object):
         """
 
         if (self._distances is None):
-            return manhattan(pos1, pos2)
+            return distance.manhattan(pos1, pos2)
 
-        if isInt(pos1) and isInt(pos2):
-            return self.getDistanceOnGrid(pos1, pos2)
+        # Most queries are between grid points.
+        result = self._distances.getDistance(pos1, pos2)
+        if (result is not None):
+            return result
 
-        pos1Grids = getGrids2D(pos1)
-        pos2Grids = getGrids2D(pos2)
-        bestDistance = DEFAULT_DISTANCE
+        return self._getSnappedDistance(pos1, pos2)
 
-        for pos1Snap, snap1Distance in pos1Grids:
-            for pos2Snap, snap2Distance in pos2Grids:
-                gridDistance = self.getDistanceOnGrid(pos1Snap, pos2Snap)
-                distance = gridDistance + snap1Distance + snap2Distance
-                if bestDistance > distance:
-                    bestDistance = distance
+    def getDistanceOnGrid(self, pos1, pos2):
+        distance = self._distances.getDistance(pos1, pos2)
+        if (distance is None):
+            raise Exception("Position not in grid: " + str((pos1, pos2)))
 
-        return bestDistance
+        return distance
 
-    def getDistanceOnGrid(self, pos1, pos2):
-        key = (pos1, pos2)
-        if key in self._distances:
-            return self._distances[key]
+    def getDistances(self, source, targets):
+        """
+        Get the distance from the source to each of the targets (as a list).
+        This is the same as calling `Distancer.getDistance` for each target,
+        but the distances for the source are only located once.
+        """
+
+        if (self._distances is None):
+            return [distance.manhattan(source, target) for target in targets]
+
+        if (isinstance(self._distances, CorridorDistanceTable)):
+            # Compressed distances have no stored rows, so look up each target on its own.
+            return [self.getDistance(source, target) for target in targets]
+
+        sourceIndex = self._distances.getIndex(source)
+        if (sourceIndex is None):
+            return [self.getDistance(source, target) for target in targets]
+
+        if (self._snaps is None):
+            self._snaps = _buildSnaps(self._distances.getCells())
+
+        if (isinstance(self._distances, DistanceTable)):
+            # Index the flat table directly, instead of copying out the source's row.
+            row = self._distances.getDistances()
+            base = sourceIndex * self._distances.getNumCells()
+        else:
+            row = self._distances.getRow(sourceIndex)
+            base = 0
+
+        getIndex = self._distances.getIndex
+        distances = []
+
+        for target in targets:
+            index = getIndex(target)
+            if (index is not None):
+                value = row[base + index]
+                if (value == UNREACHABLE):
+                    value = sys.maxsize
+
+                distances.append(value)
+                continue
+
+            snaps = self._snaps.get(target)
+            if (snaps is None):
+                distances.append(self._getSnappedDistance(source, target))
+                continue
+
+            bestDistance = DEFAULT_DISTANCE
+            for (snap, snapDistance) in snaps:
+                gridDistance = row[base + getIndex(snap)]
+                if (gridDistance == UNREACHABLE):
+                    gridDistance = sys.maxsize
+
+                totalDistance = gridDistance + snapDistance
+                if (bestDistance > totalDistance):
+                    bestDistance = totalDistance
+
+            distances.append(bestDistance)
+
+        return distances
+
+    def getNextActions(self, pos1, pos2):
+        """
+        Get the cardinal actions that start a shortest path from pos1 to pos2
+        (see `NextHopTable.getActions`).
+        Returns None if the maze distances are not ready, or either position is not an open cell.
+        """
+
+        if (self._distances is None):
+            return None
+
+        if (self._nextHops is None):
+            self._nextHops = NextHopTable(self._distances)
+
+        return self._nextHops.getActions(pos1, pos2)
+
+    def getPath(self, pos1, pos2):
+        """
+        Get the actions along a shortest path from pos1 to pos2 (see `NextHopTable.getPath`).
+        Returns None if the maze distances are not ready, either position is not an open cell,
+        or the cells can not reach each other.
+        """
+
+        if (self._distances is None):
+            return None
+
+        if (self._nextHops is None):
+            self._nextHops = NextHopTable(self._distances)
 
-        raise Exception("Position not in grid: " + str(key))
+        return self._nextHops.getPath(pos1, pos2)
 
     def isReadyForMazeDistance(self):
         return (self._distances is not None)
 
+    def release(self):
+        """
+        Give back the shared distances taken by `Distancer.getMazeDistances`.
+        Afterwards, this distancer falls back to manhattan distances.
+        """
+
+        self.dc.release()
+
+    def _getSnappedDistance(self, pos1, pos2):
+        """
+        Get the distance between positions that may be between grid points,
+        as the best distance between the grid points around them
+        (plus the distance to those grid points).
+        """
+
+        if (self._snaps is None):
+            self._snaps = _buildSnaps(self._distances.getCells())
+
+        snaps1 = self._snaps.get(pos1)
+        if (snaps1 is None):
+            snaps1 = getGrids2D(pos1)
+
+        snaps2 = self._snaps.get(pos2)
+        if (snaps2 is None):
+            snaps2 = getGrids2D(pos2)
+
+        bestDistance = DEFAULT_DISTANCE
+
+        for pos1Snap, snap1Distance in snaps1:
+            for pos2Snap, snap2Distance in snaps2:
+                gridDistance = self.getDistanceOnGrid(pos1Snap, pos2Snap)
+                totalDistance = gridDistance + snap1Distance + snap2Distance
+                if bestDistance > totalDistance:
+                    bestDistance = totalDistance
+
+        return bestDistance
+
 def isInt(pos):
     x, y = pos
     return x == int(x) and y == int(y)
@@ -74,6 +265,26 @@ def getGrids1D(x):
         return [(x, 0)]
     return [(intX, x - intX), (intX + 1, intX + 1 - x)]
 
+def _buildSnaps(cells):
+    """
+    Precompute the grid points around every open cell and every half step between two open cells
+    (the positions agents can actually be at), in the same form as `getGrids2D`.
+    """
+
+    snaps = {}
+    openCells = set(cells)
+
+    for (x, y) in cells:
+        snaps[(x, y)] = (((x, y), 0),)
+
+        if ((x + 1, y) in openCells):
+            snaps[(x + 0.5, y)] = (((x, y), 0.5), ((x + 1, y), 0.5))
+
+        if ((x, y + 1) in openCells):
+            snaps[(x, y + 0.5)] = (((x, y), 0.5), ((x, y + 1), 0.5))
+
+    return snaps
+
 ##########################################
 # MACHINERY FOR COMPUTING MAZE DISTANCES #
 ##########################################
@@ -84,73 +295,1410 @@ class DistanceCalculator:
     def __init__(self, layout, distancer):
         self.layout = layout
         self.distancer = distancer
-        self.cache = {}
+        self._acquired = False
+
+    def release(self):
+        if (self._acquired):
+            self._acquired = False
+            self.distancer._distances = None
+            self.distancer._nextHops = None
+            self.distancer._snaps = None
+            getRegistry().release(self.layout.walls)
 
     def run(self):
-        if self.layout.walls not in self.cache:
-            self.cache[self.layout.walls] = computeDistances(self.layout)
+        if (self.distancer._distances is None):
+            self.distancer._distances = getRegistry().acquire(self.layout.walls)
+            self._acquired = True
+
+class DistanceTable(object):
+    """
+    The maze distances between every pair of open cells in a layout.
 
-        self.distancer._distances = self.cache[self.layout.walls]
+    Open cells are numbered (in the order of `walls.asList(False)`),
+    and the distances are kept in a single flat array of unsigned 16-bit ints,
+    where the distance between cells i and j is at index (i * numCells + j).
+    Since every move costs one, each row is filled with a plain breadth-first search.
 
-def computeDistances(layout):
+    Already computed distances (e.g. a memory-mapped file from a `DistanceCache`)
+    can be passed in instead, as any sequence of ints that supports indexing.
+    If those distances are a view of a buffer (e.g. an mmap),
+    pass the buffer as well so that `DistanceTable.close` can close it.
+    """
+
+    def __init__(self, walls, distances = None, buffer = None):
+        self._buffer = buffer
+        self._cells = walls.asList(False)
+        self._numCells = len(self._cells)
+        self._indexes = {cell: index for (index, cell) in enumerate(self._cells)}
+
+        if (distances is not None):
+            if (len(distances) != self._numCells ** 2):
+                raise ValueError('Expected %d distances, got %d.'
+                        % (self._numCells ** 2, len(distances)))
+
+            self._distances = distances
+            return
+
+        self._distances = array.array('H', [UNREACHABLE]) * (self._numCells ** 2)
+
+        neighbors = _buildNeighbors(self._cells, self._indexes)
+        for source in range(self._numCells):
+            _search(self._distances, source * self._numCells, source, neighbors)
+
+    def close(self):
+        """
+        Close the buffer that backs the distances (if there is one).
+        The table can not be used afterwards.
+        """
+
+        if (self._buffer is None):
+            return
+
+        try:
+            self._distances.release()
+            self._buffer.close()
+        except BufferError:
+            # Rows from `DistanceTable.getRow` are still in use,
+            # the buffer will be closed once they are collected.
+            pass
+
+        self._buffer = None
+
+    def getCells(self):
+        """
+        Get the open cells, in the order that they are numbered.
+        """
+
+        return self._cells
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the maze distance between two open cells.
+        Returns None if either position is not an open cell,
+        and sys.maxsize if the cells can not reach each other.
+        """
+
+        index1 = self._indexes.get(pos1)
+        index2 = self._indexes.get(pos2)
+
+        if (index1 is None or index2 is None):
+            return None
+
+        distance = self._distances[index1 * self._numCells + index2]
+        if (distance == UNREACHABLE):
+            return sys.maxsize
+
+        return distance
+
+    def getDistances(self):
+        """
+        Get the flat sequence of all distances.
+        The caller should not modify it.
+        """
+
+        return self._distances
+
+    def getIndex(self, position):
+        """
+        Get the number of an open cell, or None if the position is not an open cell.
+        """
+
+        return self._indexes.get(position)
+
+    def getNumCells(self):
+        return self._numCells
+
+    def getRow(self, index):
+        """
+        Get the distances from a (numbered) open cell to every open cell.
+        The caller should not modify it.
+        """
+
+        return self._distances[index * self._numCells:(index + 1) * self._numCells]
+
+class LazyDistanceTable(object):
     """
-    Runs UCS to all other positions from each position.
+    Maze distances that are computed one source at a time, as they are asked for.
+
+    The all-pairs `DistanceTable` is quadratic in the number of open cells,
+    which is too slow and too big for large layouts.
+    Instead, the first query from a cell runs a single breadth-first search from it
+    and keeps the resulting row.
+    Rows are evicted (least recently used first) to stay under `maxBytes`,
+    though at least one row is always kept.
     """
 
-    distances = {}
-    allNodes = layout.walls.asList(False)
+    def __init__(self, walls, maxBytes = DEFAULT_LAZY_MAX_BYTES):
+        self._cells = walls.asList(False)
+        self._numCells = len(self._cells)
+        self._indexes = {cell: index for (index, cell) in enumerate(self._cells)}
+        self._neighbors = _buildNeighbors(self._cells, self._indexes)
+
+        rowBytes = max(1, self._numCells) * array.array('H').itemsize
+        self._maxRows = max(1, maxBytes // rowBytes)
+
+        # {source index: row}, with the most recently used rows at the end.
+        self._rows = collections.OrderedDict()
+
+    def getCells(self):
+        """
+        Get the open cells, in the order that they are numbered.
+        """
+
+        return self._cells
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the maze distance between two open cells.
+        Returns None if either position is not an open cell,
+        and sys.maxsize if the cells can not reach each other.
+        """
 
-    for source in allNodes:
-        dist = {}
-        closed = {}
+        index1 = self._indexes.get(pos1)
+        index2 = self._indexes.get(pos2)
 
-        for node in allNodes:
-            dist[node] = sys.maxsize
+        if (index1 is None or index2 is None):
+            return None
 
-        queue = priorityQueue.PriorityQueue()
-        queue.push(source, 0)
-        dist[source] = 0
+        row = self._rows.get(index1)
+        if (row is not None):
+            self._rows.move_to_end(index1)
+        else:
+            # Distances are symmetric, so a row from the other cell works just as well.
+            row = self._rows.get(index2)
+            if (row is not None):
+                self._rows.move_to_end(index2)
+                index2 = index1
+            else:
+                row = self._loadRow(index1)
 
-        while not queue.isEmpty():
-            node = queue.pop()
-            if node in closed:
+        distance = row[index2]
+        if (distance == UNREACHABLE):
+            return sys.maxsize
+
+        return distance
+
+    def getIndex(self, position):
+        """
+        Get the number of an open cell, or None if the position is not an open cell.
+        """
+
+        return self._indexes.get(position)
+
+    def getMaxRows(self):
+        return self._maxRows
+
+    def getNumCachedRows(self):
+        return len(self._rows)
+
+    def getNumCells(self):
+        return self._numCells
+
+    def getRow(self, index):
+        """
+        Get the distances from a (numbered) open cell to every open cell
+        (computing them if they are not cached).
+        The caller should not modify it.
+        """
+
+        row = self._rows.get(index)
+        if (row is None):
+            return self._loadRow(index)
+
+        self._rows.move_to_end(index)
+        return row
+
+    def _loadRow(self, source):
+        row = array.array('H', [UNREACHABLE]) * self._numCells
+        _search(row, 0, source, self._neighbors)
+
+        while (len(self._rows) >= self._maxRows):
+            self._rows.popitem(last = False)
+
+        self._rows[source] = row
+        return row
+
+class LandmarkDistanceOracle(object):
+    """
+    Exact maze distances for very large layouts, using landmarks (the "ALT" technique).
+
+    A few landmark cells are picked by farthest-point selection,
+    and a full row of distances is kept for each one (so memory is O(K * N)).
+    For any landmark L, the triangle inequality gives |d(L, a) - d(L, b)| <= d(a, b),
+    and the best of these bounds guides an A* search that answers each query exactly.
+    The bound alone (see `LandmarkDistanceOracle.getLowerBound`) is an admissible
+    (and consistent) heuristic.
+
+    Each cell is also labeled with its connected component,
+    so queries between cells that can not reach each other are answered without a search.
+    """
+
+    def __init__(self, walls, numLandmarks = DEFAULT_NUM_LANDMARKS,
+            numActiveLandmarks = DEFAULT_NUM_ACTIVE_LANDMARKS):
+        self._cells = walls.asList(False)
+        self._numCells = len(self._cells)
+        self._indexes = {cell: index for (index, cell) in enumerate(self._cells)}
+        self._neighbors = _buildNeighbors(self._cells, self._indexes)
+        self._numActiveLandmarks = numActiveLandmarks
+
+        self._components, componentSizes = self._labelComponents()
+
+        self._landmarks = []
+        self._rows = []
+        self._selectLandmarks(numLandmarks, componentSizes)
+
+    def getCells(self):
+        """
+        Get the open cells, in the order that they are numbered.
+        """
+
+        return self._cells
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the maze distance between two open cells.
+        Returns None if either position is not an open cell,
+        and sys.maxsize if the cells can not reach each other.
+        """
+
+        source = self._indexes.get(pos1)
+        target = self._indexes.get(pos2)
+
+        if (source is None or target is None):
+            return None
+
+        if (self._components[source] != self._components[target]):
+            return sys.maxsize
+
+        if (source == target):
+            return 0
+
+        return self._search(source, target)
+
+    def getIndex(self, position):
+        """
+        Get the number of an open cell, or None if the position is not an open cell.
+        """
+
+        return self._indexes.get(position)
+
+    def getLandmarks(self):
+        """
+        Get the landmark cells, in the order they were picked.
+        """
+
+        return [self._cells[landmark] for landmark in self._landmarks]
+
+    def getLowerBound(self, pos1, pos2):
+        """
+        Get a lower bound on the maze distance between two open cells (using every landmark).
+        Returns None if either position is not an open cell,
+        and sys.maxsize if the cells can not reach each other.
+        """
+
+        index1 = self._indexes.get(pos1)
+        index2 = self._indexes.get(pos2)
+
+        if (index1 is None or index2 is None):
+            return None
+
+        if (self._components[index1] != self._components[index2]):
+            return sys.maxsize
+
+        return _landmarkBound(self._rows, index1, index2)
+
+    def getNumCells(self):
+        return self._numCells
+
+    def _labelComponents(self):
+        """
+        Returns the component number of each cell, and the size of each component.
+        """
+
+        components = array.array('I', [0]) * self._numCells
+        sizes = []
+        labeled = bytearray(self._numCells)
+
+        for start in range(self._numCells):
+            if (labeled[start]):
                 continue
 
-            closed[node] = True
-            nodeDist = dist[node]
-            adjacent = []
-            x, y = node
+            component = len(sizes)
+            labeled[start] = 1
+            frontier = [start]
+            size = 0
+
+            while (frontier):
+                node = frontier.pop()
+                components[node] = component
+                size += 1
+
+                for neighbor in self._neighbors[node]:
+                    if (not labeled[neighbor]):
+                        labeled[neighbor] = 1
+                        frontier.append(neighbor)
+
+            sizes.append(size)
+
+        return components, sizes
+
+    def _search(self, source, target):
+        """
+        A* from the source to the target (which must be in the same component),
+        guided by the landmarks that give the best bound between the two.
+        The bound is consistent, so each cell only needs to be expanded once.
+        """
+
+        # Only the most useful landmarks for this query are checked at each node.
+        rows = sorted(self._rows, key = lambda row: -abs(row[source] - row[target]))
+        rows = [(row, row[target]) for row in rows[:self._numActiveLandmarks]]
 
-            if not layout.isWall((x, y + 1)):
-                adjacent.append((x, y + 1))
+        neighbors = self._neighbors
+        costs = {source: 0}
+        closed = set()
 
-            if not layout.isWall((x, y - 1)):
-                adjacent.append((x, y - 1))
+        # Ties on f go to the deeper node, which is closer to the target.
+        heap = [(0, 0, source)]
 
-            if not layout.isWall((x + 1, y)):
-                adjacent.append((x + 1, y))
+        while (heap):
+            _, negativeCost, node = heapq.heappop(heap)
+            if (node == target):
+                return -negativeCost
+
+            if (node in closed):
+                continue
 
-            if not layout.isWall((x - 1, y)):
-                adjacent.append((x - 1, y))
+            closed.add(node)
+            cost = 1 - negativeCost
 
-            for other in adjacent:
-                if other not in dist:
+            for neighbor in neighbors[node]:
+                if (neighbor in closed or costs.get(neighbor, sys.maxsize) <= cost):
                     continue
 
-                oldDist = dist[other]
-                newDist = nodeDist + 1
-                if newDist < oldDist:
-                    dist[other] = newDist
-                    queue.push(other, newDist)
+                bound = 0
+                for (row, targetDistance) in rows:
+                    difference = abs(row[neighbor] - targetDistance)
+                    if (difference > bound):
+                        bound = difference
 
-        for target in allNodes:
-            distances[(target, source)] = dist[target]
+                costs[neighbor] = cost
+                heapq.heappush(heap, (cost + bound, -cost, neighbor))
 
-    return distances
+        raise ValueError('Could not find a path between cells in the same component.')
 
-def getDistanceOnGrid(distances, pos1, pos2):
-    key = (pos1, pos2)
-    if key in distances:
-        return distances[key]
+    def _selectLandmarks(self, numLandmarks, componentSizes):
+        """
+        Farthest-point selection: keep adding the cell that is farthest from
+        all the landmarks in its component.
+        Cells in a component without landmarks score the size of their component,
+        so the largest components get landmarks first.
+        The first landmark in a component is the cell farthest from the cell that was picked.
+        """
 
-    return DEFAULT_DISTANCE
+        scores = [componentSizes[component] for component in self._components]
+
+        while (len(self._landmarks) < numLandmarks):
+            landmark = max(range(self._numCells), key = scores.__getitem__)
+            if (scores[landmark] == 0):
+                # Every cell is already a landmark.
+                break
+
+            row = self._searchFrom(landmark)
+
+            if (scores[landmark] == componentSizes[self._components[landmark]]):
+                # The first landmark in this component.
+                landmark = max((index for index in range(self._numCells)
+                        if (row[index] != UNREACHABLE)), key = row.__getitem__)
+                row = self._searchFrom(landmark)
+
+            self._landmarks.append(landmark)
+            self._rows.append(row)
+
+            for index in range(self._numCells):
+                if (row[index] < scores[index]):
+                    scores[index] = row[index]
+
+    def _searchFrom(self, source):
+        row = array.array('H', [UNREACHABLE]) * self._numCells
+        _search(row, 0, source, self._neighbors)
+        return row
+
+class NextHopTable(object):
+    """
+    The first moves along the shortest paths between open cells.
+
+    For each (source, target) pair, a single byte holds a bit mask of the cardinal actions
+    that start a shortest path (in the order of `pacai.core.directions.Directions.CARDINAL`).
+    The masks for a source are computed from the distance rows of the source and its neighbors
+    the first time that source is asked about.
+    After that, each query is O(1), and following a path costs O(path length)
+    (with no search and no successor states).
+
+    Works with either a `DistanceTable` or a `LazyDistanceTable`.
+    """
+
+    def __init__(self, distances):
+        self._distances = distances
+        self._cells = distances.getCells()
+        self._numCells = len(self._cells)
+
+        # For each cell, the (bit, neighbor index) pairs for the cardinal moves out of it.
+        self._neighbors = []
+        for (x, y) in self._cells:
+            cellNeighbors = []
+
+            for (bit, direction) in enumerate(Directions.CARDINAL):
+                dx, dy = Actions.directionToVector(direction)
+                index = distances.getIndex((x + dx, y + dy))
+
+                if (index is not None):
+                    cellNeighbors.append((1 << bit, index))
+
+            self._neighbors.append(tuple(cellNeighbors))
+
+        self._masks = [None] * self._numCells
+
+    def getAction(self, pos1, pos2):
+        """
+        Get an optimal first action from pos1 towards pos2 (the first in cardinal order).
+        Returns None if either position is not an open cell,
+        the cells are the same, or they can not reach each other.
+        """
+
+        actions = self.getActions(pos1, pos2)
+        if (not actions):
+            return None
+
+        return actions[0]
+
+    def getActions(self, pos1, pos2):
+        """
+        Get all the optimal first actions from pos1 towards pos2, as a tuple
+        (in the order of `pacai.core.directions.Directions.CARDINAL`).
+        Returns None if either position is not an open cell,
+        and an empty tuple if the cells are the same or can not reach each other.
+        """
+
+        source = self._distances.getIndex(pos1)
+        target = self._distances.getIndex(pos2)
+
+        if (source is None or target is None):
+            return None
+
+        return MASK_ACTIONS[self._getMasks(source)[target]]
+
+    def getPath(self, pos1, pos2):
+        """
+        Get the actions along a shortest path from pos1 to pos2.
+        Returns None if either position is not an open cell or the cells can not reach each other.
+        """
+
+        source = self._distances.getIndex(pos1)
+        target = self._distances.getIndex(pos2)
+
+        if (source is None or target is None):
+            return None
+
+        path = []
+
+        while (source != target):
+            mask = self._getMasks(source)[target]
+            if (mask == 0):
+                return None
+
+            # Take the first optimal move.
+            for (bit, neighbor) in self._neighbors[source]:
+                if (mask & bit):
+                    path.append(MASK_ACTIONS[bit][0])
+                    source = neighbor
+                    break
+
+        return path
+
+    def _getMasks(self, source):
+        masks = self._masks[source]
+        if (masks is not None):
+            return masks
+
+        masks = bytearray(self._numCells)
+        sourceRow = self._distances.getRow(source)
+
+        for (bit, neighbor) in self._neighbors[source]:
+            neighborRow = self._distances.getRow(neighbor)
+
+            # A move is optimal for every target that is one step closer to the neighbor.
+            closer = map(operator.eq, sourceRow, map((1).__add__, neighborRow))
+            for target in itertools.compress(range(self._numCells), closer):
+                masks[target] |= bit
+
+        masks = bytes(masks)
+        self._masks[source] = masks
+
+        return masks
+
+class DistanceField(object):
+    """
+    The maze distance from every open cell to the nearest of a set of sources
+    (like the remaining food, the capsules, or the enemies),
+    computed with a single multi-source breadth-first search.
+    After that, "how far is the nearest source from here?" is an array lookup.
+
+    Sources can be added and removed incrementally:
+    removing a source only recomputes the cells that were closest to it,
+    and adding one only updates the cells that it is now closest to.
+    """
+
+    def __init__(self, walls, sources = ()):
+        self._cells, self._indexes, self._neighbors = _getCellGraph(walls)
+        numCells = len(self._cells)
+
+        self._distances = array.array('H', [UNREACHABLE]) * numCells
+        # The index of the (or, on ties, a) nearest source for each cell, or -1.
+        self._nearest = array.array('i', [-1]) * numCells
+        self._sources = set()
+
+        self._addIndexes([self._getSourceIndex(source) for source in sources])
+
+    def addSource(self, position):
+        self._addIndexes([self._getSourceIndex(position)])
+
+    def copy(self):
+        field = DistanceField.__new__(DistanceField)
+        field._cells = self._cells
+        field._indexes = self._indexes
+        field._neighbors = self._neighbors
+        field._distances = array.array('H', self._distances)
+        field._nearest = array.array('i', self._nearest)
+        field._sources = set(self._sources)
+
+        return field
+
+    def getDistance(self, position):
+        """
+        Get the maze distance from a position to the nearest source.
+        Returns None if the position is not an open cell,
+        and sys.maxsize if no source can be reached from it.
+        """
+
+        index = self._indexes.get(position)
+        if (index is None):
+            return None
+
+        distance = self._distances[index]
+        if (distance == UNREACHABLE):
+            return sys.maxsize
+
+        return distance
+
+    def getDistances(self):
+        """
+        Get the distance to the nearest source for each open cell (numbered like `getIndex`),
+        with UNREACHABLE for cells that can not reach any source.
+        The caller should not modify it.
+        """
+
+        return self._distances
+
+    def getIndex(self, position):
+        """
+        Get the number of an open cell, or None if the position is not an open cell.
+        """
+
+        return self._indexes.get(position)
+
+    def getNearestSource(self, position):
+        """
+        Get the source that is nearest to a position (ties are broken arbitrarily).
+        Returns None if the position is not an open cell or no source can be reached from it.
+        """
+
+        index = self._indexes.get(position)
+        if (index is None or self._nearest[index] == -1):
+            return None
+
+        return self._cells[self._nearest[index]]
+
+    def getSources(self):
+        return [self._cells[index] for index in sorted(self._sources)]
+
+    def removeSource(self, position):
+        index = self._getSourceIndex(position)
+        if (index not in self._sources):
+            raise ValueError('Position is not a source: ' + str(position))
+
+        self._removeIndex(index)
+
+    def setSources(self, positions):
+        """
+        Change the sources to exactly these positions,
+        only adding and removing the sources that changed.
+        """
+
+        indexes = set(self._getSourceIndex(position) for position in positions)
+
+        removed = self._sources - indexes
+        added = indexes - self._sources
+
+        if (len(removed) > len(indexes)):
+            # Cheaper to start over.
+            self._distances = array.array('H', [UNREACHABLE]) * len(self._cells)
+            self._nearest = array.array('i', [-1]) * len(self._cells)
+            self._sources = set()
+            self._addIndexes(indexes)
+            return
+
+        for index in removed:
+            self._removeIndex(index)
+
+        self._addIndexes(added)
+
+    def _addIndexes(self, indexes):
+        """
+        Add sources and run a breadth-first search out from all of them at once,
+        stopping wherever a cell is already at least as close to another source.
+        """
+
+        distances = self._distances
+        nearest = self._nearest
+        neighbors = self._neighbors
+
+        frontier = []
+        for index in indexes:
+            if (index in self._sources):
+                continue
+
+            self._sources.add(index)
+            distances[index] = 0
+            nearest[index] = index
+            frontier.append(index)
+
+        distance = 0
+        while (frontier):
+            distance += 1
+            nextFrontier = []
+
+            for node in frontier:
+                for neighbor in neighbors[node]:
+                    if (distances[neighbor] > distance):
+                        distances[neighbor] = distance
+                        nearest[neighbor] = nearest[node]
+                        nextFrontier.append(neighbor)
+
+            frontier = nextFrontier
+
+    def _getSourceIndex(self, position):
+        index = self._indexes.get(position)
+        if (index is None):
+            raise ValueError('Source is not an open cell: ' + str(position))
+
+        return index
+
+    def _removeIndex(self, source):
+        """
+        Remove a source, and recompute the cells that were nearest to it
+        from the cells around them (whose distances are still correct).
+        """
+
+        distances = self._distances
+        nearest = self._nearest
+        neighbors = self._neighbors
+
+        self._sources.remove(source)
+
+        # Each cell's search parent has the same nearest source,
+        # so all the cells nearest to the source are connected to it.
+        region = [source]
+        nearest[source] = -1
+        for node in region:
+            for neighbor in neighbors[node]:
+                if (nearest[neighbor] == source):
+                    nearest[neighbor] = -1
+                    region.append(neighbor)
+
+        for node in region:
+            distances[node] = UNREACHABLE
+
+        # Seed the region from its border, then fill it in order of distance.
+        buckets = {}
+        for node in region:
+            for neighbor in neighbors[node]:
+                if (nearest[neighbor] == -1):
+                    continue
+
+                distance = distances[neighbor] + 1
+                if (distance < distances[node]):
+                    distances[node] = distance
+                    nearest[node] = nearest[neighbor]
+
+            if (nearest[node] != -1):
+                buckets.setdefault(distances[node], []).append(node)
+
+        while (buckets):
+            distance = min(buckets)
+            frontier = buckets.pop(distance)
+
+            for node in frontier:
+                if (distances[node] != distance):
+                    continue
+
+                for neighbor in neighbors[node]:
+                    if (distances[neighbor] > distance + 1):
+                        distances[neighbor] = distance + 1
+                        nearest[neighbor] = nearest[node]
+                        buckets.setdefault(distance + 1, []).append(neighbor)
+
+class CorridorDistanceTable(object):
+    """
+    Maze distances from a `pacai.core.corridors.CorridorGraph`.
+
+    Only the distances between the nodes of the graph (junctions and dead ends) are stored,
+    which is much smaller than all pairs of cells on mazes with long corridors.
+    A corridor cell reaches the rest of the maze through one of the two ends of its corridor,
+    so any distance is the best of (at most) four stored distances plus the offsets,
+    or the direct walk when both cells are on the same corridor.
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._cells = graph.getCells()
+        self._numCells = len(self._cells)
+        self._indexes = {cell: index for (index, cell) in enumerate(self._cells)}
+
+        self._numNodes = graph.getNumNodes()
+        self._nodeDistances = array.array('H', [UNREACHABLE]) * (self._numNodes ** 2)
+        for node in range(self._numNodes):
+            self._searchNodes(node)
+
+        # For each cell, its (edge or None, offset, ((node, distance to node), ...)).
+        self._attachments = [self._buildAttachment(cell) for cell in self._cells]
+
+    def getCells(self):
+        """
+        Get the open cells, in the order that they are numbered.
+        """
+
+        return self._cells
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the maze distance between two open cells.
+        Returns None if either position is not an open cell,
+        and sys.maxsize if the cells can not reach each other.
+        """
+
+        index1 = self._indexes.get(pos1)
+        index2 = self._indexes.get(pos2)
+
+        if (index1 is None or index2 is None):
+            return None
+
+        distance = self._getDistance(index1, index2)
+        if (distance == UNREACHABLE):
+            return sys.maxsize
+
+        return distance
+
+    def getIndex(self, position):
+        """
+        Get the number of an open cell, or None if the position is not an open cell.
+        """
+
+        return self._indexes.get(position)
+
+    def getNumCells(self):
+        return self._numCells
+
+    def getNumNodes(self):
+        return self._numNodes
+
+    def getRow(self, index):
+        """
+        Get the distances from a (numbered) open cell to every open cell.
+        The row is computed on every call,
+        so use `CorridorDistanceTable.getDistance` when only a few distances are needed.
+        """
+
+        return array.array('H', [self._getDistance(index, other)
+                for other in range(self._numCells)])
+
+    def _buildAttachment(self, cell):
+        nodeIndex = self._graph.getNodeIndex(cell)
+        if (nodeIndex is not None):
+            return (None, 0, ((nodeIndex, 0),))
+
+        (edge, offset) = self._graph.getEdgeLocation(cell)
+        (first, last, _, actions) = self._graph.getEdge(edge)
+
+        return (edge, offset, (
+            (self._graph.getNodeIndex(first), offset),
+            (self._graph.getNodeIndex(last), len(actions) - offset),
+        ))
+
+    def _getDistance(self, index1, index2):
+        """
+        The distance between two numbered cells, or UNREACHABLE.
+        """
+
+        if (index1 == index2):
+            return 0
+
+        (edge1, offset1, nodes1) = self._attachments[index1]
+        (edge2, offset2, nodes2) = self._attachments[index2]
+
+        best = UNREACHABLE
+        if (edge1 is not None and edge1 == edge2):
+            best = abs(offset1 - offset2)
+
+        nodeDistances = self._nodeDistances
+        numNodes = self._numNodes
+
+        for (node1, distance1) in nodes1:
+            offset = node1 * numNodes
+            for (node2, distance2) in nodes2:
+                between = nodeDistances[offset + node2]
+                if (between == UNREACHABLE):
+                    continue
+
+                distance = distance1 + between + distance2
+                if (distance < best):
+                    best = distance
+
+        return best
+
+    def _searchNodes(self, source):
+        """
+        Fill in the distances from a node to every other node (Dijkstra over the corridors).
+        """
+
+        distances = self._nodeDistances
+        offset = source * self._numNodes
+
+        distances[offset + source] = 0
+        heap = [(0, source)]
+
+        while (heap):
+            (distance, node) = heapq.heappop(heap)
+            if (distance > distances[offset + node]):
+                continue
+
+            for (edge, forward) in self._graph.getNodeEdges(node):
+                (first, last, _, actions) = self._graph.getEdge(edge)
+                neighbor = self._graph.getNodeIndex(last if forward else first)
+
+                newDistance = distance + len(actions)
+                if (newDistance < distances[offset + neighbor]):
+                    distances[offset + neighbor] = newDistance
+                    heapq.heappush(heap, (newDistance, neighbor))
+
+def computeDistances(layout):
+    """
+    Compute the maze distance between every pair of open cells in the layout.
+    Returns a dict keyed by (target, source), with sys.maxsize for cells that can not reach.
+
+    The dict takes far more memory than a `DistanceTable` (which this is built from),
+    so new code should use a `DistanceTable` directly.
+    """
+
+    table = DistanceTable(layout.walls)
+    cells = table.getCells()
+    numCells = table.getNumCells()
+    flat = table.getDistances()
+
+    distances = {}
+    for (sourceIndex, source) in enumerate(cells):
+        base = sourceIndex * numCells
+        for (targetIndex, target) in enumerate(cells):
+            distance = flat[base + targetIndex]
+            if (distance == UNREACHABLE):
+                distance = sys.maxsize
+
+            distances[(target, source)] = distance
+
+    return distances
+
+def getDistanceOnGrid(distances, pos1, pos2):
+    key = (pos1, pos2)
+    if key in distances:
+        return distances[key]
+
+    return DEFAULT_DISTANCE
+
+def _buildNeighbors(cells, indexes):
+    """
+    Get the indexes of the open neighbors of each (numbered) open cell.
+    """
+
+    neighbors = []
+
+    for (x, y) in cells:
+        cellNeighbors = []
+
+        for direction in Directions.CARDINAL:
+            dx, dy = Actions.directionToVector(direction)
+            index = indexes.get((x + dx, y + dy))
+
+            if (index is not None):
+                cellNeighbors.append(index)
+
+        neighbors.append(tuple(cellNeighbors))
+
+    return neighbors
+
+def _landmarkBound(rows, index1, index2):
+    """
+    The best triangle-inequality bound on the distance between two cells
+    (in the same component) from rows of landmark distances.
+    """
+
+    bound = 0
+
+    for row in rows:
+        distance1 = row[index1]
+        if (distance1 == UNREACHABLE):
+            # The landmark is in another component.
+            continue
+
+        difference = abs(distance1 - row[index2])
+        if (difference > bound):
+            bound = difference
+
+    return bound
+
+def _search(distances, offset, source, neighbors):
+    """
+    Fill in the row for the source (starting at offset) with a breadth-first search.
+    The row must start out as all UNREACHABLE.
+    """
+
+    distances[offset + source] = 0
+
+    frontier = [source]
+    distance = 0
+
+    while (frontier):
+        distance += 1
+        nextFrontier = []
+
+        for node in frontier:
+            for neighbor in neighbors[node]:
+                if (distances[offset + neighbor] == UNREACHABLE):
+                    distances[offset + neighbor] = distance
+                    nextFrontier.append(neighbor)
+
+        frontier = nextFrontier
+
+#############################
+# PERSISTENT DISTANCE CACHE #
+#############################
+
+_defaultCache = None
+
+class DistanceCache(object):
+    """
+    A directory of distance tables that persists between processes.
+
+    Each table is stored in its own file, named by a digest of the walls (see `wallsDigest`).
+    Files are loaded with mmap, so loading a table does not need to read or copy the distances.
+
+    Writers build a file under a temporary name and then atomically rename it into place,
+    so concurrent writers (and readers) never see a partial file.
+    After each write, the least recently used files are removed
+    until the directory fits in maxBytes.
+    """
+
+    def __init__(self, directory, maxBytes = DEFAULT_CACHE_MAX_BYTES):
+        self._directory = directory
+        self._maxBytes = maxBytes
+
+    def clear(self):
+        """
+        Remove all the cached tables.
+        """
+
+        for (path, size, mtime) in self._listFiles():
+            _removeFile(path)
+
+    def getDirectory(self):
+        return self._directory
+
+    def getSize(self):
+        """
+        Get the total size (in bytes) of the cached tables.
+        """
+
+        return sum([size for (path, size, mtime) in self._listFiles()])
+
+    def getTable(self, walls):
+        """
+        Get the `DistanceTable` for the given walls,
+        computing (and storing) it if it is not already cached.
+        """
+
+        path = self._getPath(walls)
+
+        table = self._load(path, walls)
+        if (table is not None):
+            return table
+
+        table = DistanceTable(walls)
+        self._store(path, walls, table)
+
+        return table
+
+    def _evict(self, keepPath):
+        """
+        Remove the least recently used tables until the cache fits in its size limit.
+        """
+
+        files = sorted(self._listFiles(), key = lambda entry: entry[2])
+        totalSize = sum([size for (path, size, mtime) in files])
+
+        for (path, size, mtime) in files:
+            if (totalSize <= self._maxBytes):
+                break
+
+            if (path == keepPath):
+                continue
+
+            if (_removeFile(path)):
+                totalSize -= size
+
+    def _getPath(self, walls):
+        return os.path.join(self._directory, wallsDigest(walls) + CACHE_FILE_EXTENSION)
+
+    def _listFiles(self):
+        """
+        Get (path, size, modification time) for every cached table.
+        Temp files that were abandoned by crashed writers are cleaned up along the way.
+        """
+
+        try:
+            names = os.listdir(self._directory)
+        except OSError:
+            return []
+
+        files = []
+        now = time.time()
+
+        for name in names:
+            if (not name.endswith(CACHE_FILE_EXTENSION)):
+                continue
+
+            path = os.path.join(self._directory, name)
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removed by another process.
+                continue
+
+            if (name.startswith(CACHE_TEMP_PREFIX)):
+                if (now - stat.st_mtime > CACHE_STALE_TEMP_SECONDS):
+                    _removeFile(path)
+
+                continue
+
+            files.append((path, stat.st_size, stat.st_mtime))
+
+        return files
+
+    def _load(self, path, walls):
+        """
+        Load a cached table, or return None if there is no usable table.
+        """
+
+        try:
+            with open(path, 'rb') as file:
+                buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # The file is missing or empty.
+            return None
+
+        numCells = walls.count(False)
+        expectedHeader = (CACHE_MAGIC, CACHE_FORMAT_VERSION, CACHE_BYTE_ORDER_MARK,
+                walls.getWidth(), walls.getHeight(), numCells)
+
+        if (len(buffer) != CACHE_HEADER.size + 2 * (numCells ** 2)
+                or CACHE_HEADER.unpack_from(buffer, 0) != expectedHeader):
+            logging.warning('Ignoring invalid distance cache file: %s.' % (path))
+            buffer.close()
+            return None
+
+        # Mark the file as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        distances = memoryview(buffer)[CACHE_HEADER.size:].cast('H')
+        return DistanceTable(walls, distances = distances, buffer = buffer)
+
+    def _store(self, path, walls, table):
+        header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_FORMAT_VERSION, CACHE_BYTE_ORDER_MARK,
+                walls.getWidth(), walls.getHeight(), table.getNumCells())
+
+        tempPath = None
+        try:
+            os.makedirs(self._directory, exist_ok = True)
+
+            handle, tempPath = tempfile.mkstemp(dir = self._directory,
+                    prefix = CACHE_TEMP_PREFIX, suffix = CACHE_FILE_EXTENSION)
+
+            with os.fdopen(handle, 'wb') as file:
+                file.write(header)
+                file.write(table.getDistances().tobytes())
+
+            # Atomic, so readers see either no file or a complete one.
+            os.replace(tempPath, path)
+        except OSError as ex:
+            logging.warning('Unable to write distance cache file: %s -- %s' % (path, str(ex)))
+
+            if (tempPath is not None):
+                _removeFile(tempPath)
+
+            return
+
+        self._evict(path)
+
+def getDefaultCache():
+    """
+    Get the process-wide `DistanceCache`, or None if the disk cache is turned off.
+    The cache is only on when the PACAI_DISTANCE_CACHE_DIR environment variable
+    names a directory.
+    """
+
+    global _defaultCache
+
+    directory = os.environ.get(CACHE_DIR_ENV, '')
+    if (directory == ''):
+        return None
+
+    if (_defaultCache is None or _defaultCache.getDirectory() != directory):
+        _defaultCache = DistanceCache(directory)
+
+    return _defaultCache
+
+def wallsDigest(walls):
+    """
+    Get a stable (across processes and machines) hex digest for a grid of walls.
+    """
+
+    if (not isinstance(walls, BitGrid)):
+        walls = BitGrid.fromGrid(walls)
+
+    width = walls.getWidth()
+    height = walls.getHeight()
+    bits = walls.getBits().to_bytes((width * height + 7) // 8, 'little')
+
+    digest = hashlib.sha256(b'%d,%d,' % (width, height))
+    digest.update(bits)
+
+    return digest.hexdigest()
+
+def _removeFile(path):
+    try:
+        os.remove(path)
+    except OSError:
+        # Already removed by another process, or still in use.
+        return False
+
+    return True
+
+##################################
+# PROCESS-WIDE DISTANCE REGISTRY #
+##################################
+
+class DistanceRegistry(object):
+    """
+    Hands out a single shared (read-only) `DistanceTable` per wall layout.
+
+    Every call to `DistanceRegistry.acquire` should be paired with a call to
+    `DistanceRegistry.release`.
+    A table is built (or loaded from the disk cache) on the first acquire for its walls,
+    and dropped when the last reference to it is released.
+    Tables are built outside of the lock, so other walls are not held up by a build.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {walls: [table, references]}
+        self._entries = {}
+        # {walls: table}
+        self._pinned = {}
+        # {walls: event that is set once the table is built (or the build fails)}
+        self._building = {}
+
+    def acquire(self, walls):
+        """
+        Get the shared table for these walls, and take a reference to it.
+        """
+
+        while (True):
+            with self._lock:
+                entry = self._entries.get(walls)
+                if (entry is not None):
+                    entry[1] += 1
+                    return entry[0]
+
+                building = self._building.get(walls)
+                if (building is None):
+                    building = threading.Event()
+                    self._building[walls.copy()] = building
+                    break
+
+            # Another thread is building this table, try again once it is done.
+            building.wait()
+
+        table = None
+        try:
+            table = _loadTable(walls)
+        finally:
+            with self._lock:
+                del self._building[walls]
+                if (table is not None):
+                    # Copy the walls, so the key can not be changed out from under us.
+                    self._entries[walls.copy()] = [table, 1]
+
+            building.set()
+
+        return table
+
+    def getNumReferences(self, walls):
+        with self._lock:
+            entry = self._entries.get(walls)
+            if (entry is None):
+                return 0
+
+            return entry[1]
+
+    def getNumTables(self):
+        with self._lock:
+            return len(self._entries)
+
+    def getPinnedTable(self, walls):
+        """
+        Get the shared table for these walls, without needing to release it.
+        This is for callers that can not pair up their calls (like heuristics):
+        a single reference is taken the first time a layout is seen,
+        and is held until `DistanceRegistry.unpin` is called for those walls.
+        """
+
+        # This is called once per distance, so the common case skips the lock.
+        table = self._pinned.get(walls)
+        if (table is not None):
+            return table
+
+        table = self.acquire(walls)
+
+        with self._lock:
+            if (walls in self._pinned):
+                # Another thread pinned these walls first.
+                self._entries[walls][1] -= 1
+            else:
+                self._pinned[walls.copy()] = table
+
+        return table
+
+    def release(self, walls):
+        """
+        Give back a reference taken with `DistanceRegistry.acquire`.
+        """
+
+        with self._lock:
+            entry = self._entries.get(walls)
+            if (entry is None):
+                raise ValueError('Distances were never acquired for these walls.')
+
+            entry[1] -= 1
+            if (entry[1] <= 0):
+                del self._entries[walls]
+                entry[0].close()
+
+    def unpin(self, walls):
+        """
+        Give back the reference taken by `DistanceRegistry.getPinnedTable` (if there is one).
+        Tables that were pinned for these walls should not be used afterwards.
+        """
+
+        with self._lock:
+            table = self._pinned.pop(walls, None)
+
+        if (table is not None):
+            self.release(walls)
+
+    def unpinAll(self):
+        """
+        Give back every reference taken by `DistanceRegistry.getPinnedTable`.
+        """
+
+        with self._lock:
+            pinned = list(self._pinned.keys())
+            self._pinned.clear()
+
+        for walls in pinned:
+            self.release(walls)
+
+def getLandmarkOracle(walls):
+    """
+    Get the process-wide `LandmarkDistanceOracle` for these walls (building it if needed).
+    """
+
+    oracle = _landmarkOracles.get(walls)
+    if (oracle is None):
+        oracle = LandmarkDistanceOracle(walls)
+        _landmarkOracles[walls.copy()] = oracle
+
+    return oracle
+
+def getLazyTable(walls):
+    """
+    Get the process-wide `LazyDistanceTable` for these walls (creating it if needed).
+    Only the tables for the MAX_LAZY_TABLES most recently used layouts are kept.
+    """
+
+    table = _lazyTables.get(walls)
+    if (table is not None):
+        _lazyTables.move_to_end(walls)
+        return table
+
+    table = LazyDistanceTable(walls)
+
+    while (len(_lazyTables) >= MAX_LAZY_TABLES):
+        _lazyTables.popitem(last = False)
+
+    _lazyTables[walls.copy()] = table
+    return table
+
+def getRegistry():
+    """
+    Get the process-wide `DistanceRegistry`.
+    """
+
+    return _registry
+
+def _getCellGraph(walls):
+    """
+    Get the numbered open cells, their numbers, and their neighbors for these walls
+    (shared by every `DistanceField` on the same walls).
+    """
+
+    graph = _cellGraphs.get(walls)
+    if (graph is None):
+        cells = walls.asList(False)
+        indexes = {cell: index for (index, cell) in enumerate(cells)}
+        graph = (cells, indexes, _buildNeighbors(cells, indexes))
+        _cellGraphs[walls.copy()] = graph
+
+    return graph
+
+def _loadTable(walls):
+    diskCache = getDefaultCache()
+    if (diskCache is not None):
+        return diskCache.getTable(walls)
+
+    return DistanceTable(walls)
+
+_registry = DistanceRegistry()
+_landmarkOracles = {}
+_lazyTables = collections.OrderedDict()
+_cellGraphs = {}
@@ -3,9 +3,11 @@ Feature extractors for game states.
 """
 
 import abc
+import sys
 
+from pacai.core import distanceCalculator
 from pacai.core.actions import Actions
-from pacai.core.search import search
+from pacai.core.search import engine
 from pacai.student.searchAgents import AnyFoodSearchProblem
 
 class FeatureExtractor(abc.ABC):
@@ -51,15 +53,15 @@ class SimpleExtractor(FeatureExtractor):
         next_x, next_y = int(x + dx), int(y + dy)
 
         # Count the number of ghosts 1-step away.
+        moveTable = state.getMoveTable()
         features["#-of-ghosts-1-step-away"] = sum((next_x, next_y) in
-                Actions.getLegalNeighbors(g, walls) for g in ghosts)
+                moveTable.getLegalNeighbors(g) for g in ghosts)
 
         # If there is no danger of ghosts then add the food feature.
         if not features["#-of-ghosts-1-step-away"] and food[next_x][next_y]:
             features["eats-food"] = 1.0
 
-        prob = AnyFoodSearchProblem(state, start = (next_x, next_y))
-        dist = len(search.bfs(prob))
+        dist = self.getClosestFoodDistance(state, (next_x, next_y))
         if dist is not None:
             # Make the distance a number less than one otherwise the update will diverge wildly.
             features["closest-food"] = float(dist) / (walls.getWidth() * walls.getHeight())
@@ -68,3 +70,53 @@ class SimpleExtractor(FeatureExtractor):
             features[key] /= 10.0
 
         return features
+
+    def getClosestFoodDistance(self, state, position):
+        """
+        Get the maze distance from a position to the closest food (with a breadth-first search).
+        """
+
+        prob = AnyFoodSearchProblem(state, start = position)
+
+        path = engine.bfs(prob)
+        if (path is None):
+            return 0
+
+        return len(path)
+
+class DistanceFieldExtractor(SimpleExtractor):
+    """
+    The same features as `SimpleExtractor`,
+    but the distance to the closest food is looked up in a
+    `pacai.core.distanceCalculator.DistanceField` over the food instead of searched for.
+    The field is kept by the extractor (and rebuilt when the walls change),
+    and only the food that changed since the last call is updated.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self._foodField = None
+        self._foodFieldWalls = None
+        self._foodFieldSources = None
+
+    def getClosestFoodDistance(self, state, position):
+        walls = state.getWalls()
+        foodList = state.getFoodList()
+
+        if (self._foodField is None or walls != self._foodFieldWalls):
+            self._foodField = distanceCalculator.DistanceField(walls)
+            self._foodFieldWalls = walls.copy()
+            self._foodFieldSources = None
+
+        # States that have not eaten anything since share the same food list.
+        if (self._foodFieldSources is not foodList):
+            self._foodField.setSources(foodList)
+            self._foodFieldSources = foodList
+
+        dist = self._foodField.getDistance(position)
+        if (dist == sys.maxsize):
+            # Like an exhausted search (which returns an empty path).
+            return 0
+
+        return dist
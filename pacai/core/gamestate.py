@@ -1,10 +1,36 @@
 import abc
-import copy
+import struct
 
 from pacai.core.agentstate import AgentState
 from pacai.core.directions import Directions
+from pacai.core.grid import BitGrid
 from pacai.util import util
 
+ZOBRIST_MASK = (1 << util.ZOBRIST_BITS) - 1
+
+# The binary format (see AbstractGameState.toBytes()).
+# All values are little-endian.
+BYTES_FORMAT_VERSION = 1
+
+# Version, score, and flags (game over and win).
+BYTES_HEADER = struct.Struct('<BiB')
+
+# Position (in half steps), direction and pacman flag, and scared timer.
+BYTES_AGENT = struct.Struct('<HHBH')
+
+BYTES_FLAG_GAMEOVER = 1
+BYTES_FLAG_WIN = 2
+BYTES_FLAG_PACMAN = 8
+
+# Directions are stored as indexes into this tuple.
+BYTES_DIRECTIONS = (
+    Directions.EAST,
+    Directions.NORTH,
+    Directions.SOUTH,
+    Directions.STOP,
+    Directions.WEST,
+)
+
 class AbstractGameState(abc.ABC):
     """
     A game state specifies the status of a game, including the food, capsules, agents, and score.
@@ -22,10 +48,6 @@ class AbstractGameState(abc.ABC):
 
         self._layout = layout
 
-        # Keep a copy of the hash, since it is expensive to compute.
-        # Any children should be sure to clear the hash when modifications are made.
-        self._hash = None
-
         # For food and capsules, we will only copy on write (if we eat one of them).
         # This avoid additional copies on successors that don't eat.
 
@@ -33,6 +55,12 @@ class AbstractGameState(abc.ABC):
         self._food = layout.food.copy()
         self._lastFoodEaten = None
 
+        # A running count of the remaining food,
+        # and a lazily built list of the remaining food positions.
+        # The list is shared with successors until one of them eats (see getFoodList()).
+        self._numFood = self._food.count()
+        self._foodList = None
+
         self._capsulesCopied = False
         self._capsules = layout.capsules.copy()
         self._lastCapsuleEaten = None
@@ -41,12 +69,29 @@ class AbstractGameState(abc.ABC):
         # A view may choose to specially represent these locations.
         self._highlightLocations = []
 
+        # Agent states are also copied on write.
+        # Successors share their parent's agent states, and only copy the ones that change.
+        # See getMutableAgentState().
         self._agentStates = []
         for (isPacman, position) in layout.agentPositions:
             self._agentStates.append(AgentState(position, Directions.STOP, isPacman))
 
+        self._agentStatesCopied = [True] * len(self._agentStates)
+
         self._score = 0
 
+        # A running Zobrist hash over the score, flags, capsules, food, and layout.
+        # Anything that modifies those fields should XOR the old key out and the new key in.
+        # Agent states keep their own running hash, which is folded in by __hash__().
+        self._hash = self._computeHash()
+
+        # Successors saved by generateSuccessors(), keyed by agent index.
+        self._memoizedSuccessors = None
+
+        # Odd per-agent multipliers used to fold the agent hashes into the state hash.
+        self._agentHashMultipliers = [util.zobristKey('agent', agentIndex) | 1
+                for agentIndex in range(len(self._agentStates))]
+
     @abc.abstractmethod
     def generateSuccessor(self, agentIndex, action):
         """
@@ -65,8 +110,37 @@ class AbstractGameState(abc.ABC):
         pass
 
     def addScore(self, score):
-        self._hash = None
-        self._score += score
+        self.setScore(self._score + score)
+
+    def applyMove(self, agentIndex, action):
+        """
+        Apply the action to this state in place (instead of building a new successor),
+        and return an undo record that can be passed to `AbstractGameState.undoMove`.
+
+        This lets tree searches walk one state down and back up the tree without
+        allocating a state per node.
+        Moves must be undone in the reverse order that they were applied.
+        """
+
+        if (self.isOver()):
+            raise RuntimeError("Can't apply moves to a terminal state.")
+
+        record = self._getUndoRecord()
+
+        # The current food and capsules are now referenced by the undo record,
+        # so make sure that they are copied before being written to.
+        self._foodCopied = False
+        self._capsulesCopied = False
+        self._agentStatesCopied = [False] * len(self._agentStates)
+        self._memoizedSuccessors = None
+
+        try:
+            self._applySuccessorAction(agentIndex, action)
+        except Exception:
+            self._restoreUndoRecord(record)
+            raise
+
+        return record
 
     def eatCapsule(self, x, y):
         """
@@ -83,7 +157,7 @@ class AbstractGameState(abc.ABC):
         self._capsules.remove((x, y))
         self._lastCapsuleEaten = (x, y)
 
-        self._hash = None
+        self._hash ^= util.zobristKey('capsule', (x, y))
         return True
 
     def eatFood(self, x, y):
@@ -101,14 +175,57 @@ class AbstractGameState(abc.ABC):
         self._food[x][y] = False
         self._lastFoodEaten = (x, y)
 
-        self._hash = None
+        self._numFood -= 1
+        self._foodList = None
+
+        self._hash ^= util.zobristKey('food', x, y)
         return True
 
     def endGame(self, win):
+        self._hash ^= util.zobristKey('gameover', self._gameover, self._win)
+
         self._gameover = True
         self._win = win
 
-        self._hash = None
+        self._hash ^= util.zobristKey('gameover', self._gameover, self._win)
+
+    def generateSuccessors(self, agentIndex, memoize = False):
+        """
+        Returns a list of (action, successor) pairs, one for each legal action of the agent
+        (in the same order as getLegalActions()).
+        This is the same as calling generateSuccessor() for each legal action,
+        but the legal actions are only computed once and all the siblings share
+        the work of setting up their shallow copies.
+
+        If memoize is true, then the list is saved on this state and returned again by later
+        calls for the same agent (that also ask for memoization).
+        Saved successors are dropped when this state is modified with applyMove().
+        The caller should not modify the list.
+        """
+
+        if (self.isOver()):
+            return []
+
+        if (memoize and self._memoizedSuccessors is not None):
+            successors = self._memoizedSuccessors.get(agentIndex)
+            if (successors is not None):
+                return successors
+
+        fields = self._getSuccessorFields()
+
+        successors = []
+        for action in self.getLegalActions(agentIndex):
+            successor = self._initSuccessor(fields)
+            successor._applySuccessorAction(agentIndex, action, validate = False)
+            successors.append((action, successor))
+
+        if (memoize):
+            if (self._memoizedSuccessors is None):
+                self._memoizedSuccessors = {}
+
+            self._memoizedSuccessors[agentIndex] = successors
+
+        return successors
 
     def getAgentPosition(self, index):
         """
@@ -117,14 +234,16 @@ class AbstractGameState(abc.ABC):
         (like if it just died and is respawning).
         """
 
-        position = self._agentStates[index].getPosition()
-        if (position is None):
-            return None
-
         # Ensure positions are ints.
-        return tuple(int(pos) for pos in position)
+        return self._agentStates[index].getIntPosition()
 
     def getAgentState(self, index):
+        """
+        Get the state of the agent with the given index.
+
+        Agent states may be shared with other game states, so treat the result as read-only.
+        """
+
         return self._agentStates[index]
 
     def getAgentStates(self):
@@ -137,6 +256,13 @@ class AbstractGameState(abc.ABC):
 
         return self._capsules
 
+    def getCorridorGraph(self):
+        """
+        Returns the `pacai.core.corridors.CorridorGraph` for this layout.
+        """
+
+        return self._layout.getCorridorGraph()
+
     def getFood(self):
         """
         Returns a Grid of boolean food indicator variables.
@@ -149,6 +275,19 @@ class AbstractGameState(abc.ABC):
 
         return self._food.copy()
 
+    def getFoodList(self):
+        """
+        Returns a list of positions (x, y) of the remaining food.
+        This is the same as `getFood().asList()`, but the list is only built once per
+        configuration of food and is shared between states that have not eaten anything since.
+        The caller should not modify the list.
+        """
+
+        if (self._foodList is None):
+            self._foodList = self._food.asList()
+
+        return self._foodList
+
     def getHighlightLocations(self):
         return self._highlightLocations
 
@@ -173,6 +312,26 @@ class AbstractGameState(abc.ABC):
     def getLastFoodEaten(self):
         return self._lastFoodEaten
 
+    def getMutableAgentState(self, index):
+        """
+        Get the state of the agent with the given index for writing.
+        If the agent state is shared with another game state, then it is copied first.
+        Game rules should use this instead of getAgentState() for any agent that they modify.
+        """
+
+        if (not self._agentStatesCopied[index]):
+            self._agentStates[index] = self._agentStates[index].copy()
+            self._agentStatesCopied[index] = True
+
+        return self._agentStates[index]
+
+    def getMoveTable(self):
+        """
+        Returns the `pacai.core.movetable.MoveTable` of precomputed moves for this layout.
+        """
+
+        return self._layout.getMoveTable()
+
     def getNumAgents(self):
         return len(self._agentStates)
 
@@ -188,7 +347,7 @@ class AbstractGameState(abc.ABC):
         Get the amount of food left on the board.
         """
 
-        return self._food.count()
+        return self._numFood
 
     def getScore(self):
         return self._score
@@ -239,28 +398,210 @@ class AbstractGameState(abc.ABC):
         self._highlightLocations = list(locations)
 
     def setScore(self, score):
+        self._hash ^= util.zobristNumberKey(self._score) ^ util.zobristNumberKey(score)
         self._score = score
-        self._hash = None
 
-    def _initSuccessor(self):
+    def toBytes(self):
+        """
+        Encode this state in a compact binary form, which can be decoded with fromBytes()
+        (given the same layout).
+        The encoding is relative to the layout, so the layout itself is not included.
+        This is a full serialization, so subclasses may include fields that equality ignores
+        (like the time left in capture).
+        Use toKey() for bytes that follow equality (e.g. as a dict key).
+
+        The format is a header (version, score, and flags), a record per agent,
+        a mask of the layout's capsules that remain, and then the bits of the food grid.
+        """
+
+        flags = 0
+        if (self._gameover):
+            flags |= BYTES_FLAG_GAMEOVER
+
+        if (self._win):
+            flags |= BYTES_FLAG_WIN
+
+        parts = [BYTES_HEADER.pack(BYTES_FORMAT_VERSION, self._score, flags)]
+
+        for agentState in self._agentStates:
+            hx, hy = agentState.getHalfPosition()
+
+            code = BYTES_DIRECTIONS.index(agentState.getDirection())
+            if (agentState.isPacman()):
+                code |= BYTES_FLAG_PACMAN
+
+            parts.append(BYTES_AGENT.pack(hx, hy, code, agentState.getScaredTimer()))
+
+        capsuleMask = 0
+        for (i, capsule) in enumerate(self._layout.capsules):
+            if (capsule in self._capsules):
+                capsuleMask |= 1 << i
+
+        parts.append(capsuleMask.to_bytes(_numMaskBytes(len(self._layout.capsules)), 'little'))
+
+        numCells = self._layout.width * self._layout.height
+        parts.append(self._food.getBits().to_bytes(_numMaskBytes(numCells), 'little'))
+
+        return b''.join(parts)
+
+    def toKey(self):
+        """
+        Encode the parts of this state that equality looks at, in the same form as toBytes().
+        States (on the same layout) are equal exactly when their keys are equal,
+        so keys can be used to find duplicate states (e.g. in a transposition table),
+        even across processes.
+        By default, this is the same as toBytes().
+        """
+
+        return self.toBytes()
+
+    def undoMove(self, record):
+        """
+        Revert a move made with `AbstractGameState.applyMove`.
+        """
+
+        self._restoreUndoRecord(record)
+
+    @abc.abstractmethod
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
+        """
+        Apply the action to the context state (self).
+        The legality check can be skipped (validate = False)
+        if the action is already known to be legal.
+        """
+
+        pass
+
+    def _getUndoRecord(self):
+        """
+        Capture everything that applying a single action may change.
+        Children with additional mutable fields should extend this and `_restoreUndoRecord`.
+        """
+
+        return (
+            self._score, self._gameover, self._win, self._hash,
+            self._lastAgentMoved, self._lastFoodEaten, self._lastCapsuleEaten,
+            self._food, self._foodCopied, self._numFood, self._foodList,
+            self._capsules, self._capsulesCopied,
+            list(self._agentStates), self._agentStatesCopied, self._memoizedSuccessors,
+        )
+
+    def _computeHash(self):
+        """
+        Compute the hash of the non-agent fields from scratch.
+        """
+
+        value = (hash(self._layout)
+                ^ util.zobristNumberKey(self._score)
+                ^ util.zobristKey('gameover', self._gameover, self._win))
+
+        for (x, y) in self._food.asList():
+            value ^= util.zobristKey('food', x, y)
+
+        for capsule in self._capsules:
+            value ^= util.zobristKey('capsule', capsule)
+
+        return value
+
+    def _getSuccessorFields(self):
+        """
+        Get the fields that a successor starts with (see `_initSuccessor`).
+        """
+
+        fields = dict(self.__dict__)
+
+        # Leave food and capsules as a shallow copy, but mark them to be copied on write.
+        fields['_foodCopied'] = False
+        fields['_capsulesCopied'] = False
+
+        # Successors start without any saved successors of their own.
+        fields['_memoizedSuccessors'] = None
+
+        return fields
+
+    def _initSuccessor(self, fields = None):
         """
         Get a state that will eventually serve as a successor.
         Initialize the successor to look like this state.
+        Siblings can share the same fields from `_getSuccessorFields`.
         """
 
-        # Start with a shallow copy.
-        successor = copy.copy(self)
-        successor._hash = None
+        if (fields is None):
+            fields = self._getSuccessorFields()
 
-        # Leave food and capsules as a shallow copy, but mark them to be copied on write.
-        successor._foodCopied = False
-        successor._capsulesCopied = False
+        # Start with a shallow copy.
+        successor = self.__class__.__new__(self.__class__)
+        successor.__dict__.update(fields)
 
-        # Agent states need to be deep copied.
-        successor._agentStates = [agentState.copy() for agentState in self._agentStates]
+        # Agent states are shared, and copied when a rule asks to modify one.
+        successor._agentStates = list(self._agentStates)
+        successor._agentStatesCopied = [False] * len(self._agentStates)
 
         return successor
 
+    def _loadBytes(self, data):
+        """
+        Overwrite this (fresh) state with the contents of toBytes().
+        Returns the offset just past the data that was read,
+        so children can decode anything that they add on to the end.
+        """
+
+        view = memoryview(data)
+        layout = self._layout
+
+        capsuleBytes = _numMaskBytes(len(layout.capsules))
+        foodBytes = _numMaskBytes(layout.width * layout.height)
+
+        size = (BYTES_HEADER.size + len(self._agentStates) * BYTES_AGENT.size
+                + capsuleBytes + foodBytes)
+        if (len(view) < size):
+            raise ValueError('Game state data is truncated.')
+
+        (version, score, flags) = BYTES_HEADER.unpack_from(view, 0)
+        if (version != BYTES_FORMAT_VERSION):
+            raise ValueError('Unknown game state format version: %d.' % (version))
+
+        self._score = score
+        self._gameover = bool(flags & BYTES_FLAG_GAMEOVER)
+        self._win = bool(flags & BYTES_FLAG_WIN)
+
+        offset = BYTES_HEADER.size
+        for agentState in self._agentStates:
+            (hx, hy, code, scaredTimer) = BYTES_AGENT.unpack_from(view, offset)
+            offset += BYTES_AGENT.size
+
+            agentState.setHalfPosition((hx, hy))
+            agentState.setDirection(BYTES_DIRECTIONS[code & ~BYTES_FLAG_PACMAN])
+            agentState.setIsPacman(bool(code & BYTES_FLAG_PACMAN))
+            agentState.setScaredTimer(scaredTimer)
+
+        capsuleMask = int.from_bytes(view[offset:(offset + capsuleBytes)], 'little')
+        offset += capsuleBytes
+
+        self._capsules = [capsule for (i, capsule) in enumerate(layout.capsules)
+                if (capsuleMask & (1 << i))]
+
+        foodBits = int.from_bytes(view[offset:(offset + foodBytes)], 'little')
+        offset += foodBytes
+
+        self._food = BitGrid.fromBits(layout.width, layout.height, foodBits)
+        self._numFood = self._food.count()
+        self._foodList = None
+
+        self._hash = self._computeHash()
+
+        return offset
+
+    def _restoreUndoRecord(self, record):
+        (self._score, self._gameover, self._win, self._hash,
+            self._lastAgentMoved, self._lastFoodEaten, self._lastCapsuleEaten,
+            self._food, self._foodCopied, self._numFood, self._foodList,
+            self._capsules, self._capsulesCopied,
+            agentStates, self._agentStatesCopied, self._memoizedSuccessors) = record
+
+        # The record's agent states were never written to (they were copied first).
+        self._agentStates = list(agentStates)
+
     def __eq__(self, other):
         if (other is None):
             return False
@@ -272,6 +613,10 @@ class AbstractGameState(abc.ABC):
         if (type(self) != type(other)):
             return False
 
+        # Most unequal states can be rejected on the hash alone.
+        if (hash(self) != hash(other)):
+            return False
+
         # Note that not all fields are being used because we are checking if two states are equal,
         # not is they got to this confiruation in the same way.
 
@@ -288,8 +633,14 @@ class AbstractGameState(abc.ABC):
                 and self._layout == other._layout)
 
     def __hash__(self):
-        if (self._hash is None):
-            self._hash = util.buildHash(self._score, self._gameover, self._win, *self._capsules,
-                self._food, *self._agentStates, self._layout)
+        value = self._hash
+
+        # Scale each agent's hash by a per-index odd multiplier,
+        # so that swapping two agents changes the hash.
+        for (agentState, multiplier) in zip(self._agentStates, self._agentHashMultipliers):
+            value ^= (hash(agentState) * multiplier) & ZOBRIST_MASK
+
+        return value
 
-        return self._hash
+def _numMaskBytes(numBits):
+    return (numBits + 7) // 8
@@ -55,6 +55,9 @@ class Grid:
         if (other is None):
             return False
 
+        if (isinstance(other, BitGrid)):
+            return other == self
+
         return self._data == other._data
 
     def __getitem__(self, i):
@@ -82,3 +85,201 @@ class Grid:
         out = [[str(self._data[x][y])[0] for x in range(self._width)] for y in range(self._height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
+
+class BitGrid:
+    """
+    A 2-dimensional array of booleans backed by a single integer bitmask.
+    This offers the same grid[x][y] interface as `Grid`,
+    but copying, equality, hashing, and counting do not need to visit every cell.
+
+    The cell (x, y) is stored in bit (x * height + y),
+    which is the same order that `Grid` uses when building its hash.
+    So equal Grids and BitGrids also hash the same.
+    """
+
+    def __init__(self, width, height, initialValue = False):
+        if (not isinstance(initialValue, bool)):
+            raise ValueError('Grids can only contain booleans')
+
+        self._width = width
+        self._height = height
+
+        # The column views for grid[x][y], built on the first read.
+        self._columns = None
+
+        self._bits = 0
+        if (initialValue):
+            self._bits = self._fullMask()
+
+    @staticmethod
+    def fromGrid(grid):
+        """
+        Build a BitGrid with the same contents as any other grid.
+        """
+
+        bitGrid = BitGrid(grid.getWidth(), grid.getHeight())
+        for (x, y) in grid.asList():
+            bitGrid._bits |= 1 << (x * bitGrid._height + y)
+
+        return bitGrid
+
+    @staticmethod
+    def fromBits(width, height, bits):
+        """
+        Build a BitGrid directly from an integer bitmask (see `BitGrid.getBits`).
+        """
+
+        if (bits < 0 or bits >> (width * height)):
+            raise ValueError('Bits do not fit in a %dx%d grid.' % (width, height))
+
+        grid = BitGrid.__new__(BitGrid)
+        grid._width = width
+        grid._height = height
+        grid._columns = None
+        grid._bits = bits
+        return grid
+
+    def asList(self, key = True):
+        bits = self._bits
+        if (not key):
+            bits = self._fullMask() & ~bits
+
+        values = []
+        while (bits):
+            lowestBit = bits & -bits
+            values.append(divmod(lowestBit.bit_length() - 1, self._height))
+            bits ^= lowestBit
+
+        return values
+
+    def copy(self):
+        grid = BitGrid.__new__(BitGrid)
+        grid._width = self._width
+        grid._height = self._height
+        grid._columns = None
+        grid._bits = self._bits
+        return grid
+
+    def count(self, item = True):
+        setCount = bin(self._bits).count('1')
+        if (item):
+            return setCount
+
+        return self._width * self._height - setCount
+
+    def deepCopy(self):
+        return self.copy()
+
+    def getBits(self):
+        """
+        Get the integer bitmask backing this grid.
+        """
+
+        return self._bits
+
+    def getHeight(self):
+        return self._height
+
+    def getWidth(self):
+        return self._width
+
+    def shallowCopy(self):
+        # The backing integer is immutable, so there is nothing to share.
+        return self.copy()
+
+    def _fullMask(self):
+        return (1 << (self._width * self._height)) - 1
+
+    def _checkX(self, x):
+        if (x < 0):
+            x += self._width
+
+        if (x < 0 or x >= self._width):
+            raise IndexError('Grid index out of range: %d.' % (x))
+
+        return x
+
+    def _get(self, x, y):
+        if (y < 0):
+            y += self._height
+
+        if (y < 0 or y >= self._height):
+            raise IndexError('Grid index out of range: %d.' % (y))
+
+        return ((self._bits >> (x * self._height + y)) & 1) == 1
+
+    def _set(self, x, y, value):
+        if (y < 0):
+            y += self._height
+
+        if (y < 0 or y >= self._height):
+            raise IndexError('Grid index out of range: %d.' % (y))
+
+        bit = 1 << (x * self._height + y)
+        if (value):
+            self._bits |= bit
+        else:
+            self._bits &= ~bit
+
+    def __eq__(self, other):
+        if (other is None):
+            return False
+
+        if (isinstance(other, BitGrid)):
+            return (self._bits == other._bits
+                    and self._width == other._width
+                    and self._height == other._height)
+
+        if (isinstance(other, Grid)):
+            return self == BitGrid.fromGrid(other)
+
+        return False
+
+    def __getitem__(self, x):
+        # Reads are hot, so each column view is only made once.
+        columns = self._columns
+        if (columns is None):
+            columns = tuple(_BitGridColumn(self, i) for i in range(self._width))
+            self._columns = columns
+
+        try:
+            return columns[x]
+        except IndexError:
+            raise IndexError('Grid index out of range: %d.' % (x))
+
+    def __hash__(self):
+        return hash(self._bits)
+
+    def __lt__(self, other):
+        return self.__hash__() < other.__hash__()
+
+    def __setitem__(self, x, column):
+        x = self._checkX(x)
+        for y in range(self._height):
+            self._set(x, y, column[y])
+
+    def __str__(self):
+        out = [[str(self._get(x, y))[0] for x in range(self._width)] for y in range(self._height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+class _BitGridColumn:
+    """
+    A light view over a single column of a `BitGrid`.
+    This is what allows the grid[x][y] syntax to read and write bits.
+    """
+
+    __slots__ = ('_grid', '_x')
+
+    def __init__(self, grid, x):
+        self._grid = grid
+        self._x = x
+
+    def __getitem__(self, y):
+        return self._grid._get(self._x, y)
+
+    def __len__(self):
+        return self._grid._height
+
+    def __setitem__(self, y, value):
+        self._grid._set(self._x, y, value)
@@ -1,8 +1,10 @@
 import os
 import random
 
+from pacai.core.corridors import CorridorGraph
 from pacai.core.distance import manhattan
-from pacai.core.grid import Grid
+from pacai.core.grid import BitGrid
+from pacai.core.movetable import MoveTable
 
 # By default, the layout directory is adjacent to this file.
 DEFAULT_LAYOUT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'layouts')
@@ -17,8 +19,8 @@ class Layout(object):
     def __init__(self, layoutText, maxGhosts = None):
         self.width = len(layoutText[0])
         self.height = len(layoutText)
-        self.walls = Grid(self.width, self.height, initialValue = False)
-        self.food = Grid(self.width, self.height, initialValue = False)
+        self.walls = BitGrid(self.width, self.height, initialValue = False)
+        self.food = BitGrid(self.width, self.height, initialValue = False)
         self.capsules = []
         self.agentPositions = []
         self.numGhosts = 0
@@ -26,6 +28,46 @@ class Layout(object):
 
         self.processLayoutText(layoutText, maxGhosts)
 
+        # Built lazily, see getMoveTable() and getCorridorGraph().
+        self._moveTable = None
+        self._corridorGraph = None
+
+    def __getstate__(self):
+        # Layouts are pickled into replays, and the lazily built structures are easy to rebuild.
+        state = self.__dict__.copy()
+        state['_moveTable'] = None
+        state['_corridorGraph'] = None
+
+        return state
+
+    def __setstate__(self, state):
+        # Layouts pickled before the lazily built structures existed do not have them.
+        self.__dict__.update(state)
+        self._moveTable = None
+        self._corridorGraph = None
+
+    def getCorridorGraph(self):
+        """
+        Get the `pacai.core.corridors.CorridorGraph` for this layout.
+        The graph is built on the first call and then shared by all callers.
+        """
+
+        if (self._corridorGraph is None):
+            self._corridorGraph = CorridorGraph(self.walls)
+
+        return self._corridorGraph
+
+    def getMoveTable(self):
+        """
+        Get the `pacai.core.movetable.MoveTable` for this layout.
+        The table is built on the first call and then shared by all callers.
+        """
+
+        if (self._moveTable is None):
+            self._moveTable = MoveTable(self.walls)
+
+        return self._moveTable
+
     def getNumGhosts(self):
         return self.numGhosts
 
@@ -0,0 +1,80 @@
+"""
+A precomputed table of the moves available from each open cell of a layout.
+"""
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+
+class MoveTable(object):
+    """
+    For every open cell of a layout, this table holds the legal actions
+    (in the same order as `pacai.core.actions.Actions.getPossibleActions`),
+    the legal neighbors (as `pacai.core.actions.Actions.getLegalNeighbors`),
+    and the cardinal (action, next cell) pairs used by search problems.
+
+    All of these are stored as tuples, so callers must not (and can not) modify them.
+    A table is built once per `pacai.core.layout.Layout` (see `Layout.getMoveTable`)
+    and shared by every state, search problem, and agent on that layout.
+    """
+
+    def __init__(self, walls):
+        self._walls = walls
+
+        self._actions = {}
+        self._neighbors = {}
+        self._successors = {}
+
+        for position in walls.asList(False):
+            self._actions[position] = tuple(Actions.getPossibleActions(position,
+                    Directions.STOP, walls))
+            self._neighbors[position] = tuple(Actions.getLegalNeighbors(position, walls))
+            self._successors[position] = self._buildSuccessors(position)
+
+    def getLegalNeighbors(self, position):
+        """
+        Get the open cells reachable in one move (including staying put)
+        from the grid point nearest to the given position.
+        """
+
+        neighbors = self._neighbors.get(position)
+        if (neighbors is None):
+            neighbors = tuple(Actions.getLegalNeighbors(position, self._walls))
+
+        return neighbors
+
+    def getPossibleActions(self, position, direction):
+        """
+        Get the legal actions for an agent at the given position and facing the given direction.
+        Between grid points, agents must continue straight.
+        """
+
+        actions = self._actions.get(position)
+        if (actions is None):
+            actions = tuple(Actions.getPossibleActions(position, direction, self._walls))
+
+        return actions
+
+    def getSuccessors(self, position):
+        """
+        Get (action, next position) pairs for all the cardinal moves out of a grid position,
+        in the order of `pacai.core.directions.Directions.CARDINAL`.
+        """
+
+        successors = self._successors.get(position)
+        if (successors is None):
+            successors = self._buildSuccessors(position)
+
+        return successors
+
+    def _buildSuccessors(self, position):
+        x, y = position
+        successors = []
+
+        for action in Directions.CARDINAL:
+            dx, dy = Actions.directionToVector(action)
+            nextx, nexty = int(x + dx), int(y + dy)
+
+            if (not self._walls[nextx][nexty]):
+                successors.append((action, (nextx, nexty)))
+
+        return tuple(successors)
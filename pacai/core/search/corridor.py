@@ -0,0 +1,88 @@
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.search.position import PositionSearchProblem
+
+class CorridorSearchProblem(PositionSearchProblem):
+    """
+    A `pacai.core.search.position.PositionSearchProblem` over the
+    `pacai.core.corridors.CorridorGraph` of the layout.
+    Instead of stepping one cell at a time, every successor follows a whole corridor
+    (up to the next junction or dead end, or the goal if it is on the way),
+    so searches only expand the start, the junctions, and the dead ends.
+
+    Each action is a tuple of single moves, and the cost of an action is the total cost of
+    the cells it moves through.
+    Since actions have different costs, only cost-aware searches (uniform cost, A*)
+    are guaranteed to find the cheapest path.
+    Use `CorridorSearchProblem.expandActions` to turn a path back into single moves
+    (`pacai.agents.search.base.SearchAgent` does this automatically).
+    """
+
+    def __init__(self, gameState, **kwargs):
+        super().__init__(gameState, **kwargs)
+
+        self.graph = gameState.getCorridorGraph()
+
+    def actionsCost(self, actions):
+        if (actions is None):
+            return 999999
+
+        return super().actionsCost(self.expandActions(actions))
+
+    def expandActions(self, actions):
+        moves = []
+        for action in actions:
+            moves.extend(action)
+
+        return moves
+
+    def predecessorStates(self, state):
+        """
+        Returns the positions at the other ends of the corridors leaving this state
+        (or the start, if it is on the way), the moves from there to this state, and their cost.
+        """
+
+        predecessors = []
+
+        for (previousState, moves, _) in self.graph.getNeighbors(state,
+                stops = (self.startState,)):
+            moves = tuple(Directions.REVERSE[move] for move in reversed(moves))
+            predecessors.append((previousState, moves, self._pathCost(previousState, moves)))
+
+        self._numExpanded += 1
+        if (state not in self._visitedLocations):
+            self._visitedLocations.add(state)
+            self._visitHistory.append(state)
+
+        return predecessors
+
+    def successorStates(self, state):
+        """
+        Returns the positions at the other ends of the corridors leaving this state,
+        the moves needed to get there, and their cost.
+        """
+
+        successors = []
+
+        for (nextState, moves, _) in self.graph.getNeighbors(state, stops = (self.goal,)):
+            cost = self._pathCost(state, moves)
+            successors.append((nextState, moves, cost))
+
+        # Bookkeeping for display purposes (the highlight in the GUI).
+        self._numExpanded += 1
+        if (state not in self._visitedLocations):
+            self._visitedLocations.add(state)
+            self._visitHistory.append(state)
+
+        return successors
+
+    def _pathCost(self, start, moves):
+        x, y = start
+        cost = 0
+
+        for move in moves:
+            dx, dy = Actions.directionToVector(move)
+            x, y = int(x + dx), int(y + dy)
+            cost += self.costFn((x, y))
+
+        return cost
@@ -0,0 +1,252 @@
+"""
+Reference implementations of the standard graph searches.
+
+Unlike `pacai.core.search.search` (which hands out the student implementations),
+these are tested, and built to handle large searches:
+closed lists are hash sets, paths are rebuilt from parent pointers once a goal is found,
+and the best-first searches lower the priority of queued states
+(`pacai.util.priorityQueue.IndexedPriorityQueue`) instead of queuing them again.
+
+Every search takes a `pacai.core.search.problem.SearchProblem`,
+and returns a list of actions that reaches a goal, or None if no goal can be reached.
+To use one with a `pacai.agents.search.base.SearchAgent`, pass its full name as `fn`,
+e.g. `fn=pacai.core.search.engine.astar`.
+The searches report their frontier and closed set sizes to the problem's
+`pacai.core.search.stats.SearchStats` (if it has one).
+"""
+
+from pacai.core.search.heuristic import null as nullHeuristic
+from pacai.util.priorityQueue import IndexedPriorityQueue
+from pacai.util.queue import Queue
+
+# The weight on the heuristic for weightedAStarSearch.
+DEFAULT_WEIGHT = 2.0
+
+def aStarSearch(problem, heuristic = nullHeuristic):
+    """
+    Search the state with the lowest combined cost and heuristic first.
+    The path is the cheapest one as long as the heuristic is consistent.
+    """
+
+    return _bestFirstSearch(problem, heuristic, 1)
+
+def bidirectionalSearch(problem):
+    """
+    A breadth-first search from both the start and the goal, that stops when they meet.
+    Like `breadthFirstSearch`, the path has the fewest actions.
+
+    This only works on problems with a single goal state (`problem.goal`),
+    that can also be searched backwards (with a `predecessorStates` method),
+    like `pacai.core.search.position.PositionSearchProblem`.
+    """
+
+    goal = getattr(problem, 'goal', None)
+    if (goal is None):
+        raise ValueError('%s does not have a single goal state.' % (type(problem).__name__))
+
+    if (not hasattr(problem, 'predecessorStates')):
+        raise ValueError('%s can not be searched backwards.' % (type(problem).__name__))
+
+    start = problem.startingState()
+    if (problem.isGoal(start)):
+        return []
+
+    # {state: (neighbor, action, depth)}
+    # Forward, the action leads from the neighbor to the state.
+    # Backward, the action leads from the state to the neighbor.
+    forward = {start: (None, None, 0)}
+    backward = {goal: (None, None, 0)}
+
+    forwardLayer = [start]
+    backwardLayer = [goal]
+
+    stats = problem.getStats()
+
+    meeting = None
+    while (meeting is None and len(forwardLayer) > 0 and len(backwardLayer) > 0):
+        if (stats is not None):
+            stats.trackFrontier(len(forwardLayer) + len(backwardLayer))
+            stats.trackClosed(len(forward) + len(backward))
+
+        # Grow the smaller side by a whole layer.
+        if (len(forwardLayer) <= len(backwardLayer)):
+            forwardLayer, meeting = _expandLayer(forwardLayer, forward, backward,
+                    problem.successorStates)
+        else:
+            backwardLayer, meeting = _expandLayer(backwardLayer, backward, forward,
+                    problem.predecessorStates)
+
+    if (meeting is None):
+        return None
+
+    actions = _buildPath(forward, meeting)
+
+    state = meeting
+    while (state != goal):
+        (state, action, _) = backward[state]
+        actions.append(action)
+
+    return actions
+
+def breadthFirstSearch(problem):
+    """
+    Search the shallowest states first.
+    The path has the fewest actions (but not necessarily the lowest cost).
+    """
+
+    start = problem.startingState()
+    if (problem.isGoal(start)):
+        return []
+
+    parents = {start: (None, None, 0)}
+    queue = Queue()
+    queue.push(start)
+
+    stats = problem.getStats()
+
+    while (not queue.isEmpty()):
+        if (stats is not None):
+            # Every state that has been queued stays closed.
+            stats.trackFrontier(len(queue))
+            stats.trackClosed(len(parents))
+
+        state = queue.pop()
+        depth = parents[state][2] + 1
+
+        for (nextState, action, _) in problem.successorStates(state):
+            if (nextState in parents):
+                continue
+
+            parents[nextState] = (state, action, depth)
+            if (problem.isGoal(nextState)):
+                return _buildPath(parents, nextState)
+
+            queue.push(nextState)
+
+    return None
+
+def uniformCostSearch(problem):
+    """
+    Search the state with the lowest cost first.
+    The path is the cheapest one.
+    """
+
+    return _bestFirstSearch(problem, None, 0)
+
+def weightedAStarSearch(problem, heuristic = nullHeuristic):
+    """
+    An A* search that trusts the heuristic more (by `DEFAULT_WEIGHT`),
+    so it heads for the goal more eagerly.
+    This usually expands far fewer states,
+    and the path costs at most `DEFAULT_WEIGHT` times the cheapest one
+    (as long as the heuristic is consistent).
+    """
+
+    return _bestFirstSearch(problem, heuristic, DEFAULT_WEIGHT)
+
+def _bestFirstSearch(problem, heuristic, weight):
+    """
+    Search the state with the lowest cost plus weighted heuristic first.
+    Each state is estimated by the heuristic only once.
+    """
+
+    start = problem.startingState()
+
+    # {state: (parent, action, cost)}
+    parents = {start: (None, None, 0)}
+    estimates = {}
+    closed = set()
+
+    frontier = IndexedPriorityQueue()
+    frontier.push(start, 0)
+
+    stats = problem.getStats()
+
+    while (not frontier.isEmpty()):
+        if (stats is not None):
+            stats.trackFrontier(len(frontier))
+            stats.trackClosed(len(closed))
+
+        state = frontier.pop()
+        if (problem.isGoal(state)):
+            return _buildPath(parents, state)
+
+        closed.add(state)
+        cost = parents[state][2]
+
+        for (nextState, action, stepCost) in problem.successorStates(state):
+            if (nextState in closed):
+                continue
+
+            nextCost = cost + stepCost
+
+            parent = parents.get(nextState)
+            if (parent is not None and parent[2] <= nextCost):
+                continue
+
+            parents[nextState] = (state, action, nextCost)
+
+            priority = nextCost
+            if (heuristic is not None):
+                estimate = estimates.get(nextState)
+                if (estimate is None):
+                    estimate = weight * heuristic(nextState, problem)
+                    estimates[nextState] = estimate
+
+                priority += estimate
+
+            frontier.update(nextState, priority)
+
+    return None
+
+def _buildPath(parents, state):
+    """
+    Follow the parent pointers from a state back to the start.
+    Returns the actions from the start to the state.
+    """
+
+    actions = []
+
+    (parent, action, _) = parents[state]
+    while (parent is not None):
+        actions.append(action)
+        (parent, action, _) = parents[parent]
+
+    actions.reverse()
+    return actions
+
+def _expandLayer(layer, parents, otherParents, expand):
+    """
+    Expand every state in one layer of a bidirectional search.
+    Returns the next layer and the state (if any) where this side met the other one
+    with the shortest total path.
+    """
+
+    nextLayer = []
+    meeting = None
+    best = None
+
+    for state in layer:
+        depth = parents[state][2] + 1
+
+        for (nextState, action, _) in expand(state):
+            if (nextState in parents):
+                continue
+
+            parents[nextState] = (state, action, depth)
+            nextLayer.append(nextState)
+
+            other = otherParents.get(nextState)
+            if (other is not None and (best is None or depth + other[2] < best)):
+                best = depth + other[2]
+                meeting = nextState
+
+    return nextLayer, meeting
+
+# Abbreviations
+
+astar = aStarSearch
+bfs = breadthFirstSearch
+bidirectional = bidirectionalSearch
+ucs = uniformCostSearch
+wastar = weightedAStarSearch
@@ -1,5 +1,4 @@
 from pacai.core.actions import Actions
-from pacai.core.directions import Directions
 from pacai.core.search.problem import SearchProblem
 
 class FoodSearchProblem(SearchProblem):
@@ -18,6 +17,7 @@ class FoodSearchProblem(SearchProblem):
 
         self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
         self.walls = startingGameState.getWalls()
+        self.moveTable = startingGameState.getMoveTable()
         self.startingGameState = startingGameState
         self.heuristicInfo = {}  # A dictionary for the heuristic to store information
 
@@ -34,14 +34,10 @@ class FoodSearchProblem(SearchProblem):
 
         successors = []
         self._numExpanded += 1
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x, y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append((((nextx, nexty), nextFood), direction, 1))
+        for (direction, (nextx, nexty)) in self.moveTable.getSuccessors(state[0]):
+            nextFood = state[1].copy()
+            nextFood[nextx][nexty] = False
+            successors.append((((nextx, nexty), nextFood), direction, 1))
 
         return successors
 
@@ -62,3 +58,54 @@ class FoodSearchProblem(SearchProblem):
             cost += 1
 
         return cost
+
+class PackedFoodSearchProblem(FoodSearchProblem):
+    """
+    The same search as `FoodSearchProblem`, but the remaining food is packed into an int.
+
+    A search state is a tuple (pacmanPosition, foodMask),
+    where bit i of foodMask is set while there is still food at `foodPositions[i]`
+    (the food of the starting state, in the order of `Grid.asList`).
+    Unlike a `pacai.core.grid.Grid`, the mask is immutable and cheap to hash,
+    so each successor only costs an integer operation
+    instead of a copy of the food grid.
+
+    `pacai.core.search.heuristic.foodMST` is a heuristic for this problem.
+    """
+
+    def __init__(self, startingGameState):
+        super().__init__(startingGameState)
+
+        self.foodPositions = tuple(startingGameState.getFood().asList())
+
+        # {position: mask that clears the food there}
+        self._eatMasks = {position: ~(1 << i) for (i, position) in enumerate(self.foodPositions)}
+
+        self.start = (startingGameState.getPacmanPosition(), (1 << len(self.foodPositions)) - 1)
+
+    def getFoodPositions(self, foodMask):
+        """
+        Get the positions of the food in a mask.
+        """
+
+        return [position for (i, position) in enumerate(self.foodPositions)
+                if (foodMask & (1 << i))]
+
+    def isGoal(self, state):
+        return state[1] == 0
+
+    def successorStates(self, state):
+        """
+        Returns successor states, the actions they require, and a cost of 1.
+        """
+
+        (position, foodMask) = state
+        eatMasks = self._eatMasks
+
+        successors = []
+        self._numExpanded += 1
+        for (direction, nextPosition) in self.moveTable.getSuccessors(position):
+            nextFood = foodMask & eatMasks.get(nextPosition, -1)
+            successors.append(((nextPosition, nextFood), direction, 1))
+
+        return successors
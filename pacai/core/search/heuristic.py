@@ -4,6 +4,7 @@ goal in the provided `pacai.core.search.problem.SearchProblem`.
 """
 
 from pacai.core import distance
+from pacai.core import distanceCalculator
 
 def null(state, problem = None):
     """
@@ -32,9 +33,117 @@ def euclidean(position, problem):
 
     return distance.euclidean(position1, position2)
 
+def landmark(position, problem):
+    """
+    This heuristic is a lower bound on the maze distance to the goal,
+    from the triangle inequality with a few landmark cells
+    (see `pacai.core.distanceCalculator.LandmarkDistanceOracle`).
+    The landmarks are picked once per layout, and shared by every search on it.
+    """
+
+    oracle = distanceCalculator.getLandmarkOracle(problem.walls)
+    bound = oracle.getLowerBound(position, problem.goal)
+
+    if (bound is None):
+        # The goal is not an open cell.
+        return 0
+
+    return bound
+
+def foodMST(state, problem):
+    """
+    A heuristic for the `pacai.core.search.food.PackedFoodSearchProblem`:
+    the maze distance to the closest food,
+    plus the weight of a minimum spanning tree (over maze distances) of all the remaining food.
+    Any path that eats all the food has to reach some food and then connect the rest,
+    so this never overestimates (and is consistent).
+
+    Spanning trees are memoized by food mask in `problem.heuristicInfo`,
+    so each set of remaining food is only computed once per search.
+    """
+
+    (position, foodMask) = state
+    if (foodMask == 0):
+        return 0
+
+    info = problem.heuristicInfo
+    if ('foodMST' not in info):
+        info['foodMST'] = _FoodDistances(problem)
+
+    return info['foodMST'].getEstimate(position, foodMask)
+
 def numFood(state, problem):
     """
     This heuristic is the amount of food left to on the board.
     """
 
     return state[1].count()
+
+class _FoodDistances(object):
+    """
+    The maze distances from each food of a `pacai.core.search.food.PackedFoodSearchProblem`,
+    and the spanning tree weights computed so far (by food mask).
+    """
+
+    def __init__(self, problem):
+        table = distanceCalculator.getRegistry().getPinnedTable(problem.walls)
+        self._table = table
+
+        # The distances from each food to every open cell.
+        self._rows = [table.getRow(table.getIndex(food)) for food in problem.foodPositions]
+
+        # The distances between each pair of food.
+        foodIndexes = [table.getIndex(food) for food in problem.foodPositions]
+        self._foodDistances = [[row[index] for index in foodIndexes] for row in self._rows]
+
+        # {food mask: weight of the minimum spanning tree}
+        self._treeWeights = {}
+
+    def getEstimate(self, position, foodMask):
+        foods = _getBits(foodMask)
+
+        index = self._table.getIndex(position)
+        closest = min([self._rows[food][index] for food in foods])
+
+        weight = self._treeWeights.get(foodMask)
+        if (weight is None):
+            weight = self._getTreeWeight(foods)
+            self._treeWeights[foodMask] = weight
+
+        return closest + weight
+
+    def _getTreeWeight(self, foods):
+        """
+        Prim's algorithm over the (complete) graph of food.
+        """
+
+        distances = self._foodDistances
+
+        # The cheapest edge from each food outside the tree into it.
+        first = foods[0]
+        costs = {food: distances[first][food] for food in foods[1:]}
+        weight = 0
+
+        while (len(costs) > 0):
+            nextFood = min(costs, key = costs.get)
+            weight += costs.pop(nextFood)
+
+            row = distances[nextFood]
+            for food in costs:
+                if (row[food] < costs[food]):
+                    costs[food] = row[food]
+
+        return weight
+
+def _getBits(mask):
+    """
+    Get the numbers of the set bits in a mask (lowest first).
+    """
+
+    bits = []
+    while (mask):
+        lowest = mask & -mask
+        bits.append(lowest.bit_length() - 1)
+        mask ^= lowest
+
+    return bits
@@ -24,6 +24,7 @@ class PositionSearchProblem(SearchProblem):
         super().__init__()
 
         self.walls = gameState.getWalls()
+        self.moveTable = gameState.getMoveTable()
         self.goal = goal
         self.costFn = costFn
 
@@ -51,6 +52,26 @@ class PositionSearchProblem(SearchProblem):
 
         return True
 
+    def predecessorStates(self, state):
+        """
+        Returns the positions that can move into this state, the actions that do it,
+        and the cost of entering this state.
+        """
+
+        predecessors = []
+        cost = self.costFn(state)
+
+        # Every move can be undone, so the neighbors are also the predecessors.
+        for (action, previousState) in self.moveTable.getSuccessors(state):
+            predecessors.append((previousState, Directions.REVERSE[action], cost))
+
+        self._numExpanded += 1
+        if (state not in self._visitedLocations):
+            self._visitedLocations.add(state)
+            self._visitHistory.append(state)
+
+        return predecessors
+
     def successorStates(self, state):
         """
         Returns successor states, the actions they require, and a constant cost of 1.
@@ -58,16 +79,9 @@ class PositionSearchProblem(SearchProblem):
 
         successors = []
 
-        for action in Directions.CARDINAL:
-            x, y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-
-            if (not self.walls[nextx][nexty]):
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-
-                successors.append((nextState, action, cost))
+        for (action, nextState) in self.moveTable.getSuccessors(state):
+            cost = self.costFn(nextState)
+            successors.append((nextState, action, cost))
 
         # Bookkeeping for display purposes (the highlight in the GUI).
         self._numExpanded += 1
@@ -20,6 +20,11 @@ class SearchProblem(abc.ABC):
     states,
     while `SearchProblem.isGoal` and `SearchProblem.actionsCost` evaluate
     those same states and actions.
+
+    Problems that can also be searched backwards from the goal
+    (like `pacai.core.search.engine.bidirectionalSearch` does) add a `predecessorStates` method:
+    the same as `SearchProblem.successorStates`, but listing the states that move into a state
+    (with the action that leads from each of them).
     """
 
     def __init__(self):
@@ -32,6 +37,9 @@ class SearchProblem(abc.ABC):
         self._visitedLocations = set()
         self._visitHistory = []
 
+        # A `pacai.core.search.stats.SearchStats` (if anyone is collecting them).
+        self._stats = None
+
     @abc.abstractmethod
     def actionsCost(self, actions):
         """
@@ -43,9 +51,22 @@ class SearchProblem(abc.ABC):
 
         pass
 
+    def expandActions(self, actions):
+        """
+        Turn the actions a search returned into the single moves an agent can make.
+        Most problems already use single moves, so by default the actions are returned as-is.
+        Problems whose successors take several moves at once (like
+        `pacai.core.search.corridor.CorridorSearchProblem`) override this.
+        """
+
+        return actions
+
     def getExpandedCount(self):
         return self._numExpanded
 
+    def getStats(self):
+        return self._stats
+
     def getVisitHistory(self):
         return self._visitHistory
 
@@ -60,6 +81,9 @@ class SearchProblem(abc.ABC):
 
         pass
 
+    def setStats(self, stats):
+        self._stats = stats
+
     @abc.abstractmethod
     def startingState(self):
         """
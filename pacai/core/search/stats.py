@@ -0,0 +1,194 @@
+"""
+Statistics about a single run of a search.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+class SearchStats(object):
+    """
+    Counts what a search did: how many states it generated and expanded,
+    how many of the generated states it had already seen,
+    how large its frontier and closed set grew,
+    how often (and for how long) it called the heuristic,
+    and how long and how much memory the whole search took.
+
+    Nothing is collected unless a `SearchStats` is attached to a problem
+    (`SearchStats.attach`), so searches pay nothing for this when it is not used.
+    Any search gets the generated and expanded counts (they come from the problem),
+    but only searches that report them (like the ones in `pacai.core.search.engine`)
+    fill in the frontier and closed set sizes.
+    Heuristic calls are only counted for heuristics wrapped by `SearchStats.wrapHeuristic`
+    (`pacai.agents.search.base.SearchAgent` does this).
+
+    While memory is being tracked (with `tracemalloc`), everything runs a few times slower,
+    so the time is only good for comparing searches that were measured the same way.
+    Finding duplicates means keeping every generated state in a set,
+    which would be counted in the peak memory,
+    so duplicates are only counted when memory is not tracked (and are None otherwise).
+    """
+
+    def __init__(self, trackMemory = True, **labels):
+        """
+        Any labels (e.g. the name of the layout) are included in the output.
+        """
+
+        self.labels = labels
+        self.trackMemory = trackMemory
+
+        self.generated = 0
+        self.expanded = 0
+        self.duplicates = None if trackMemory else 0
+
+        # None until a search reports them.
+        self.peakFrontier = None
+        self.peakClosed = None
+
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+
+        self.peakMemory = None
+        self.time = None
+
+        # The result of the search.
+        self.cost = None
+        self.pathLength = None
+
+        self._seen = set()
+        self._startTime = None
+        self._startedTracing = False
+        self._baseMemory = 0
+
+    def attach(self, problem):
+        """
+        Start counting the states a problem generates and expands.
+        """
+
+        problem.setStats(self)
+
+        if (not self.trackMemory):
+            self._seen.add(problem.startingState())
+
+        for name in ['successorStates', 'predecessorStates']:
+            if (hasattr(problem, name)):
+                setattr(problem, name, self._countExpansions(getattr(problem, name)))
+
+    def dump(self, path):
+        """
+        Append these stats to a file as a single line of JSON ('-' writes to stdout).
+        """
+
+        if (path == '-'):
+            print(self.toJSON())
+            sys.stdout.flush()
+            return
+
+        with open(path, 'a') as file:
+            file.write(self.toJSON() + '\n')
+
+    def start(self):
+        if (self.trackMemory):
+            self._startedTracing = not tracemalloc.is_tracing()
+            if (self._startedTracing):
+                tracemalloc.start()
+            else:
+                # Only in Python 3.9+.
+                # Without it, an earlier peak (from whoever else is tracing) may show up.
+                resetPeak = getattr(tracemalloc, 'reset_peak', None)
+                if (resetPeak is not None):
+                    resetPeak()
+
+            self._baseMemory = tracemalloc.get_traced_memory()[0]
+
+        self._startTime = time.perf_counter()
+
+    def setResult(self, actions, cost):
+        """
+        Record the path a search found (None if it did not find one) and its cost.
+        """
+
+        if (actions is not None):
+            self.pathLength = len(actions)
+
+        self.cost = cost
+
+    def stop(self):
+        """
+        Stop the clock (and memory tracking).
+        """
+
+        self.time = time.perf_counter() - self._startTime
+
+        if (self.trackMemory):
+            self.peakMemory = tracemalloc.get_traced_memory()[1] - self._baseMemory
+            if (self._startedTracing):
+                tracemalloc.stop()
+
+        self._seen = set()
+
+    def toDict(self):
+        data = dict(self.labels)
+        data.update({
+            'cost': self.cost,
+            'pathLength': self.pathLength,
+            'time': self.time,
+            'generated': self.generated,
+            'expanded': self.expanded,
+            'duplicates': self.duplicates,
+            'peakFrontier': self.peakFrontier,
+            'peakClosed': self.peakClosed,
+            'heuristicCalls': self.heuristicCalls,
+            'heuristicTime': self.heuristicTime,
+            'peakMemory': self.peakMemory,
+        })
+
+        return data
+
+    def toJSON(self):
+        return json.dumps(self.toDict(), sort_keys = True)
+
+    def trackClosed(self, size):
+        if (self.peakClosed is None or size > self.peakClosed):
+            self.peakClosed = size
+
+    def trackFrontier(self, size):
+        if (self.peakFrontier is None or size > self.peakFrontier):
+            self.peakFrontier = size
+
+    def wrapHeuristic(self, heuristic):
+        """
+        Get a heuristic that counts and times its calls.
+        """
+
+        def countedHeuristic(state, problem):
+            startTime = time.perf_counter()
+            value = heuristic(state, problem)
+            self.heuristicTime += time.perf_counter() - startTime
+            self.heuristicCalls += 1
+
+            return value
+
+        return countedHeuristic
+
+    def _countExpansions(self, expand):
+        def countedExpand(state):
+            successors = expand(state)
+
+            self.expanded += 1
+            self.generated += len(successors)
+
+            if (self.trackMemory):
+                return successors
+
+            seen = self._seen
+            for successor in successors:
+                if (successor[0] in seen):
+                    self.duplicates += 1
+                else:
+                    seen.add(successor[0])
+
+            return successors
+
+        return countedExpand
@@ -0,0 +1,388 @@
+"""
+A NumPy backed engine that plays many classic pacman games in lockstep.
+
+This follows the same rules as `pacai.bin.pacman.PacmanRules` and `pacai.bin.pacman.GhostRules`,
+but instead of one object graph per game, the state of all games is kept in a few arrays
+that each have a leading batch (game) dimension.
+Every call to `VectorizedPacmanGames.step` moves one agent in every game at once.
+This is meant for running large numbers of headless games (e.g. for evaluating policies),
+and not as a replacement for `pacai.bin.pacman.PacmanGameState`.
+
+NumPy is not a dependency of pacai, so it is only imported when a simulator is built.
+"""
+
+from pacai.bin.pacman import BOARD_CLEAR_POINTS
+from pacai.bin.pacman import COLLISION_TOLERANCE
+from pacai.bin.pacman import FOOD_POINTS
+from pacai.bin.pacman import GHOST_POINTS
+from pacai.bin.pacman import GhostRules
+from pacai.bin.pacman import LOSE_POINTS
+from pacai.bin.pacman import PACMAN_AGENT_INDEX
+from pacai.bin.pacman import PacmanRules
+from pacai.bin.pacman import SCARED_TIME
+from pacai.bin.pacman import TIME_PENALTY
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+
+# All actions, in the same order that getLegalActions() uses.
+# Actions are passed to (and returned from) the simulator as indexes into this tuple.
+ACTIONS = (
+    Directions.EAST,
+    Directions.NORTH,
+    Directions.SOUTH,
+    Directions.STOP,
+    Directions.WEST,
+)
+
+STOP_INDEX = ACTIONS.index(Directions.STOP)
+
+_numpy = None
+
+class VectorizedPacmanGames(object):
+    """
+    A batch of classic pacman games on the same layout that are all stepped together.
+
+    Positions are kept in integer half steps (see `pacai.core.agentstate.AgentState`),
+    and the food and capsules of each game are kept as boolean planes of shape (width, height).
+    Each game tracks whose turn it is, so games that end (and are reset) at different times
+    can still be stepped together.
+
+    Unless autoReset is false, games that end are immediately reset to the start of a new game.
+    Otherwise, finished games stay as they are and ignore any actions passed to them.
+    """
+
+    def __init__(self, layout, numGames, autoReset = True):
+        numpy = _getNumpy()
+
+        self._layout = layout
+        self._numGames = numGames
+        self._numAgents = len(layout.agentPositions)
+        self._autoReset = autoReset
+
+        if (self._numAgents == 0 or not layout.agentPositions[PACMAN_AGENT_INDEX][0]):
+            raise ValueError('The layout must have a pacman.')
+
+        width = layout.width
+        height = layout.height
+
+        # The legal actions (as a mask over ACTIONS) at each grid point.
+        moveTable = layout.getMoveTable()
+        self._gridMasks = numpy.zeros((width, height, len(ACTIONS)), dtype = bool)
+        for (x, y) in layout.walls.asList(False):
+            for action in moveTable.getPossibleActions((x, y), Directions.STOP):
+                self._gridMasks[x, y, ACTIONS.index(action)] = True
+
+        self._vectors = numpy.array([Actions.directionToVector(action) for action in ACTIONS],
+                dtype = numpy.int64)
+        self._reverse = numpy.array([ACTIONS.index(Actions.reverseDirection(action))
+                for action in ACTIONS])
+
+        # Moves in half steps, for full and half speed.
+        self._pacmanSteps = self._vectors * int(PacmanRules.PACMAN_SPEED * 2)
+        self._ghostSteps = self._vectors * int(GhostRules.GHOST_SPEED * 2)
+        self._scaredGhostSteps = self._vectors * int(GhostRules.GHOST_SPEED)
+
+        self._collisionDistance = 2 * COLLISION_TOLERANCE
+
+        # The starting state of a single game.
+        self._startPositions = numpy.array([(int(x * 2), int(y * 2))
+                for (isPacman, (x, y)) in layout.agentPositions], dtype = numpy.int64)
+
+        self._startFood = numpy.zeros((width, height), dtype = bool)
+        for (x, y) in layout.food.asList():
+            self._startFood[x, y] = True
+
+        self._startCapsules = numpy.zeros((width, height), dtype = bool)
+        for (x, y) in layout.capsules:
+            self._startCapsules[x, y] = True
+
+        # The state of all games.
+        self._positions = numpy.zeros((numGames, self._numAgents, 2), dtype = numpy.int64)
+        self._directions = numpy.zeros((numGames, self._numAgents), dtype = numpy.int64)
+        self._scaredTimers = numpy.zeros((numGames, self._numAgents), dtype = numpy.int64)
+        self._food = numpy.zeros((numGames, width, height), dtype = bool)
+        self._capsules = numpy.zeros((numGames, width, height), dtype = bool)
+        self._numFood = numpy.zeros(numGames, dtype = numpy.int64)
+        self._scores = numpy.zeros(numGames, dtype = numpy.int64)
+        self._over = numpy.zeros(numGames, dtype = bool)
+        self._win = numpy.zeros(numGames, dtype = bool)
+        self._turns = numpy.zeros(numGames, dtype = numpy.int64)
+
+        self.reset()
+
+    def getCapsules(self):
+        """
+        Get the capsules of all games as a boolean array of shape (games, width, height).
+        """
+
+        return self._capsules
+
+    def getDirections(self):
+        """
+        Get the direction (as an index into ACTIONS) of every agent,
+        as an array of shape (games, agents).
+        """
+
+        return self._directions
+
+    def getFood(self):
+        """
+        Get the food of all games as a boolean array of shape (games, width, height).
+        """
+
+        return self._food
+
+    def getHalfPositions(self):
+        """
+        Get the position of every agent in half steps, as an array of shape (games, agents, 2).
+        """
+
+        return self._positions
+
+    def getLegalActionMasks(self):
+        """
+        Get the legal actions for the agent whose turn it is in each game,
+        as a boolean array of shape (games, len(ACTIONS)).
+        Finished games have no legal actions.
+        """
+
+        numpy = _getNumpy()
+
+        games = numpy.arange(self._numGames)
+        positions = self._positions[games, self._turns]
+        directions = self._directions[games, self._turns]
+
+        onGrid = ((positions[:, 0] | positions[:, 1]) & 1) == 0
+        gridPositions = positions >> 1
+
+        # On grid points, use the layout's moves.
+        # In between grid points, agents must continue straight.
+        masks = numpy.where(onGrid[:, numpy.newaxis],
+                self._gridMasks[gridPositions[:, 0], gridPositions[:, 1]],
+                numpy.arange(len(ACTIONS)) == directions[:, numpy.newaxis])
+
+        # Ghosts can not stop, and can only turn around at dead ends.
+        ghosts = (self._turns != PACMAN_AGENT_INDEX)
+        masks[ghosts, STOP_INDEX] = False
+
+        reverse = self._reverse[directions]
+        turnAround = ghosts & (masks.sum(axis = 1) > 1) & masks[games, reverse]
+        masks[games[turnAround], reverse[turnAround]] = False
+
+        masks[self._over] = False
+
+        return masks
+
+    def getNumAgents(self):
+        return self._numAgents
+
+    def getNumFood(self):
+        return self._numFood
+
+    def getNumGames(self):
+        return self._numGames
+
+    def getScaredTimers(self):
+        return self._scaredTimers
+
+    def getScores(self):
+        return self._scores
+
+    def getTurns(self):
+        """
+        Get the index of the agent that moves next in each game.
+        """
+
+        return self._turns
+
+    def isOver(self):
+        return self._over
+
+    def isWin(self):
+        return self._over & self._win
+
+    def reset(self, games = None):
+        """
+        Reset the given games (a boolean mask or indexes) to the start of a new game.
+        By default, all games are reset.
+        """
+
+        if (games is None):
+            games = slice(None)
+
+        self._positions[games] = self._startPositions
+        self._directions[games] = STOP_INDEX
+        self._scaredTimers[games] = 0
+        self._food[games] = self._startFood
+        self._capsules[games] = self._startCapsules
+        self._numFood[games] = self._layout.food.count()
+        self._scores[games] = 0
+        self._over[games] = False
+        self._win[games] = False
+        self._turns[games] = PACMAN_AGENT_INDEX
+
+    def step(self, actions):
+        """
+        Move the agent whose turn it is in every game.
+        `actions` holds one index into ACTIONS per game (actions for finished games are ignored).
+
+        Returns three arrays: which games ended on this step,
+        and the score and whether pacman won for every game as of the end of this step.
+        When autoReset is on, the games that ended will already be reset.
+        """
+
+        numpy = _getNumpy()
+
+        actions = numpy.asarray(actions, dtype = numpy.int64)
+        if (actions.shape != (self._numGames, )):
+            raise ValueError('Expected one action per game, got shape %s.' % (actions.shape, ))
+
+        active = ~self._over
+        games = numpy.arange(self._numGames)
+
+        # Actions for finished games may be anything, so swap them out before indexing.
+        inRange = (actions >= 0) & (actions < len(ACTIONS))
+        requestedActions = actions
+        actions = numpy.where(active & inRange, actions, STOP_INDEX)
+
+        masks = self.getLegalActionMasks()
+        illegal = active & (~inRange | ~masks[games, actions])
+        if (illegal.any()):
+            game = int(numpy.flatnonzero(illegal)[0])
+            raise ValueError('Illegal action in game %d: %s.' % (game, requestedActions[game]))
+
+        pacmanGames = numpy.flatnonzero(active & (self._turns == PACMAN_AGENT_INDEX))
+        ghostGames = numpy.flatnonzero(active & (self._turns != PACMAN_AGENT_INDEX))
+
+        self._stepPacman(pacmanGames, actions[pacmanGames])
+        self._stepGhosts(ghostGames, actions[ghostGames])
+
+        self._turns[active] = (self._turns[active] + 1) % self._numAgents
+
+        done = active & self._over
+        scores = self._scores.copy()
+        wins = self._over & self._win
+
+        if (self._autoReset and done.any()):
+            self.reset(done)
+
+        return done, scores, wins
+
+    def _checkDeath(self, games, ghostIndex):
+        """
+        Resolve collisions between pacman and the given ghost in each of the given games.
+        See `pacai.bin.pacman.GhostRules.checkDeath`.
+        """
+
+        numpy = _getNumpy()
+
+        distances = numpy.abs(self._positions[games, ghostIndex]
+                - self._positions[games, PACMAN_AGENT_INDEX]).sum(axis = 1)
+        hit = (distances <= self._collisionDistance)
+
+        scared = hit & (self._scaredTimers[games, ghostIndex] > 0)
+        eaten = games[scared]
+        self._scores[eaten] += GHOST_POINTS
+        self._respawnGhosts(eaten, ghostIndex[scared])
+
+        lost = games[hit & ~scared & ~self._over[games]]
+        self._scores[lost] += LOSE_POINTS
+        self._over[lost] = True
+        self._win[lost] = False
+
+    def _respawnGhosts(self, games, ghostIndex):
+        self._positions[games, ghostIndex] = self._startPositions[ghostIndex]
+        self._directions[games, ghostIndex] = STOP_INDEX
+        self._scaredTimers[games, ghostIndex] = 0
+
+    def _stepGhosts(self, games, actions):
+        """
+        See `pacai.bin.pacman.GhostRules`.
+        """
+
+        numpy = _getNumpy()
+
+        if (len(games) == 0):
+            return
+
+        ghosts = self._turns[games]
+
+        # Scared ghosts move at half speed.
+        scared = (self._scaredTimers[games, ghosts] > 0)
+        steps = numpy.where(scared[:, numpy.newaxis],
+                self._scaredGhostSteps[actions], self._ghostSteps[actions])
+
+        self._positions[games, ghosts] += steps
+
+        moved = (actions != STOP_INDEX)
+        self._directions[games[moved], ghosts[moved]] = actions[moved]
+
+        # Time passes, and ghosts that are no longer scared snap to the closest grid point.
+        self._scaredTimers[games[scared], ghosts[scared]] -= 1
+
+        snap = scared & (self._scaredTimers[games, ghosts] == 0)
+        snapGames = games[snap]
+        snapGhosts = ghosts[snap]
+        self._positions[snapGames, snapGhosts] = (
+                (self._positions[snapGames, snapGhosts] + 1) >> 1) << 1
+
+        self._checkDeath(games, ghosts)
+
+    def _stepPacman(self, games, actions):
+        """
+        See `pacai.bin.pacman.PacmanRules`.
+        """
+
+        numpy = _getNumpy()
+
+        if (len(games) == 0):
+            return
+
+        self._positions[games, PACMAN_AGENT_INDEX] += self._pacmanSteps[actions]
+
+        moved = (actions != STOP_INDEX)
+        self._directions[games[moved], PACMAN_AGENT_INDEX] = actions[moved]
+
+        # Pacman only moves at full speed, so it is always on a grid point.
+        x = self._positions[games, PACMAN_AGENT_INDEX, 0] >> 1
+        y = self._positions[games, PACMAN_AGENT_INDEX, 1] >> 1
+
+        # Eat food.
+        ateFood = self._food[games, x, y]
+        foodGames = games[ateFood]
+
+        self._food[foodGames, x[ateFood], y[ateFood]] = False
+        self._numFood[foodGames] -= 1
+        self._scores[foodGames] += FOOD_POINTS
+
+        cleared = foodGames[self._numFood[foodGames] == 0]
+        self._scores[cleared] += BOARD_CLEAR_POINTS
+        self._over[cleared] = True
+        self._win[cleared] = True
+
+        # Eat a capsule (only if there was no food).
+        ateCapsule = ~ateFood & self._capsules[games, x, y]
+        capsuleGames = games[ateCapsule]
+
+        self._capsules[capsuleGames, x[ateCapsule], y[ateCapsule]] = False
+        self._scaredTimers[capsuleGames, PACMAN_AGENT_INDEX + 1:] = SCARED_TIME
+
+        # Penalty for waiting around.
+        self._scores[games] -= TIME_PENALTY
+
+        # See if any ghost can kill pacman (in index order, like the regular rules).
+        for ghostIndex in range(PACMAN_AGENT_INDEX + 1, self._numAgents):
+            self._checkDeath(games, numpy.full(len(games), ghostIndex))
+
+def _getNumpy():
+    global _numpy
+
+    if (_numpy is None):
+        try:
+            import numpy
+        except ImportError as ex:
+            raise ImportError('The vectorized pacman simulator requires NumPy.') from ex
+
+        _numpy = numpy
+
+    return _numpy
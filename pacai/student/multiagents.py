@@ -60,7 +60,7 @@ class ReflexAgent(BaseAgent):
 
         newGhostStates = successorGameState.getGhostStates()
         ghostPositions = [ghost.getPosition() for ghost in newGhostStates]
-        food = currentGameState.getFood().asList()
+        food = currentGameState.getFoodList()
         newPosition = successorGameState.getPacmanPosition()
 
         # Compute Manhattan distances
@@ -116,6 +116,7 @@ class MinimaxAgent(MultiAgentSearchAgent):
     def getAction(self, gamestate):
         num_agents = gamestate.getNumAgents()
 
+        # Walk a single state down and back up the tree instead of generating successors.
         def minimax(state, agent, depth):
             if state.isOver() or depth == self.getTreeDepth():
                 return self.getEvaluationFunction()(state), None
@@ -126,28 +127,25 @@ class MinimaxAgent(MultiAgentSearchAgent):
 
             maxim = (agent == 0)
 
+            results = []
+            for next in leg_action:
+                record = state.applyMove(agent, next)
+                try:
+                    value = minimax(
+                        state,
+                        (agent + 1) % num_agents,
+                        depth + (agent + 1 == num_agents)
+                    )[0]
+                finally:
+                    # This is the game's own state, so always put it back.
+                    state.undoMove(record)
+
+                results.append((value, next))
+
             if maxim:  # Maximize
-                return max(
-                    (
-                        minimax(
-                            state.generateSuccessor(agent, next),
-                            (agent + 1) % num_agents,
-                            depth + (agent + 1 == num_agents)
-                        )[0], next
-                    )
-                    for next in leg_action
-                )
+                return max(results)
             else:  # Minimize
-                return min(
-                    (
-                        minimax(
-                            state.generateSuccessor(agent, next),
-                            (agent + 1) % num_agents,
-                            depth + (agent + 1 == num_agents)
-                        )[0], next
-                    )
-                    for next in leg_action
-                )
+                return min(results)
 
         _, next = minimax(gamestate, 0, 0)
         return next
@@ -174,31 +172,31 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
             if state.isOver() or depth == self.getTreeDepth():
                 return self.getEvaluationFunction()(state), None
 
-            leg_action = state.getLegalActions(agent)
-            if agent == 0 and 'Stop' in leg_action:  # Make sure it doesn't stop
-                leg_action.remove('Stop')
+            # Expand all children at once, so move ordering and the search share them.
+            successors = state.generateSuccessors(agent)
+            if agent == 0:  # Make sure it doesn't stop
+                successors = [pair for pair in successors if pair[0] != 'Stop']
 
-            if not leg_action:
+            if not successors:
                 return self.getEvaluationFunction()(state), None
 
             # Move ordering
-            leg_action.sort(
-                key=lambda action: self.getEvaluationFunction()(
-                    state.generateSuccessor(agent, action)
-                ),
+            successors = sorted(
+                successors,
+                key=lambda pair: self.getEvaluationFunction()(pair[1]),
                 reverse=(agent == 0)  # Sort descending
             )
 
             if agent == 0:  # Maximizing
                 value, bestAction = float('-inf'), None
-                for action in leg_action:
-                    successor = state.generateSuccessor(agent, action)
+                for action, successor in successors:
                     newValue, _ = alphabeta(
                         successor,
                         (agent + 1) % num_agent,
                         depth + (agent + 1 == num_agent),
                         alpha, beta
                     )
+
                     if newValue > value:
                         value, bestAction = newValue, action
                     alpha = max(alpha, value)
@@ -208,14 +206,14 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
 
             else:  # Ghosts (Minimizing)
                 value = float('inf')
-                for next in leg_action:
-                    successor = state.generateSuccessor(agent, next)
+                for _, successor in successors:
                     newValue, _ = alphabeta(
                         successor,
                         (agent + 1) % num_agent,
                         depth + (agent + 1 == num_agent),
                         alpha, beta
                     )
+
                     value = min(value, newValue)
                     beta = min(beta, value)
                     if alpha >= beta:
@@ -253,27 +251,22 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
             if not leg_action:  # No moves
                 return self.getEvaluationFunction()(state), None
 
-            if agent == 0:
-                return max(
-                    (
-                        expectimax(
-                            state.generateSuccessor(agent, next),
-                            (agent + 1) % num_agents,
-                            depth + (agent + 1 == num_agents)
-                        )[0], next
-                    )
-                    for next in leg_action
-                )
-              
-            else:
-                values = [
-                    expectimax(
-                        state.generateSuccessor(agent, next),
+            values = []
+            for next in leg_action:
+                record = state.applyMove(agent, next)
+                try:
+                    values.append(expectimax(
+                        state,
                         (agent + 1) % num_agents,
                         depth + (agent + 1 == num_agents)
-                    )[0]
-                    for next in leg_action
-                ]
+                    )[0])
+                finally:
+                    # This is the game's own state, so always put it back.
+                    state.undoMove(record)
+
+            if agent == 0:
+                return max(zip(values, leg_action))
+            else:
                 return sum(values) / len(values), random.choice(leg_action)
 
         _, next = expectimax(gamestate, 0, 0)
@@ -287,7 +280,7 @@ def betterEvaluationFunction(currentGameState):
     """
 
     pacmanPosition = currentGameState.getPacmanPosition()
-    foodPositions = currentGameState.getFood().asList()
+    foodPositions = currentGameState.getFoodList()
     ghostStates = currentGameState.getGhostStates()
 
     ghostPositions = [ghost.getPosition() for ghost in ghostStates]
@@ -104,6 +104,13 @@ class OffensiveAgent(CaptureAgent):
 
     def getActionToTarget(self, gameState, actions, myPos, targetPos):
         """Get best action to reach a target position."""
+        # The first moves of the shortest paths come straight from the distancer.
+        next_actions = self.getMazeActions(myPos, targetPos)
+        if next_actions:
+            for action in actions:
+                if action in next_actions:
+                    return action
+
         best_dist = float('inf')
         best_action = random.choice(actions)
         
@@ -385,6 +392,13 @@ class DefensiveAgent(CaptureAgent):
 
     def getActionToTarget(self, gameState, actions, myPos, targetPos):
         """Get best action to reach a target position."""
+        # The first moves of the shortest paths come straight from the distancer.
+        next_actions = self.getMazeActions(myPos, targetPos)
+        if next_actions:
+            for action in actions:
+                if action in next_actions:
+                    return action
+
         best_dist = float('inf')
         best_action = random.choice(actions)
         
@@ -68,16 +68,16 @@ def breadthFirstSearch(problem):
 
     # *** Your Code Here ***
     # initialize structures
-    queue = []  
-    visited = [] 
+    queue = Queue()
+    visited = set()
     path = []
 
     # Enqueue the start state
-    queue.append((problem.startingState(), None, None))  
-    visited.append(problem.startingState())  
+    queue.push((problem.startingState(), None, None))
+    visited.add(problem.startingState())
 
-    while queue:
-        curr, parent_comp, prev = queue.pop(0)  
+    while not queue.isEmpty():
+        curr, parent_comp, prev = queue.pop()
 
         # If the goal is reached, reconstruct the path
         if problem.isGoal(curr):
@@ -90,9 +90,9 @@ def breadthFirstSearch(problem):
 
         # Process successor states
         for successor, next, cost in problem.successorStates(curr):
-            if successor not in visited:  
-                queue.append((successor, (curr, parent_comp, prev), next)) 
-                visited.append(successor)  
+            if successor not in visited:
+                queue.push((successor, (curr, parent_comp, prev), next))
+                visited.add(successor)
 
     # Reverse the path
     path.reverse()
@@ -231,7 +231,7 @@ class ClosestDotSearchAgent(SearchAgent):
 
         currentState = state
 
-        while (currentState.getFood().count() > 0):
+        while (currentState.getNumFood() > 0):
             nextPathSegment = self.findPathToClosestDot(currentState)  # The missing piece
             self._actions += nextPathSegment
 
@@ -290,7 +290,8 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         self.food = gameState.getFood()
 
     def isGoal(self, state):
-        return state in self.food.asList()
+        x, y = state
+        return self.food[x][y]
 
 
 class ApproximateSearchAgent(BaseAgent):
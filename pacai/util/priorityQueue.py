@@ -4,6 +4,9 @@ Priority queue containers.
 
 import heapq
 
+# Marks heap entries that have been replaced by IndexedPriorityQueue.
+_REMOVED = object()
+
 class PriorityQueue(object):
     """
     Implements a priority queue data structure.
@@ -13,6 +16,7 @@ class PriorityQueue(object):
 
     Note that this PriorityQueue does not allow you to change the priority of an item.
     However, you may insert the same item multiple times with different priorities.
+    See `IndexedPriorityQueue` for a queue that can.
     """
 
     def __init__(self):
@@ -22,6 +26,15 @@ class PriorityQueue(object):
         pair = (priority, item)
         heapq.heappush(self.heap, pair)
 
+    def pushAll(self, pairs):
+        """
+        Push every (item, priority) pair from an iterable.
+        """
+
+        heap = self.heap
+        for (item, priority) in pairs:
+            heapq.heappush(heap, (priority, item))
+
     def pop(self):
         (priority, item) = heapq.heappop(self.heap)
         return item
@@ -54,5 +67,156 @@ class PriorityQueueWithFunction(PriorityQueue):
 
         super().push(item, self.priorityFunction(item))
 
+    def pushAll(self, items):
+        """
+        Adds every item from an iterable, with priorities from the priority function.
+        """
+
+        super().pushAll((item, self.priorityFunction(item)) for item in items)
+
     def __len__(self):
         return len(self.heap)
+
+class IndexedPriorityQueue(object):
+    """
+    A priority queue that knows which items it holds,
+    so the priority of a queued item can be lowered instead of pushing the item again.
+    `IndexedPriorityQueue.push`, `IndexedPriorityQueue.decreaseKey`,
+    `IndexedPriorityQueue.pop`, and `IndexedPriorityQueue.peek` take O(log n) (amortized),
+    and `IndexedPriorityQueue.contains` takes O(1).
+
+    Each item can only be in the queue once, so items must be hashable.
+    Items with the same priority come out in the order they were first pushed,
+    and the items themselves are never compared.
+
+    Lowering a priority pushes a new heap entry and marks the old one as removed
+    (a heap of C-level heapq calls is much faster than moving entries in Python).
+    Removed entries are skipped when they reach the top,
+    and the heap is rebuilt whenever they outnumber the queued items.
+    """
+
+    def __init__(self):
+        # Entries are [priority, insertion count, item].
+        # The counts are unique, so comparing entries never gets to the items.
+        self._heap = []
+        self._entries = {}
+        self._count = 0
+        self._numRemoved = 0
+
+    def contains(self, item):
+        return (item in self._entries)
+
+    def decreaseKey(self, item, priority):
+        """
+        Lower the priority of a queued item.
+        Raises a ValueError if the item is not queued or the new priority is higher.
+        """
+
+        entry = self._entries.get(item)
+        if (entry is None):
+            raise ValueError('Item is not in the queue: ' + str(item))
+
+        if (priority > entry[0]):
+            raise ValueError('Cannot raise the priority of an item (from %s to %s).'
+                    % (str(entry[0]), str(priority)))
+
+        self._replace(entry, priority)
+
+    def getPriority(self, item):
+        """
+        Get the priority of a queued item.
+        Raises a KeyError if the item is not queued.
+        """
+
+        return self._entries[item][0]
+
+    def isEmpty(self):
+        return len(self._entries) == 0
+
+    def peek(self):
+        """
+        Get the item with the lowest priority without removing it.
+        """
+
+        heap = self._heap
+        while (len(heap) > 0 and heap[0][2] is _REMOVED):
+            heapq.heappop(heap)
+            self._numRemoved -= 1
+
+        if (len(heap) == 0):
+            raise IndexError('Peek from an empty priority queue.')
+
+        return heap[0][2]
+
+    def pop(self):
+        """
+        Remove and return the item with the lowest priority.
+        """
+
+        heap = self._heap
+
+        while (len(heap) > 0):
+            item = heapq.heappop(heap)[2]
+            if (item is not _REMOVED):
+                del self._entries[item]
+                return item
+
+            self._numRemoved -= 1
+
+        raise IndexError('Pop from an empty priority queue.')
+
+    def push(self, item, priority):
+        """
+        Add an item that is not already in the queue.
+        Raises a ValueError if it is (see `IndexedPriorityQueue.update`).
+        """
+
+        if (item in self._entries):
+            raise ValueError('Item is already in the queue: ' + str(item))
+
+        entry = [priority, self._count, item]
+        self._count += 1
+
+        self._entries[item] = entry
+        heapq.heappush(self._heap, entry)
+
+    def update(self, item, priority):
+        """
+        Push an item, or lower its priority if it is already queued with a higher one.
+        Returns True if the item was pushed or its priority changed.
+        """
+
+        entry = self._entries.get(item)
+        if (entry is None):
+            self.push(item, priority)
+            return True
+
+        if (priority >= entry[0]):
+            return False
+
+        self._replace(entry, priority)
+        return True
+
+    def __contains__(self, item):
+        return (item in self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _replace(self, entry, priority):
+        """
+        Swap an entry for one with a new priority (but the same insertion count).
+        """
+
+        item = entry[2]
+        entry[2] = _REMOVED
+
+        newEntry = [priority, entry[1], item]
+        self._entries[item] = newEntry
+        heapq.heappush(self._heap, newEntry)
+
+        self._numRemoved += 1
+        if (self._numRemoved > len(self._entries)):
+            self._heap = [entry for entry in self._heap if (entry[2] is not _REMOVED)]
+            heapq.heapify(self._heap)
+            self._numRemoved = 0
@@ -2,20 +2,31 @@
 A queue container data structure.
 """
 
+import array
+import collections
+
 class Queue(object):
     """
     A container with a first-in-first-out (FIFO) queuing policy.
+    Pushing and popping both take O(1).
     """
 
     def __init__(self):
-        self.list = []
+        self.list = collections.deque()
 
     def push(self, item):
         """
         Enqueue the item into the queue.
         """
 
-        self.list.insert(0, item)
+        self.list.append(item)
+
+    def pushAll(self, items):
+        """
+        Enqueue every item (in order) from an iterable.
+        """
+
+        self.list.extend(items)
 
     def pop(self):
         """
@@ -23,7 +34,7 @@ class Queue(object):
         This operation removes the item from the queue.
         """
 
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         """
@@ -34,3 +45,43 @@ class Queue(object):
 
     def __len__(self):
         return len(self.list)
+
+class CompactQueue(Queue):
+    """
+    A `Queue` that can only hold integers (that fit in a C int),
+    like states that have been encoded as numbers (e.g. the index of a cell).
+    The integers are kept in an `array.array`, which takes a fraction of the memory
+    of a container of Python objects.
+    """
+
+    def __init__(self):
+        self.list = array.array('i')
+
+        # The position of the earliest item still in the queue.
+        # Popped items are only dropped from the array once they make up half of it.
+        self._head = 0
+
+    def push(self, item):
+        self.list.append(item)
+
+    def pushAll(self, items):
+        self.list.extend(items)
+
+    def pop(self):
+        if (self._head >= len(self.list)):
+            raise IndexError('Pop from an empty queue.')
+
+        item = self.list[self._head]
+        self._head += 1
+
+        if (self._head * 2 >= len(self.list)):
+            del self.list[:self._head]
+            self._head = 0
+
+        return item
+
+    def isEmpty(self):
+        return self._head >= len(self.list)
+
+    def __len__(self):
+        return len(self.list) - self._head
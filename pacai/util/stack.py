@@ -2,6 +2,8 @@
 A stack data structure.
 """
 
+import array
+
 class Stack(object):
     """
     A container with a last-in-first-out (LIFO) queuing policy.
@@ -17,6 +19,13 @@ class Stack(object):
 
         self.list.append(item)
 
+    def pushAll(self, items):
+        """
+        Push every item (in order) from an iterable, so the last one ends up on top.
+        """
+
+        self.list.extend(items)
+
     def pop(self):
         """
         Pop the most recently pushed item from the stack.
@@ -33,3 +42,14 @@ class Stack(object):
 
     def __len__(self):
         return len(self.list)
+
+class CompactStack(Stack):
+    """
+    A `Stack` that can only hold integers (that fit in a C int),
+    like states that have been encoded as numbers (e.g. the index of a cell).
+    The integers are kept in an `array.array`, which takes a fraction of the memory
+    of a list of Python objects.
+    """
+
+    def __init__(self):
+        self.list = array.array('i')
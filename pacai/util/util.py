@@ -2,9 +2,22 @@
 Various utility functions.
 """
 
+import random
+
 INITIAL_HASH_VALUE = 17
 HASH_MULTIPLIER = 37
 
+ZOBRIST_BITS = 64
+ZOBRIST_MASK = (1 << ZOBRIST_BITS) - 1
+ZOBRIST_SEED = 4
+
+# An odd constant (the 64-bit golden ratio) to spread out the keys for numbers.
+ZOBRIST_NUMBER_MULTIPLIER = 0x9E3779B97F4A7C15
+
+# Keys are handed out lazily from a private RNG so that the global random state is not disturbed.
+_zobristRNG = random.Random(ZOBRIST_SEED)
+_zobristKeys = {}
+
 def arrayInvert(array):
     """
     Inverts a matrix stored as a list of lists.
@@ -64,3 +77,26 @@ def sign(x):
         return 1
     else:
         return -1
+
+def zobristKey(*components):
+    """
+    Get the random key associated with the given (hashable) components.
+    The same components will always get the same key within a process,
+    so these keys can be XORed in and out of a running hash (Zobrist hashing).
+    """
+
+    key = _zobristKeys.get(components)
+    if (key is None):
+        key = _zobristRNG.getrandbits(ZOBRIST_BITS)
+        _zobristKeys[components] = key
+
+    return key
+
+def zobristNumberKey(number):
+    """
+    Get the Zobrist key for a number (like a score).
+    Unlike `zobristKey`, the key is computed instead of stored,
+    since there is no bound on how many different numbers a process will see.
+    """
+
+    return (hash(number) * ZOBRIST_NUMBER_MULTIPLIER) & ZOBRIST_MASK
@@ -0,0 +1,155 @@
+import glob
+import heapq
+import os
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.actions import Actions
+from pacai.core.distanceCalculator import DistanceTable
+from pacai.core.distanceCalculator import Distancer
+from pacai.core.layout import DEFAULT_LAYOUT_DIR
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+from pacai.core.search.corridor import CorridorSearchProblem
+
+# A loop with no junctions or dead ends, next to a room.
+LOOP_LAYOUT = [
+    '%%%%%%%%',
+    '%P  %  %',
+    '% % %  %',
+    '%   %  %',
+    '%%%%%%%%',
+]
+
+"""
+Test the corridor graphs of layouts and the distances and searches built on them.
+"""
+class CorridorsTest(unittest.TestCase):
+    def test_graph(self):
+        paths = glob.glob(os.path.join(DEFAULT_LAYOUT_DIR, '*.lay'))
+        layouts = [getLayout(os.path.basename(path)) for path in paths]
+        layouts.append(Layout(LOOP_LAYOUT))
+
+        for layout in layouts:
+            graph = layout.getCorridorGraph()
+            self.assertIs(graph, layout.getCorridorGraph())
+
+            # Every open cell is either a node or on exactly one edge.
+            for cell in layout.walls.asList(False):
+                self.assertNotEqual(graph.isNode(cell), graph.getEdgeLocation(cell) is not None)
+
+            for edge in range(graph.getNumEdges()):
+                (first, last, cells, actions) = graph.getEdge(edge)
+
+                self.assertEqual((first, last), (cells[0], cells[-1]))
+                self.assertTrue(graph.isNode(first) and graph.isNode(last))
+                self.assertEqual(len(cells), len(actions) + 1)
+
+                for i in range(len(actions)):
+                    self.assertEqual(cells[i + 1], Actions.getSuccessor(cells[i], actions[i]))
+
+                for offset in range(1, len(cells) - 1):
+                    self.assertEqual((edge, offset), graph.getEdgeLocation(cells[offset]))
+
+            for position in layout.walls.asList(False):
+                for (nextPosition, actions, cost) in graph.getNeighbors(position):
+                    self.assertEqual(len(actions), cost)
+                    self.assertEqual(nextPosition, self._follow(position, actions))
+
+    def test_loop(self):
+        graph = Layout(LOOP_LAYOUT).getCorridorGraph()
+
+        # One node for the loop, and the two middle cells of the room (the corners only have two
+        # neighbors).
+        self.assertEqual(1 + 2, graph.getNumNodes())
+
+        loopNode = [node for node in graph.getNodes() if (node[0] < 4)][0]
+        neighbors = graph.getNeighbors(loopNode)
+
+        self.assertEqual(2, len(neighbors))
+        for (nextPosition, actions, cost) in neighbors:
+            self.assertEqual(loopNode, nextPosition)
+            self.assertEqual(8, cost)
+
+    def test_stops(self):
+        graph = getLayout('mediumMaze').getCorridorGraph()
+
+        (first, last, cells, actions) = max(
+                [graph.getEdge(edge) for edge in range(graph.getNumEdges())],
+                key = lambda edge: len(edge[3]))
+        self.assertGreater(len(actions), 3)
+
+        stop = cells[3]
+        neighbors = graph.getNeighbors(first, stops = (stop, ))
+        self.assertIn((stop, actions[:3], 3), neighbors)
+
+        # From a corridor cell, a stop behind it does not matter.
+        neighbors = graph.getNeighbors(cells[2], stops = (cells[1], cells[3]))
+        self.assertEqual({cells[1], cells[3]}, {position for (position, _, _) in neighbors})
+
+    def test_compressed_distances(self):
+        for name in ['mediumMaze', 'mediumClassic', 'mediumCapture', 'openSearch']:
+            layout = getLayout(name)
+            expected = DistanceTable(layout.walls)
+
+            distancer = Distancer(layout, compressed = True)
+            self.assertTrue(distancer.isReadyForMazeDistance())
+
+            cells = layout.walls.asList(False)
+            for source in cells[::3]:
+                for target in cells[::5]:
+                    self.assertEqual(expected.getDistance(source, target),
+                            distancer.getDistance(source, target))
+
+                targets = cells[::5]
+                self.assertEqual([distancer.getDistance(source, target) for target in targets],
+                        distancer.getDistances(source, targets))
+
+        with self.assertRaises(ValueError):
+            Distancer(getLayout('mediumMaze'), lazy = True, compressed = True)
+
+    def test_search(self):
+        for name in ['mediumMaze', 'bigMaze', 'mediumClassic']:
+            layout = getLayout(name)
+            table = DistanceTable(layout.walls)
+            cells = layout.walls.asList(False)
+
+            for goal in cells[::37]:
+                problem = CorridorSearchProblem(PacmanGameState(layout), goal = goal)
+                actions = self._uniformCost(problem)
+                moves = problem.expandActions(actions)
+
+                start = problem.startingState()
+                self.assertEqual(goal, self._follow(start, moves))
+                self.assertEqual(table.getDistance(start, goal), len(moves))
+                self.assertEqual(len(moves), problem.actionsCost(actions))
+
+    def _follow(self, position, actions):
+        for action in actions:
+            position = Actions.getSuccessor(position, action)
+
+        return (int(position[0]), int(position[1]))
+
+    def _uniformCost(self, problem):
+        start = problem.startingState()
+        queue = [(0, 0, start, [])]
+        done = set()
+        count = 1
+
+        while (queue):
+            (cost, _, state, actions) = heapq.heappop(queue)
+            if (state in done):
+                continue
+
+            if (problem.isGoal(state)):
+                return actions
+
+            done.add(state)
+            for (nextState, action, stepCost) in problem.successorStates(state):
+                heapq.heappush(queue, (cost + stepCost, count, nextState, actions + [action]))
+                count += 1
+
+        return None
+
+if __name__ == '__main__':
+    unittest.main()
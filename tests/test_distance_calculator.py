@@ -0,0 +1,539 @@
+import array
+import collections
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+from pacai.core import distance
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.distanceCalculator import CACHE_DIR_ENV
+from pacai.core.distanceCalculator import DEFAULT_DISTANCE
+from pacai.core.distanceCalculator import DistanceCache
+from pacai.core.distanceCalculator import DistanceField
+from pacai.core.distanceCalculator import DistanceRegistry
+from pacai.core.distanceCalculator import DistanceTable
+from pacai.core.distanceCalculator import Distancer
+from pacai.core.distanceCalculator import LandmarkDistanceOracle
+from pacai.core.distanceCalculator import LazyDistanceTable
+from pacai.core.distanceCalculator import NextHopTable
+from pacai.core.distanceCalculator import computeDistances
+from pacai.core.distanceCalculator import getDistanceOnGrid
+from pacai.core.distanceCalculator import getGrids2D
+from pacai.core.distanceCalculator import getLazyTable
+from pacai.core.distanceCalculator import getRegistry
+from pacai.core.distanceCalculator import wallsDigest
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+# The right room can not be reached from the left one.
+SPLIT_LAYOUT = [
+    '%%%%%%%',
+    '%P.%..%',
+    '%..%..%',
+    '%%%%%%%',
+]
+
+"""
+Test the maze distances computed by the distancer.
+"""
+class DistanceCalculatorTest(unittest.TestCase):
+    def setUp(self):
+        self._cacheDir = tempfile.TemporaryDirectory()
+
+        # Keep the default disk cache out of the user's home.
+        environ = unittest.mock.patch.dict(os.environ, {CACHE_DIR_ENV: self._cacheDir.name})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def tearDown(self):
+        self._cacheDir.cleanup()
+
+    def test_matches_bfs(self):
+        layout = getLayout('mediumCapture')
+        distancer = Distancer(layout)
+        distancer.getMazeDistances()
+
+        walls = layout.walls
+        cells = walls.asList(False)
+
+        for source in cells[::7]:
+            expected = self._bfs(walls, source)
+
+            for target in cells:
+                self.assertEqual(expected[target], distancer.getDistance(source, target))
+                self.assertEqual(expected[target], distancer.getDistance(target, source))
+
+    def test_off_grid(self):
+        layout = Layout(SPLIT_LAYOUT)
+        distancer = Distancer(layout)
+
+        # Before the distances are computed, manhattan distance is used.
+        self.assertEqual(5, distancer.getDistance((1, 1), (5, 2)))
+
+        distancer.getMazeDistances()
+
+        self.assertEqual(0, distancer.getDistance((1, 1), (1, 1)))
+        self.assertEqual(2, distancer.getDistance((1, 1), (2, 2)))
+        self.assertEqual(1.5, distancer.getDistance((1.5, 1), (2, 2)))
+        self.assertEqual(sys.maxsize, distancer.getDistance((1, 1), (5, 2)))
+        self.assertEqual([sys.maxsize, 1.5, 0], distancer.getDistances((2, 2),
+                [(5, 2), (1.5, 1), (2, 2)]))
+
+        with self.assertRaises(Exception):
+            distancer.getDistance((0, 0), (1, 1))
+
+    def test_half_steps(self):
+        layout = getLayout('mediumCapture')
+        distancer = Distancer(layout)
+        distancer.getMazeDistances()
+
+        cells = layout.walls.asList(False)
+        positions = list(cells)
+        for (x, y) in cells:
+            if ((x + 1, y) in cells):
+                positions.append((x + 0.5, y))
+
+            if ((x, y + 1) in cells):
+                positions.append((x, y + 0.5))
+
+        targets = positions[::11]
+
+        for source in positions[::13]:
+            expected = [self._snappedDistance(distancer, source, target) for target in targets]
+            self.assertEqual(expected, [distancer.getDistance(source, target)
+                    for target in targets])
+            self.assertEqual(expected, distancer.getDistances(source, targets))
+
+        # Before the distances are computed, manhattan distance is used.
+        distancer = Distancer(layout)
+        self.assertEqual([0, 1.5], distancer.getDistances((1, 1), [(1, 1), (2.5, 1)]))
+
+    def test_compute_distances(self):
+        layout = Layout(SPLIT_LAYOUT)
+        distances = computeDistances(layout)
+
+        # The dict is keyed by (target, source).
+        self.assertEqual(len(layout.walls.asList(False)) ** 2, len(distances))
+        self.assertEqual(2, distances[((2, 1), (1, 2))])
+        self.assertEqual(sys.maxsize, distances[((4, 1), (1, 1))])
+
+        self.assertEqual(2, getDistanceOnGrid(distances, (2, 1), (1, 2)))
+        self.assertEqual(DEFAULT_DISTANCE, getDistanceOnGrid(distances, (0, 0), (1, 1)))
+
+    def test_disk_cache(self):
+        walls = getLayout('mediumCapture').walls
+        expected = DistanceTable(walls)
+
+        cache = DistanceCache(self._cacheDir.name)
+        self.assertEqual(0, cache.getSize())
+
+        table = cache.getTable(walls)
+        self.assertEqual(list(expected.getDistances()), list(table.getDistances()))
+
+        path = os.path.join(self._cacheDir.name, wallsDigest(walls) + '.dist')
+        self.assertTrue(os.path.isfile(path))
+
+        # Another cache (like one in a different process) maps the stored table.
+        loaded = DistanceCache(self._cacheDir.name).getTable(walls)
+        self.assertIsInstance(loaded.getDistances(), memoryview)
+        self.assertEqual(list(expected.getDistances()), list(loaded.getDistances()))
+
+        # Damaged files are ignored and replaced.
+        with open(path, 'r+b') as file:
+            file.truncate(10)
+
+        table = DistanceCache(self._cacheDir.name).getTable(walls)
+        self.assertEqual(list(expected.getDistances()), list(table.getDistances()))
+        self.assertEqual(os.path.getsize(path), cache.getSize())
+
+    def test_disk_cache_off(self):
+        walls = getLayout('tinyCapture').walls
+        registry = DistanceRegistry()
+
+        # Without the environment variable, nothing is written to disk.
+        with unittest.mock.patch.dict(os.environ):
+            del os.environ[CACHE_DIR_ENV]
+            table = registry.acquire(walls)
+
+        self.assertIsInstance(table.getDistances(), array.array)
+        self.assertEqual([], os.listdir(self._cacheDir.name))
+        registry.release(walls)
+
+    def test_disk_cache_close(self):
+        walls = getLayout('tinyCapture').walls
+        DistanceCache(self._cacheDir.name).getTable(walls)
+
+        # The last release closes the mapped file.
+        registry = DistanceRegistry()
+        table = registry.acquire(walls)
+        distances = table.getDistances()
+        self.assertIsInstance(distances, memoryview)
+
+        registry.release(walls)
+        with self.assertRaises(ValueError):
+            distances[0]
+
+    def test_disk_cache_eviction(self):
+        layouts = [getLayout(name) for name in ['tinyCapture', 'mediumCapture', 'fastCapture']]
+
+        # Only room for the last table.
+        cache = DistanceCache(self._cacheDir.name, maxBytes = 1)
+        for layout in layouts:
+            cache.getTable(layout.walls)
+
+        names = os.listdir(self._cacheDir.name)
+        self.assertEqual([wallsDigest(layouts[-1].walls) + '.dist'], names)
+
+        cache.clear()
+        self.assertEqual([], os.listdir(self._cacheDir.name))
+
+    def test_lazy(self):
+        layout = getLayout('mediumCapture')
+        expected = DistanceTable(layout.walls)
+
+        distancer = Distancer(layout, lazy = True)
+        self.assertTrue(distancer.isReadyForMazeDistance())
+
+        cells = layout.walls.asList(False)
+        for source in cells[::5]:
+            for target in cells[::3]:
+                self.assertEqual(expected.getDistance(source, target),
+                        distancer.getDistance(source, target))
+
+        self.assertEqual(1.5, Distancer(Layout(SPLIT_LAYOUT), lazy = True).getDistance(
+                (1.5, 1), (2, 2)))
+
+    def test_lazy_eviction(self):
+        layout = Layout(SPLIT_LAYOUT)
+        cells = layout.walls.asList(False)
+
+        # Room for two rows.
+        table = LazyDistanceTable(layout.walls, maxBytes = 2 * 2 * len(cells))
+        self.assertEqual(2, table.getMaxRows())
+        self.assertEqual(0, table.getNumCachedRows())
+
+        self.assertEqual(2, table.getDistance((1, 1), (2, 2)))
+        self.assertEqual(sys.maxsize, table.getDistance((1, 1), (5, 2)))
+        self.assertEqual(1, table.getNumCachedRows())
+
+        # The reverse query reuses the row from (1, 1).
+        self.assertEqual(2, table.getDistance((2, 2), (1, 1)))
+        self.assertEqual(1, table.getNumCachedRows())
+
+        for cell in cells:
+            self.assertEqual(0, table.getDistance(cell, cell))
+            self.assertLessEqual(table.getNumCachedRows(), 2)
+
+        self.assertIsNone(table.getDistance((0, 0), (1, 1)))
+
+    def test_landmarks(self):
+        walls = getLayout('mediumCapture').walls
+        expected = DistanceTable(walls)
+
+        oracle = LandmarkDistanceOracle(walls, numLandmarks = 4)
+        self.assertEqual(4, len(oracle.getLandmarks()))
+
+        cells = walls.asList(False)
+        for source in cells[::5]:
+            for target in cells[::3]:
+                distance = expected.getDistance(source, target)
+                self.assertEqual(distance, oracle.getDistance(source, target))
+                self.assertLessEqual(oracle.getLowerBound(source, target), distance)
+
+        # The bound from a landmark is exact.
+        landmark = oracle.getLandmarks()[0]
+        for target in cells:
+            self.assertEqual(expected.getDistance(landmark, target),
+                    oracle.getLowerBound(landmark, target))
+
+    def test_landmarks_components(self):
+        oracle = LandmarkDistanceOracle(Layout(SPLIT_LAYOUT).walls, numLandmarks = 2)
+
+        # Each room gets a landmark before either gets a second one.
+        landmarks = oracle.getLandmarks()
+        self.assertEqual(2, len(landmarks))
+        self.assertEqual([True, False], sorted([x < 3 for (x, y) in landmarks], reverse = True))
+
+        self.assertEqual(0, oracle.getDistance((1, 1), (1, 1)))
+        self.assertEqual(2, oracle.getDistance((1, 1), (2, 2)))
+        self.assertEqual(2, oracle.getDistance((4, 1), (5, 2)))
+        self.assertEqual(sys.maxsize, oracle.getDistance((1, 1), (5, 2)))
+        self.assertEqual(sys.maxsize, oracle.getLowerBound((5, 2), (1, 1)))
+        self.assertIsNone(oracle.getDistance((0, 0), (1, 1)))
+
+    def test_next_hops(self):
+        walls = getLayout('mediumCapture').walls
+        distances = DistanceTable(walls)
+        cells = walls.asList(False)
+
+        for table in [NextHopTable(distances), NextHopTable(LazyDistanceTable(walls))]:
+            for source in cells[::7]:
+                for target in cells[::5]:
+                    actions = table.getActions(source, target)
+                    expected = distances.getDistance(source, target)
+
+                    # Exactly the moves that get one step closer.
+                    closer = []
+                    for action in Directions.CARDINAL:
+                        dx, dy = Actions.directionToVector(action)
+                        neighbor = (source[0] + int(dx), source[1] + int(dy))
+                        if (distances.getDistance(neighbor, target) == expected - 1):
+                            closer.append(action)
+
+                    self.assertEqual(tuple(closer), actions)
+
+                    path = table.getPath(source, target)
+                    self.assertEqual(expected, len(path))
+                    self.assertEqual(target, self._follow(source, path))
+
+    def test_next_hops_unreachable(self):
+        layout = Layout(SPLIT_LAYOUT)
+        table = NextHopTable(DistanceTable(layout.walls))
+
+        self.assertEqual((), table.getActions((1, 1), (1, 1)))
+        self.assertEqual([], table.getPath((1, 1), (1, 1)))
+        self.assertEqual((Directions.NORTH, Directions.EAST), table.getActions((1, 1), (2, 2)))
+        self.assertEqual(Directions.NORTH, table.getAction((1, 1), (2, 2)))
+
+        self.assertEqual((), table.getActions((1, 1), (5, 2)))
+        self.assertIsNone(table.getAction((1, 1), (5, 2)))
+        self.assertIsNone(table.getPath((1, 1), (5, 2)))
+        self.assertIsNone(table.getActions((0, 0), (1, 1)))
+
+        distancer = Distancer(layout)
+        self.assertIsNone(distancer.getNextActions((1, 1), (2, 2)))
+
+        distancer.getMazeDistances()
+        self.assertEqual(Directions.SOUTH, distancer.getNextActions((2, 2), (2, 1))[0])
+        self.assertEqual(2, len(distancer.getPath((2, 2), (1, 1))))
+
+        distancer.release()
+
+    def test_distance_field(self):
+        walls = getLayout('mediumCapture').walls
+        table = DistanceTable(walls)
+        cells = walls.asList(False)
+
+        rng = random.Random(4)
+        sources = set(rng.sample(cells, 10))
+        field = DistanceField(walls, sources)
+        self._checkField(table, field, sources)
+
+        # Add and remove sources one at a time.
+        for _ in range(30):
+            if (sources and rng.random() < 0.6):
+                source = rng.choice(sorted(sources))
+                sources.remove(source)
+                field.removeSource(source)
+            else:
+                source = rng.choice(cells)
+                if (source not in sources):
+                    sources.add(source)
+                    field.addSource(source)
+
+            self._checkField(table, field, sources)
+
+        copy = field.copy()
+
+        for count in [0, 3, 25, 2]:
+            sources = set(rng.sample(cells, count))
+            field.setSources(sources)
+            self._checkField(table, field, sources)
+
+        # Copies are independent.
+        self.assertNotEqual(sorted(sources), copy.getSources())
+
+    def test_distance_field_unreachable(self):
+        walls = Layout(SPLIT_LAYOUT).walls
+        field = DistanceField(walls, [(1, 1)])
+
+        self.assertEqual(2, field.getDistance((2, 2)))
+        self.assertEqual((1, 1), field.getNearestSource((2, 2)))
+        self.assertEqual(sys.maxsize, field.getDistance((5, 2)))
+        self.assertIsNone(field.getNearestSource((5, 2)))
+        self.assertIsNone(field.getDistance((0, 0)))
+
+        with self.assertRaises(ValueError):
+            field.removeSource((2, 2))
+
+        with self.assertRaises(ValueError):
+            field.addSource((0, 0))
+
+        field.removeSource((1, 1))
+        self.assertEqual(sys.maxsize, field.getDistance((1, 1)))
+
+    def test_registry(self):
+        walls = getLayout('mediumCapture').walls
+        registry = DistanceRegistry()
+        self.assertEqual(0, registry.getNumReferences(walls))
+
+        table = registry.acquire(walls)
+        self.assertIs(table, registry.acquire(walls.copy()))
+        self.assertEqual(2, registry.getNumReferences(walls))
+        self.assertEqual(1, registry.getNumTables())
+
+        registry.release(walls)
+        self.assertEqual(1, registry.getNumReferences(walls))
+
+        registry.release(walls)
+        self.assertEqual(0, registry.getNumReferences(walls))
+        self.assertEqual(0, registry.getNumTables())
+
+        with self.assertRaises(ValueError):
+            registry.release(walls)
+
+        # A pinned table is only referenced once, no matter how many times it is asked for.
+        pinned = registry.getPinnedTable(walls)
+        self.assertIs(pinned, registry.getPinnedTable(walls))
+        self.assertEqual(1, registry.getNumReferences(walls))
+
+        # Unpinning gives back that reference.
+        registry.acquire(walls)
+        registry.unpin(walls)
+        self.assertEqual(1, registry.getNumReferences(walls))
+
+        registry.unpin(walls)
+        self.assertEqual(1, registry.getNumReferences(walls))
+
+        registry.release(walls)
+        self.assertEqual(0, registry.getNumTables())
+
+        registry.getPinnedTable(walls)
+        registry.unpinAll()
+        self.assertEqual(0, registry.getNumTables())
+
+    def test_registry_concurrent(self):
+        slowWalls = getLayout('mediumCapture').walls
+        walls = getLayout('tinyCapture').walls
+        registry = DistanceRegistry()
+
+        started = threading.Event()
+        finish = threading.Event()
+
+        def loadTable(loadWalls):
+            if (loadWalls == slowWalls):
+                started.set()
+                finish.wait()
+
+            return DistanceTable(loadWalls)
+
+        tables = []
+        def acquire(acquireWalls):
+            tables.append(registry.acquire(acquireWalls))
+
+        with unittest.mock.patch('pacai.core.distanceCalculator._loadTable', loadTable):
+            builders = [threading.Thread(target = acquire, args = (slowWalls, ))
+                    for i in range(2)]
+
+            builders[0].start()
+            started.wait()
+            builders[1].start()
+
+            # Other walls do not wait for the slow build.
+            other = threading.Thread(target = acquire, args = (walls, ))
+            other.start()
+            other.join(timeout = 10)
+            self.assertFalse(other.is_alive())
+            self.assertEqual(1, registry.getNumTables())
+
+            finish.set()
+            for builder in builders:
+                builder.join()
+
+        # Both threads got the same (single) table.
+        self.assertEqual(2, registry.getNumTables())
+        self.assertEqual(2, registry.getNumReferences(slowWalls))
+        self.assertIs(tables[1], tables[2])
+
+    def test_shared_distancers(self):
+        layout = getLayout('tinyCapture')
+        references = getRegistry().getNumReferences(layout.walls)
+
+        distancers = [Distancer(layout), Distancer(getLayout('tinyCapture'))]
+        for distancer in distancers:
+            distancer.getMazeDistances()
+
+        self.assertIs(distancers[0]._distances, distancers[1]._distances)
+        self.assertEqual(references + 2, getRegistry().getNumReferences(layout.walls))
+
+        for distancer in distancers:
+            distancer.release()
+            self.assertFalse(distancer.isReadyForMazeDistance())
+
+        self.assertEqual(references, getRegistry().getNumReferences(layout.walls))
+
+        # Releasing twice is harmless.
+        distancers[0].release()
+
+    def test_maze(self):
+        layout = Layout(SPLIT_LAYOUT)
+        state = unittest.mock.Mock()
+        state.getWalls.return_value = layout.walls
+
+        numTables = getRegistry().getNumTables()
+
+        self.assertEqual(2, distance.maze((1, 1), (2, 2), state))
+        self.assertEqual(sys.maxsize, distance.maze((1, 1), (5, 2), state))
+
+        # Only the row for the one source is computed, and no all-pairs table is built.
+        self.assertEqual(1, getLazyTable(layout.walls).getNumCachedRows())
+        self.assertEqual(numTables, getRegistry().getNumTables())
+
+        with self.assertRaises(ValueError):
+            distance.maze((0, 0), (1, 1), state)
+
+    def _snappedDistance(self, distancer, pos1, pos2):
+        """
+        The best distance between the grid points around two positions.
+        """
+
+        best = None
+        for (snap1, offset1) in getGrids2D(pos1):
+            for (snap2, offset2) in getGrids2D(pos2):
+                distance = distancer.getDistanceOnGrid(snap1, snap2) + offset1 + offset2
+                if (best is None or distance < best):
+                    best = distance
+
+        return best
+
+    def _checkField(self, table, field, sources):
+        for cell in table.getCells():
+            expected = min([table.getDistance(cell, source) for source in sources],
+                    default = sys.maxsize)
+            self.assertEqual(expected, field.getDistance(cell))
+
+            if (expected != sys.maxsize):
+                nearest = field.getNearestSource(cell)
+                self.assertIn(nearest, sources)
+                self.assertEqual(expected, table.getDistance(cell, nearest))
+
+    def _follow(self, position, path):
+        for action in path:
+            dx, dy = Actions.directionToVector(action)
+            position = (position[0] + int(dx), position[1] + int(dy))
+
+        return position
+
+    def _bfs(self, walls, source):
+        distances = {source: 0}
+        queue = collections.deque([source])
+
+        while (queue):
+            (x, y) = queue.popleft()
+
+            for neighbor in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+                if (walls[neighbor[0]][neighbor[1]] or neighbor in distances):
+                    continue
+
+                distances[neighbor] = distances[(x, y)] + 1
+                queue.append(neighbor)
+
+        return distances
+
+if __name__ == '__main__':
+    unittest.main()
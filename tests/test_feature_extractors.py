@@ -0,0 +1,50 @@
+import random
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.featureExtractors import DistanceFieldExtractor
+from pacai.core.featureExtractors import SimpleExtractor
+from pacai.core.layout import getLayout
+
+NUM_MOVES = 60
+SEED = 3
+
+"""
+Test the feature extractors.
+"""
+class FeatureExtractorsTest(unittest.TestCase):
+    def test_distance_field_matches_search(self):
+        searchExtractor = SimpleExtractor()
+        fieldExtractor = DistanceFieldExtractor()
+
+        rng = random.Random(SEED)
+        state = PacmanGameState(getLayout('smallClassic'))
+
+        for _ in range(NUM_MOVES):
+            if (state.isOver()):
+                break
+
+            for action in state.getLegalActions(0):
+                self.assertEqual(searchExtractor.getFeatures(state, action),
+                        fieldExtractor.getFeatures(state, action))
+
+            for agentIndex in range(state.getNumAgents()):
+                if (state.isOver()):
+                    break
+
+                action = rng.choice(state.getLegalActions(agentIndex))
+                state = state.generateSuccessor(agentIndex, action)
+
+    def test_distance_field_layouts(self):
+        searchExtractor = SimpleExtractor()
+        fieldExtractor = DistanceFieldExtractor()
+
+        # The same extractor works across layouts.
+        for name in ['smallClassic', 'mediumClassic', 'smallClassic']:
+            state = PacmanGameState(getLayout(name))
+            for action in state.getLegalActions(0):
+                self.assertEqual(searchExtractor.getFeatures(state, action),
+                        fieldExtractor.getFeatures(state, action))
+
+if __name__ == '__main__':
+    unittest.main()
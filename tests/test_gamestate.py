@@ -0,0 +1,242 @@
+import unittest
+
+from pacai.bin.capture import CaptureGameState
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.agentstate import AgentState
+from pacai.core.directions import Directions
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+TEST_LAYOUT = [
+    '%%%%%%',
+    '%P..G%',
+    '%%%%%%',
+]
+
+"""
+Test the common game state functionality.
+"""
+class GameStateTest(unittest.TestCase):
+    def test_incremental_hash(self):
+        state = PacmanGameState(Layout(TEST_LAYOUT))
+
+        first = state.generateSuccessor(0, Directions.EAST)
+        second = state.generateSuccessor(0, Directions.EAST)
+
+        self.assertTrue(state.hasFood(2, 1))
+        self.assertFalse(first.hasFood(2, 1))
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(hash(state), hash(first))
+
+        # Reach the same configuration along a different path.
+        shortPath = first.generateSuccessor(0, Directions.WEST)
+
+        longPath = state
+        for action in [Directions.EAST, Directions.WEST, Directions.EAST, Directions.WEST]:
+            longPath = longPath.generateSuccessor(0, action)
+
+        self.assertNotEqual(shortPath, longPath)
+
+        longPath.setScore(shortPath.getScore())
+        self.assertEqual(shortPath, longPath)
+        self.assertEqual(hash(shortPath), hash(longPath))
+
+    def test_apply_undo_move(self):
+        state = PacmanGameState(Layout(TEST_LAYOUT))
+        original = state.generateSuccessor(0, Directions.STOP)
+        original.setScore(state.getScore())
+
+        actions = [(0, Directions.EAST), (1, Directions.WEST), (0, Directions.EAST)]
+
+        records = []
+        successor = state
+        for (agentIndex, action) in actions:
+            successor = successor.generateSuccessor(agentIndex, action)
+            records.append(state.applyMove(agentIndex, action))
+
+            self.assertEqual(successor, state)
+            self.assertEqual(successor.getNumFood(), state.getNumFood())
+
+        self.assertTrue(state.isOver())
+        self.assertRaises(RuntimeError, state.applyMove, 0, Directions.WEST)
+
+        for record in reversed(records):
+            state.undoMove(record)
+
+        self.assertEqual(original, state)
+        self.assertEqual(hash(original), hash(state))
+        self.assertEqual(2, state.getNumFood())
+
+        # An illegal move should leave the state untouched.
+        self.assertRaises(ValueError, state.applyMove, 0, Directions.WEST)
+        self.assertEqual(original, state)
+
+    def test_bytes_round_trip(self):
+        layout = Layout(TEST_LAYOUT)
+        state = PacmanGameState(layout)
+        successor = state.generateSuccessor(0, Directions.EAST).generateSuccessor(1, Directions.WEST)
+
+        for original in [state, successor]:
+            data = original.toBytes()
+            decoded = PacmanGameState.fromBytes(layout, data)
+
+            self.assertEqual(original, decoded)
+            self.assertEqual(hash(original), hash(decoded))
+            self.assertEqual(data, decoded.toBytes())
+            self.assertEqual(original.getNumFood(), decoded.getNumFood())
+
+        self.assertNotEqual(state.toBytes(), successor.toBytes())
+
+        # Equal states reached along different paths encode the same.
+        other = state.generateSuccessor(1, Directions.WEST).generateSuccessor(0, Directions.EAST)
+        self.assertEqual(successor.toBytes(), other.toBytes())
+
+        self.assertRaises(ValueError, PacmanGameState.fromBytes, layout, successor.toBytes()[:-1])
+        self.assertRaises(ValueError, PacmanGameState.fromBytes, layout, successor.toBytes() + b'0')
+
+    def test_capture_bytes_round_trip(self):
+        layout = getLayout('defaultCapture')
+        state = CaptureGameState(layout, 100)
+
+        for agentIndex in range(state.getNumAgents()):
+            state = state.generateSuccessor(agentIndex, state.getLegalActions(agentIndex)[0])
+
+        decoded = CaptureGameState.fromBytes(layout, state.toBytes())
+
+        self.assertEqual(state, decoded)
+        self.assertEqual(hash(state), hash(decoded))
+        self.assertEqual(state.getTimeleft(), decoded.getTimeleft())
+        self.assertEqual(state.getRedFood(), decoded.getRedFood())
+        self.assertEqual(state.getBlueFood(), decoded.getBlueFood())
+        self.assertEqual(state.getNumRedFood(), decoded.getNumRedFood())
+        self.assertEqual(state.getBlueCapsules(), decoded.getBlueCapsules())
+
+    def test_capture_key(self):
+        layout = getLayout('defaultCapture')
+        state = CaptureGameState(layout, 100)
+
+        # Moving away and back again gives an equal state, with less time left.
+        (agentIndex, action) = [(agentIndex, action) for agentIndex in range(state.getNumAgents())
+                for action in state.getLegalActions(agentIndex)
+                if (action != Directions.STOP)][0]
+        moved = state.generateSuccessor(agentIndex, action)
+        back = moved.generateSuccessor(agentIndex, Directions.REVERSE[action])
+        back.getMutableAgentState(agentIndex).setDirection(
+                state.getAgentState(agentIndex).getDirection())
+
+        self.assertEqual(state, back)
+        self.assertNotEqual(state.getTimeleft(), back.getTimeleft())
+
+        self.assertEqual(state.toKey(), back.toKey())
+        self.assertNotEqual(state.toBytes(), back.toBytes())
+        self.assertNotEqual(state.toKey(), moved.toKey())
+
+        # Pacman states have nothing outside of equality.
+        pacmanState = PacmanGameState(getLayout('smallClassic'))
+        self.assertEqual(pacmanState.toBytes(), pacmanState.toKey())
+
+    def test_copy_on_write_agent_states(self):
+        state = PacmanGameState(Layout(TEST_LAYOUT))
+        ghostState = state.getAgentState(1)
+
+        successor = state.generateSuccessor(0, Directions.EAST)
+
+        # Only the agent that moved gets a new state.
+        self.assertIs(ghostState, successor.getAgentState(1))
+        self.assertIsNot(state.getAgentState(0), successor.getAgentState(0))
+        self.assertEqual((1, 1), state.getPacmanPosition())
+        self.assertEqual((2, 1), successor.getPacmanPosition())
+
+        ghostSuccessor = successor.generateSuccessor(1, Directions.WEST)
+        self.assertIs(successor.getAgentState(0), ghostSuccessor.getAgentState(0))
+        self.assertEqual((4, 1), successor.getGhostPosition(1))
+        self.assertEqual((3, 1), ghostSuccessor.getGhostPosition(1))
+
+    def test_food_counts(self):
+        state = PacmanGameState(Layout(TEST_LAYOUT))
+        foodList = state.getFoodList()
+
+        self.assertEqual([(2, 1), (3, 1)], foodList)
+        self.assertEqual(2, state.getNumFood())
+
+        # Successors that do not eat share the food list.
+        successor = state.generateSuccessor(1, Directions.WEST)
+        self.assertIs(foodList, successor.getFoodList())
+
+        successor = successor.generateSuccessor(0, Directions.EAST)
+        self.assertEqual([(3, 1)], successor.getFoodList())
+        self.assertEqual(1, successor.getNumFood())
+        self.assertEqual(successor.getFood().count(), successor.getNumFood())
+
+        self.assertEqual([(2, 1), (3, 1)], state.getFoodList())
+        self.assertEqual(2, state.getNumFood())
+
+    def test_capture_eat_missing_food(self):
+        state = CaptureGameState(getLayout('defaultCapture'), 100)
+        numRedFood = state.getNumRedFood()
+        numBlueFood = state.getNumBlueFood()
+
+        # Open cells without food, on each side.
+        walls = state.getWalls()
+        for (x, y) in [(x, y) for x in (1, walls.getWidth() - 2) for y in range(walls.getHeight())
+                if (not walls[x][y] and not state.hasFood(x, y))]:
+            self.assertFalse(state.eatFood(x, y))
+
+        self.assertEqual(numRedFood, state.getNumRedFood())
+        self.assertEqual(numBlueFood, state.getNumBlueFood())
+        self.assertEqual(state.getRedFood().count(), state.getNumRedFood())
+        self.assertEqual(state.getBlueFood().count(), state.getNumBlueFood())
+
+        (x, y) = state.getRedFood().asList()[0]
+        self.assertTrue(state.eatFood(x, y))
+        self.assertFalse(state.eatFood(x, y))
+        self.assertEqual(numRedFood - 1, state.getNumRedFood())
+        self.assertEqual(state.getRedFood().count(), state.getNumRedFood())
+
+    def test_generate_successors(self):
+        state = PacmanGameState(Layout(TEST_LAYOUT))
+
+        for agentIndex in range(state.getNumAgents()):
+            successors = state.generateSuccessors(agentIndex)
+
+            self.assertEqual(state.getLegalActions(agentIndex),
+                    [action for (action, successor) in successors])
+
+            for (action, successor) in successors:
+                self.assertEqual(state.generateSuccessor(agentIndex, action), successor)
+
+        successors = state.generateSuccessors(0, memoize = True)
+        self.assertIs(successors, state.generateSuccessors(0, memoize = True))
+        self.assertIsNot(successors, state.generateSuccessors(0))
+
+        # Modifying the state drops the saved successors.
+        record = state.applyMove(0, Directions.EAST)
+        self.assertNotEqual([action for (action, successor) in successors],
+                [action for (action, successor) in state.generateSuccessors(0, memoize = True)])
+
+        state.undoMove(record)
+        self.assertIs(successors, state.generateSuccessors(0, memoize = True))
+
+    def test_half_step_positions(self):
+        agent = AgentState((1, 1), Directions.STOP, False)
+        other = AgentState((2, 1), Directions.EAST, False)
+
+        agent.updatePosition((0.5, 0))
+        self.assertEqual((3, 2), agent.getHalfPosition())
+        self.assertEqual((1.5, 1), agent.getPosition())
+        self.assertEqual((1, 1), agent.getIntPosition())
+        self.assertEqual((2, 1), agent.getNearestPosition())
+        self.assertFalse(agent.isOnGridPoint())
+        self.assertTrue(agent.isWithinDistance(other, 0.5))
+        self.assertFalse(other.isWithinDistance(AgentState((1, 1), Directions.STOP, False), 0.7))
+
+        agent.updatePosition((0.5, 0))
+        self.assertEqual((2, 1), agent.getPosition())
+        self.assertIsInstance(agent.getPosition()[0], int)
+        self.assertTrue(agent.isOnGridPoint())
+        self.assertEqual(other, agent)
+        self.assertEqual(hash(other), hash(agent))
+
+if __name__ == '__main__':
+    unittest.main()
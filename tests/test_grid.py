@@ -0,0 +1,54 @@
+import unittest
+
+from pacai.core.grid import BitGrid
+from pacai.core.grid import Grid
+
+"""
+Test the different grid implementations.
+"""
+class GridTest(unittest.TestCase):
+    def test_bitgrid_matches_grid(self):
+        grid = Grid(5, 3)
+        bitGrid = BitGrid(5, 3)
+
+        for (x, y) in [(0, 0), (1, 2), (4, 1), (4, 2)]:
+            grid[x][y] = True
+            bitGrid[x][y] = True
+
+        self.assertEqual(grid.asList(), bitGrid.asList())
+        self.assertEqual(grid.asList(False), bitGrid.asList(False))
+        self.assertEqual(grid.count(), bitGrid.count())
+        self.assertEqual(grid.count(False), bitGrid.count(False))
+        self.assertEqual(str(grid), str(bitGrid))
+        self.assertEqual(hash(grid), hash(bitGrid))
+        self.assertEqual(bitGrid, grid)
+        self.assertEqual(grid, bitGrid)
+        self.assertEqual(bitGrid, BitGrid.fromGrid(grid))
+        self.assertEqual(bitGrid, BitGrid.fromBits(5, 3, bitGrid.getBits()))
+
+    def test_bitgrid_copy(self):
+        bitGrid = BitGrid(4, 4, initialValue = True)
+        self.assertEqual(16, bitGrid.count())
+
+        # Column views are reused, but never shared with copies.
+        self.assertIs(bitGrid[1], bitGrid[1])
+        self.assertTrue(bitGrid[2][3])
+
+        copy = bitGrid.copy()
+        self.assertIsNot(bitGrid[2], copy[2])
+        copy[2][3] = False
+
+        self.assertTrue(bitGrid[2][3])
+        self.assertFalse(copy[2][3])
+        self.assertTrue(copy[-1][-1])
+        self.assertEqual(15, copy.count())
+        self.assertNotEqual(bitGrid, copy)
+
+        with self.assertRaises(IndexError):
+            copy[4][0]
+
+        with self.assertRaises(IndexError):
+            copy[0][4]
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import glob
+import os
+import pickle
+import unittest
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.layout import DEFAULT_LAYOUT_DIR
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+"""
+Test layouts and the structures precomputed from them.
+"""
+class LayoutTest(unittest.TestCase):
+    def test_move_table(self):
+        for path in glob.glob(os.path.join(DEFAULT_LAYOUT_DIR, '*.lay')):
+            layout = getLayout(os.path.basename(path))
+            walls = layout.walls
+            moveTable = layout.getMoveTable()
+
+            self.assertIs(moveTable, layout.getMoveTable())
+
+            for position in walls.asList(False):
+                self.assertEqual(Actions.getPossibleActions(position, Directions.STOP, walls),
+                        list(moveTable.getPossibleActions(position, Directions.STOP)))
+                self.assertEqual(Actions.getLegalNeighbors(position, walls),
+                        list(moveTable.getLegalNeighbors(position)))
+
+                for (action, nextPosition) in moveTable.getSuccessors(position):
+                    self.assertEqual(Actions.getSuccessor(position, action), nextPosition)
+
+            # Between grid points, agents keep going.
+            self.assertEqual((Directions.EAST, ),
+                    moveTable.getPossibleActions((1.5, 1), Directions.EAST))
+
+    def test_pickle(self):
+        layout = getLayout('mediumClassic')
+        layout.getMoveTable()
+        layout.getCorridorGraph()
+
+        # The lazily built structures are left out of the pickle, and rebuilt when needed.
+        state = pickle.loads(pickle.dumps(layout)).__getstate__()
+        self.assertIsNone(state['_moveTable'])
+        self.assertIsNone(state['_corridorGraph'])
+
+        # Layouts pickled before they existed.
+        del state['_moveTable']
+        del state['_corridorGraph']
+        oldLayout = Layout.__new__(Layout)
+        oldLayout.__setstate__(state)
+        self.assertEqual(layout.getMoveTable().getSuccessors((1, 1)),
+                oldLayout.getMoveTable().getSuccessors((1, 1)))
+        self.assertEqual(layout.getCorridorGraph().getNumNodes(),
+                oldLayout.getCorridorGraph().getNumNodes())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pacai.agents.search.base import SearchAgent
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.distanceCalculator import DistanceTable
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+from pacai.core.search import engine
+from pacai.core.search import heuristic
+from pacai.core.search.corridor import CorridorSearchProblem
+from pacai.core.search.food import FoodSearchProblem
+from pacai.core.search.food import PackedFoodSearchProblem
+from pacai.core.search.position import PositionSearchProblem
+from pacai.core.search.stats import SearchStats
+
+# The right room can not be reached from the left one.
+SPLIT_LAYOUT = [
+    '%%%%%%%',
+    '%P.%..%',
+    '%..%..%',
+    '%%%%%%%',
+]
+
+"""
+Test the reference searches in `pacai.core.search.engine`.
+"""
+class SearchEngineTest(unittest.TestCase):
+    def test_position(self):
+        for name in ['mediumMaze', 'bigMaze', 'mediumClassic', 'openMaze']:
+            layout = getLayout(name)
+            state = PacmanGameState(layout)
+            table = DistanceTable(layout.walls)
+
+            for goal in layout.walls.asList(False)[::23]:
+                distance = table.getDistance(state.getPacmanPosition(), goal)
+
+                for function in [engine.bfs, engine.ucs, engine.bidirectional,
+                        lambda problem: engine.astar(problem, heuristic.manhattan)]:
+                    problem = PositionSearchProblem(state, goal = goal)
+                    actions = function(problem)
+
+                    self.assertEqual(distance, len(actions))
+                    self.assertEqual(distance, problem.actionsCost(actions))
+
+                problem = PositionSearchProblem(state, goal = goal)
+                actions = engine.wastar(problem, heuristic.manhattan)
+                self.assertLessEqual(problem.actionsCost(actions),
+                        engine.DEFAULT_WEIGHT * distance)
+
+    def test_costs(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+
+        # Cells further west are more expensive.
+        costFn = lambda position: 2 ** (10 - position[0])
+
+        costs = []
+        for function in [engine.ucs, engine.astar, engine.bfs]:
+            problem = PositionSearchProblem(state, costFn = costFn)
+            costs.append(problem.actionsCost(function(problem)))
+
+        self.assertEqual(costs[0], costs[1])
+        self.assertLessEqual(costs[0], costs[2])
+
+    def test_corridors(self):
+        layout = getLayout('bigMaze')
+        state = PacmanGameState(layout)
+        table = DistanceTable(layout.walls)
+
+        for goal in layout.walls.asList(False)[::41]:
+            distance = table.getDistance(state.getPacmanPosition(), goal)
+
+            for function in [engine.ucs, engine.bidirectional,
+                    lambda problem: engine.astar(problem, heuristic.manhattan)]:
+                problem = CorridorSearchProblem(state, goal = goal)
+                actions = function(problem)
+
+                self.assertEqual(distance, problem.actionsCost(actions))
+                self.assertEqual(distance, len(problem.expandActions(actions)))
+
+    def test_food(self):
+        state = PacmanGameState(getLayout('tinySearch'))
+
+        costs = []
+        for function in [engine.bfs, engine.ucs]:
+            problem = FoodSearchProblem(state)
+            actions = function(problem)
+            costs.append(problem.actionsCost(actions))
+
+        self.assertEqual(costs[0], costs[1])
+
+    def test_packed_food(self):
+        for name in ['tinySearch', 'trickySearch']:
+            state = PacmanGameState(getLayout(name))
+
+            problem = FoodSearchProblem(state)
+            expected = problem.actionsCost(engine.ucs(problem))
+
+            packedProblem = PackedFoodSearchProblem(state)
+            start = packedProblem.startingState()
+            self.assertEqual(state.getFood().asList(),
+                    packedProblem.getFoodPositions(start[1]))
+            self.assertLessEqual(heuristic.foodMST(start, packedProblem), expected)
+
+            for function in [engine.ucs, lambda problem: engine.astar(problem, heuristic.foodMST)]:
+                packedProblem = PackedFoodSearchProblem(state)
+                actions = function(packedProblem)
+                self.assertEqual(expected, packedProblem.actionsCost(actions))
+
+                # The moves eat all the food in the real game.
+                for action in actions:
+                    state = state.generateSuccessor(0, action)
+                self.assertEqual(0, state.getNumFood())
+                state = PacmanGameState(getLayout(name))
+
+    def test_unreachable(self):
+        state = PacmanGameState(Layout(SPLIT_LAYOUT))
+
+        for function in [engine.bfs, engine.ucs, engine.astar, engine.wastar,
+                engine.bidirectional]:
+            self.assertIsNone(function(PositionSearchProblem(state, goal = (4, 1))))
+            self.assertEqual([], function(PositionSearchProblem(state, goal = (1, 2))))
+
+        with self.assertRaises(ValueError):
+            engine.bidirectional(FoodSearchProblem(state))
+
+        # A single goal is not enough, the problem also needs predecessors.
+        problem = FoodSearchProblem(state)
+        problem.goal = problem.startingState()
+        with self.assertRaises(ValueError):
+            engine.bidirectional(problem)
+
+    def test_search_agent(self):
+        layout = getLayout('mediumMaze')
+        state = PacmanGameState(layout)
+
+        agent = SearchAgent(0, fn = 'pacai.core.search.engine.astar',
+                heuristic = 'pacai.core.search.heuristic.manhattan')
+        agent.registerInitialState(state)
+
+        expected = DistanceTable(layout.walls).getDistance(state.getPacmanPosition(), (1, 1))
+        self.assertEqual(expected, len(agent._actions))
+
+    def test_stats(self):
+        state = PacmanGameState(getLayout('mediumMaze'))
+
+        problem = PositionSearchProblem(state)
+        self.assertIsNone(problem.getStats())
+
+        stats = SearchStats(trackMemory = False, layout = 'mediumMaze')
+        stats.attach(problem)
+        stats.start()
+        actions = engine.astar(problem, stats.wrapHeuristic(heuristic.manhattan))
+        stats.stop()
+        stats.setResult(actions, problem.actionsCost(actions))
+
+        data = json.loads(stats.toJSON())
+        self.assertEqual('mediumMaze', data['layout'])
+        self.assertEqual(len(actions), data['pathLength'])
+        self.assertEqual(problem.getExpandedCount(), data['expanded'])
+        self.assertGreaterEqual(data['generated'], data['expanded'])
+        self.assertGreater(data['duplicates'], 0)
+        self.assertGreater(data['peakFrontier'], 0)
+        self.assertGreater(data['peakClosed'], 0)
+        self.assertGreater(data['heuristicCalls'], 0)
+        self.assertIsNone(data['peakMemory'])
+
+    def test_search_agent_stats(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, 'stats.json')
+
+            for fn in ['pacai.core.search.engine.bfs', 'pacai.core.search.engine.ucs']:
+                agent = SearchAgent(0, fn = fn, searchStats = path,
+                        searchStatsLabels = {'layout': 'tinyMaze'})
+                agent.registerInitialState(PacmanGameState(getLayout('tinyMaze')))
+
+            with open(path, 'r') as file:
+                lines = [json.loads(line) for line in file]
+
+        self.assertEqual(2, len(lines))
+        for (fn, data) in zip(['pacai.core.search.engine.bfs', 'pacai.core.search.engine.ucs'],
+                lines):
+            self.assertEqual(fn, data['function'])
+            self.assertEqual('tinyMaze', data['layout'])
+            self.assertEqual(8, data['cost'])
+            self.assertGreater(data['peakMemory'], 0)
+
+            # Duplicates are not counted while memory is tracked.
+            self.assertIsNone(data['duplicates'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,5 +13,16 @@ class UtilTest(unittest.TestCase):
         self.assertEqual(util.buildHash(1, 1), 23311)
         self.assertEqual(util.buildHash(1, 2), 23312)
 
+    def test_zobrist_number_key(self):
+        # Equal numbers get equal keys, and different ones (almost always) differ.
+        self.assertEqual(util.zobristNumberKey(10), util.zobristNumberKey(10.0))
+        self.assertNotEqual(util.zobristNumberKey(10), util.zobristNumberKey(11))
+        self.assertNotEqual(util.zobristNumberKey(-1), util.zobristNumberKey(1))
+
+        for number in [0, 1, -500, 12.5, 2 ** 70]:
+            key = util.zobristNumberKey(number)
+            self.assertGreaterEqual(key, 0)
+            self.assertLess(key, 2 ** util.ZOBRIST_BITS)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,3 +1,4 @@
+import random
 import unittest
 
 from pacai.util import priorityQueue
@@ -22,6 +23,23 @@ class UtilContainersTest(unittest.TestCase):
         for val in val_list:
             self.assertEqual(val, testQueue.pop())
 
+    def test_queue_push_all(self):
+        for testQueue in [queue.Queue(), queue.CompactQueue()]:
+            testQueue.pushAll(range(1, 5))
+            testQueue.push(5)
+            testQueue.pushAll([6, 7])
+            self.assertEqual(7, len(testQueue))
+
+            # Interleave pops and pushes, so the compact queue drops popped items on the way.
+            values = [testQueue.pop() for _ in range(4)]
+            testQueue.pushAll(range(8, 12))
+            while (not testQueue.isEmpty()):
+                values.append(testQueue.pop())
+
+            self.assertEqual(list(range(1, 12)), values)
+            self.assertEqual(0, len(testQueue))
+            self.assertRaises(IndexError, testQueue.pop)
+
     def test_stack(self):
         testStack = stack.Stack()
         self.assertTrue(testStack.isEmpty())
@@ -36,6 +54,18 @@ class UtilContainersTest(unittest.TestCase):
         for val in reversed(val_list):
             self.assertEqual(val, testStack.pop())
 
+    def test_stack_push_all(self):
+        for testStack in [stack.Stack(), stack.CompactStack()]:
+            testStack.pushAll(range(1, 5))
+            testStack.push(5)
+            self.assertEqual(5, len(testStack))
+
+            values = []
+            while (not testStack.isEmpty()):
+                values.append(testStack.pop())
+
+            self.assertEqual([5, 4, 3, 2, 1], values)
+
     def test_priority_queue(self):
         testPriorityQueue = priorityQueue.PriorityQueue()
         self.assertTrue(testPriorityQueue.isEmpty())
@@ -52,5 +82,59 @@ class UtilContainersTest(unittest.TestCase):
         for val, pri in reversed(val_list):
             self.assertEqual(val, testPriorityQueue.pop())
 
+    def test_indexed_priority_queue(self):
+        testPriorityQueue = priorityQueue.IndexedPriorityQueue()
+        self.assertTrue(testPriorityQueue.isEmpty())
+
+        # Plain objects can not be compared, so ties must be broken by insertion order.
+        items = [object() for _ in range(6)]
+        for item in items:
+            testPriorityQueue.push(item, 1)
+
+        self.assertEqual(len(items), len(testPriorityQueue))
+        self.assertTrue(testPriorityQueue.contains(items[3]))
+        self.assertRaises(ValueError, testPriorityQueue.push, items[3], 0)
+
+        testPriorityQueue.decreaseKey(items[3], 0)
+        self.assertEqual(0, testPriorityQueue.getPriority(items[3]))
+        self.assertRaises(ValueError, testPriorityQueue.decreaseKey, items[3], 2)
+
+        self.assertFalse(testPriorityQueue.update(items[4], 1))
+        self.assertTrue(testPriorityQueue.update(items[5], 0))
+
+        self.assertIs(items[3], testPriorityQueue.peek())
+        expected = [items[3], items[5], items[0], items[1], items[2], items[4]]
+        for item in expected:
+            self.assertIs(item, testPriorityQueue.pop())
+            self.assertNotIn(item, testPriorityQueue)
+
+        self.assertTrue(testPriorityQueue.isEmpty())
+        self.assertRaises(IndexError, testPriorityQueue.pop)
+        self.assertRaises(ValueError, testPriorityQueue.decreaseKey, items[0], 0)
+
+    def test_indexed_priority_queue_random(self):
+        rng = random.Random(7)
+        testPriorityQueue = priorityQueue.IndexedPriorityQueue()
+        expected = {}
+
+        for _ in range(2000):
+            item = rng.randrange(100)
+            priority = rng.randrange(50)
+
+            if (rng.random() < 0.3 and len(expected) > 0):
+                best = min(expected.values())
+                self.assertEqual(best, expected.pop(testPriorityQueue.pop()))
+            elif (item not in expected or priority < expected[item]):
+                self.assertTrue(testPriorityQueue.update(item, priority))
+                expected[item] = priority
+            else:
+                self.assertFalse(testPriorityQueue.update(item, priority))
+
+            self.assertEqual(len(expected), len(testPriorityQueue))
+
+        while (not testPriorityQueue.isEmpty()):
+            best = min(expected.values())
+            self.assertEqual(best, expected.pop(testPriorityQueue.pop()))
+
 if __name__ == '__main__':
     unittest.main()
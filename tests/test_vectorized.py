@@ -0,0 +1,107 @@
+import random
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if (numpy is not None):
+    from pacai.core.vectorized import ACTIONS
+    from pacai.core.vectorized import VectorizedPacmanGames
+
+# A board where pacman can not be caught, so random play will win.
+WIN_LAYOUT = [
+    '%%%%%%%%%',
+    '%P.o.%G %',
+    '%%%%%%%%%',
+]
+
+NUM_GAMES = 8
+NUM_STEPS = 600
+
+"""
+Differential tests between the vectorized simulator and the regular pacman game states.
+"""
+@unittest.skipIf(numpy is None, 'NumPy is not installed.')
+class VectorizedPacmanGamesTest(unittest.TestCase):
+    def test_matches_game_states(self):
+        for layoutName in ['smallClassic', 'mediumClassic', 'capsuleClassic', 'trappedClassic']:
+            self._checkLayout(getLayout(layoutName), random.Random(layoutName))
+
+    def test_wins(self):
+        wins = self._checkLayout(Layout(WIN_LAYOUT), random.Random(0))
+        self.assertGreater(wins, 0)
+
+    def test_illegal_action(self):
+        games = VectorizedPacmanGames(getLayout('smallClassic'), 2)
+        masks = games.getLegalActionMasks()
+
+        actions = numpy.array([int(numpy.flatnonzero(~mask)[0]) for mask in masks])
+        self.assertRaises(ValueError, games.step, actions)
+
+    def _checkLayout(self, layout, rng):
+        games = VectorizedPacmanGames(layout, NUM_GAMES)
+        states = [PacmanGameState(layout) for i in range(NUM_GAMES)]
+        turns = [0] * NUM_GAMES
+        finished = 0
+        wins = 0
+
+        for step in range(NUM_STEPS):
+            masks = games.getLegalActionMasks()
+            actions = []
+
+            for game in range(NUM_GAMES):
+                legal = states[game].getLegalActions(turns[game])
+                self.assertEqual(legal, [ACTIONS[i] for i in numpy.flatnonzero(masks[game])])
+                actions.append(ACTIONS.index(rng.choice(legal)))
+
+            done, scores, winners = games.step(actions)
+
+            for game in range(NUM_GAMES):
+                state = states[game].generateSuccessor(turns[game], ACTIONS[actions[game]])
+                turns[game] = (turns[game] + 1) % state.getNumAgents()
+
+                self.assertEqual(state.isOver(), bool(done[game]))
+                self.assertEqual(state.getScore(), scores[game])
+
+                if (state.isOver()):
+                    self.assertEqual(state.isWin(), bool(winners[game]))
+                    wins += int(state.isWin())
+
+                    states[game] = PacmanGameState(layout)
+                    turns[game] = 0
+                    finished += 1
+                    continue
+
+                states[game] = state
+                self._checkState(games, game, state)
+
+        # Make sure that the games actually got to their ends.
+        self.assertGreater(finished, 0)
+
+        return wins
+
+    def _checkState(self, games, game, state):
+        for agentIndex in range(state.getNumAgents()):
+            agentState = state.getAgentState(agentIndex)
+
+            self.assertEqual(agentState.getHalfPosition(),
+                    tuple(games.getHalfPositions()[game, agentIndex]))
+            self.assertEqual(agentState.getDirection(),
+                    ACTIONS[games.getDirections()[game, agentIndex]])
+            self.assertEqual(agentState.getScaredTimer(),
+                    games.getScaredTimers()[game, agentIndex])
+
+        self.assertEqual(state.getNumFood(), games.getNumFood()[game])
+        self.assertEqual(sorted(state.getFoodList()),
+                sorted(map(tuple, numpy.argwhere(games.getFood()[game]).tolist())))
+        self.assertEqual(sorted(state.getCapsules()),
+                sorted(map(tuple, numpy.argwhere(games.getCapsules()[game]).tolist())))
+
+if __name__ == '__main__':
+    unittest.main()